@@ -3,11 +3,83 @@ from accounts.models import (UserManagementModel,
                              CustomerModel,
                              SellerModel,
                              DeliveryBoyModel,
-                             OTPVerifyModel)
+                             OTPVerifyModel,
+                             RevokedTokenModel,
+                             CoinEntryModel,
+                             CoinSnapshotModel)
 
+from core.admin import LargeTableAdmin
 
-admin.site.register(UserManagementModel)
-admin.site.register(CustomerModel)
-admin.site.register(SellerModel)
-admin.site.register(DeliveryBoyModel)
-admin.site.register(OTPVerifyModel)
\ No newline at end of file
+
+@admin.register(UserManagementModel)
+class UserManagementModelAdmin(LargeTableAdmin):
+    list_display = ["username", "phone_no", "district", "state", "is_active", "date_joined"]
+    list_filter = ["is_active", "district"]
+    search_fields = ["username", "phone_no"]
+
+
+class _RoleAdmin(LargeTableAdmin):
+    """Role rows print `user.username`, so the user is joined in the changelist."""
+    list_select_related = ["user"]
+    autocomplete_fields = ["user"]
+    search_fields = ["user__username", "user__phone_no"]
+    list_filter = ["is_active", "is_otp"]
+    # Coins only change through accounts.coins so the ledger stays complete.
+    readonly_fields = ["clo_coin"]
+
+
+@admin.register(CustomerModel)
+class CustomerModelAdmin(_RoleAdmin):
+    list_display = ["id", "user", "customer_rank", "clo_coin", "is_active", "is_otp", "created_at"]
+
+
+@admin.register(SellerModel)
+class SellerModelAdmin(_RoleAdmin):
+    list_display = ["id", "user", "shop_name", "GST_no", "seller_rank", "clo_coin", "is_active", "is_otp", "created_at"]
+    search_fields = _RoleAdmin.search_fields + ["shop_name", "GST_no"]
+
+
+@admin.register(DeliveryBoyModel)
+class DeliveryBoyModelAdmin(_RoleAdmin):
+    list_display = ["id", "user", "license_no", "delivery_boy_rank", "clo_coin", "is_active", "is_otp", "created_at"]
+    search_fields = _RoleAdmin.search_fields + ["license_no"]
+
+
+@admin.register(OTPVerifyModel)
+class OTPVerifyModelAdmin(LargeTableAdmin):
+    list_display = ["user", "otp_expiry", "otp_max_try", "otp_max_out", "updated_at"]
+    list_select_related = ["user"]
+    autocomplete_fields = ["user"]
+    search_fields = ["user__username"]
+
+
+@admin.register(RevokedTokenModel)
+class RevokedTokenModelAdmin(LargeTableAdmin):
+    list_display = ["jti", "expires_at", "created_at"]
+    search_fields = ["jti"]
+
+
+@admin.register(CoinEntryModel)
+class CoinEntryModelAdmin(LargeTableAdmin):
+    """Ledger entries are append-only."""
+    list_display = ["id", "account_type", "account_id", "amount", "reason", "reference", "created_at"]
+    list_filter = ["account_type", "reason"]
+    search_fields = ["reference"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CoinSnapshotModel)
+class CoinSnapshotModelAdmin(LargeTableAdmin):
+    list_display = ["id", "account_type", "account_id", "balance", "last_entry_id", "as_of"]
+    list_filter = ["account_type"]
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,170 @@
+"""
+clo_coin ledger.
+
+Coins only move through `credit` and `debit`: the role's clo_coin is changed
+with an F() expression (a debit only matches while the balance covers it)
+and a CoinEntryModel is appended in the same transaction. Balance updates
+don't race and every change has a history row.
+
+Snapshots record the balance as of an entry, so the balance at a point in
+time and the running balance of a history page are a snapshot plus the few
+entries after it, never a sum over the whole ledger.
+"""
+from django.db import transaction
+from django.db.models import F, Max, Sum
+
+from clovigo_main import settings
+from core.pagination import KeysetPagination
+from accounts.models import (CustomerModel,
+                             SellerModel,
+                             DeliveryBoyModel,
+                             CoinEntryModel,
+                             CoinSnapshotModel)
+
+
+ACCOUNT_MODELS = {
+    "customer": CustomerModel,
+    "seller": SellerModel,
+    "deliveryboy": DeliveryBoyModel,
+}
+
+ACCOUNT_TYPES = {model: account_type for account_type, model in ACCOUNT_MODELS.items()}
+
+HISTORY_PAGINATION = KeysetPagination(["-id"], settings.COIN_HISTORY_PAGE_SIZE)
+
+
+class InsufficientCoins(Exception):
+    """A debit larger than the balance."""
+
+
+def _post(account, amount, reason, reference):
+    model = type(account)
+    accounts = model.objects.filter(id=account.id)
+    if amount < 0:
+        accounts = accounts.filter(clo_coin__gte=-amount)
+
+    with transaction.atomic():
+        # The balance row is updated first so it stays locked until the entry is written.
+        if not accounts.update(clo_coin=F("clo_coin") + amount):
+            raise InsufficientCoins(f"{account} has less than {-amount} coins.")
+        return CoinEntryModel.objects.create(account_type=ACCOUNT_TYPES[model], account_id=account.id,
+                                             amount=amount, reason=reason, reference=reference)
+
+
+def credit(account, amount, reason, reference=""):
+    """Add `amount` coins to a customer, seller or delivery boy. Returns the entry."""
+    if amount <= 0:
+        raise ValueError("Credit amount must be positive.")
+    return _post(account, amount, reason, reference)
+
+
+def debit(account, amount, reason, reference=""):
+    """Take `amount` coins, raising InsufficientCoins when the balance is lower. Returns the entry."""
+    if amount <= 0:
+        raise ValueError("Debit amount must be positive.")
+    return _post(account, -amount, reason, reference)
+
+
+def _entries(account_type, account_id):
+    return CoinEntryModel.objects.filter(account_type=account_type, account_id=account_id)
+
+
+def _snapshots(account_type, account_id):
+    return CoinSnapshotModel.objects.filter(account_type=account_type, account_id=account_id)
+
+
+def balance_at(account_type, account_id, when):
+    """Balance at `when`: the last snapshot before it plus the entries since."""
+    snapshot = (
+        _snapshots(account_type, account_id).filter(as_of__lte=when)
+        .order_by("-last_entry_id").values_list("balance", "last_entry_id").first()
+    )
+    balance, last_entry_id = snapshot or (0, 0)
+    tail = _entries(account_type, account_id).filter(id__gt=last_entry_id, created_at__lte=when)
+    return balance + (tail.aggregate(total=Sum("amount"))["total"] or 0)
+
+
+def _balance_through(account_type, account_id, entry_id):
+    """Balance right after entry `entry_id`."""
+    snapshot = (
+        _snapshots(account_type, account_id).filter(last_entry_id__lte=entry_id)
+        .order_by("-last_entry_id").values_list("balance", "last_entry_id").first()
+    )
+    balance, last_entry_id = snapshot or (0, 0)
+    tail = _entries(account_type, account_id).filter(id__gt=last_entry_id, id__lte=entry_id)
+    return balance + (tail.aggregate(total=Sum("amount"))["total"] or 0)
+
+
+def coin_history(account_type, account_id, position=None, page_size=None, until=None):
+    """
+    One page of entries, newest first, each with the balance after it. `position` is a decoded
+    cursor, `until` leaves out later entries. Returns the rows and the next cursor.
+    """
+    entries = _entries(account_type, account_id)
+    if until is not None:
+        entries = entries.filter(created_at__lte=until)
+    rows, next_cursor = HISTORY_PAGINATION.page(
+        entries.values("id", "amount", "reason", "reference", "created_at"), position, page_size
+    )
+
+    if rows:
+        balance = _balance_through(account_type, account_id, rows[0]["id"])
+        for row in rows:
+            row["balance"] = balance
+            balance -= row["amount"]
+    return rows, next_cursor
+
+
+def snapshot_balances(batch_size=None):
+    """
+    Snapshot every account with entries since the newest snapshot. Returns how many were taken.
+
+    Account rows are locked while their balance is read, so no entry of theirs is in flight and
+    clo_coin matches the ledger. Snapshots stop at the newest entry when the run started;
+    entries written meanwhile are subtracted and picked up by the next run.
+    """
+    batch_size = batch_size or settings.COIN_SNAPSHOT_BATCH_SIZE
+    watermark = CoinSnapshotModel.objects.aggregate(last=Max("last_entry_id"))["last"] or 0
+    upto = CoinEntryModel.objects.aggregate(last=Max("id"))["last"] or 0
+    changed = (
+        CoinEntryModel.objects.filter(id__gt=watermark, id__lte=upto)
+        .values_list("account_type", "account_id").distinct()
+    )
+
+    accounts = {}
+    for account_type, account_id in changed.iterator():
+        accounts.setdefault(account_type, []).append(account_id)
+
+    taken = 0
+    for account_type, ids in accounts.items():
+        for start in range(0, len(ids), batch_size):
+            taken += _snapshot_batch(account_type, ids[start:start + batch_size], upto)
+    return taken
+
+
+def _snapshot_batch(account_type, ids, upto):
+    entries = CoinEntryModel.objects.filter(account_type=account_type, account_id__in=ids)
+    with transaction.atomic():
+        balances = dict(
+            ACCOUNT_MODELS[account_type].objects.select_for_update()
+            .filter(id__in=ids).values_list("id", "clo_coin")
+        )
+        later = dict(
+            entries.filter(id__gt=upto).values("account_id")
+            .annotate(total=Sum("amount")).values_list("account_id", "total")
+        )
+        last_ids = (
+            entries.filter(id__lte=upto).values("account_id")
+            .annotate(last=Max("id")).values_list("last", flat=True)
+        )
+        snapshots = [
+            CoinSnapshotModel(account_type=account_type, account_id=account_id,
+                              balance=balances[account_id] - later.get(account_id, 0),
+                              last_entry_id=entry_id, as_of=created_at)
+            for entry_id, account_id, created_at in (
+                CoinEntryModel.objects.filter(id__in=list(last_ids)).values_list("id", "account_id", "created_at")
+            )
+            if account_id in balances
+        ]
+        CoinSnapshotModel.objects.bulk_create(snapshots, ignore_conflicts=True)
+    return len(snapshots)
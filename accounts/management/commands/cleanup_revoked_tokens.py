@@ -0,0 +1,17 @@
+"""
+Delete revocations of refresh tokens that have expired.
+"""
+from django.core.management.base import BaseCommand
+
+from accounts.revocation import cleanup_revoked_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired RevokedTokenModel rows in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = cleanup_revoked_tokens(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired revocations."))
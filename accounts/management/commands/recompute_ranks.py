@@ -0,0 +1,29 @@
+"""
+Recompute customer, seller and delivery boy ranks.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.ranks import (RANK_FIELDS,
+                            recompute_ranks)
+
+
+class Command(BaseCommand):
+    help = "Score every customer, seller and delivery boy and store the ranks that changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--role", choices=list(RANK_FIELDS), action="append", default=None,
+                            help="Recompute only this role, can be repeated.")
+        parser.add_argument("--dry-run", action="store_true", help="Report the ranks without writing them.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Ids per UPDATE.")
+
+    def handle(self, *args, **options):
+        for account_type in options["role"] or RANK_FIELDS:
+            started = time.perf_counter()
+            result = recompute_ranks(account_type, options["dry_run"], options["batch_size"])
+            ranks = ", ".join(f"{rank}: {count}" for rank, count in result["ranks"].items())
+            self.stdout.write(self.style.SUCCESS(
+                f"{account_type}: {result['rows']} rows, {result['changed']} changed "
+                f"in {time.perf_counter() - started:.1f}s ({ranks})."
+            ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_customermodel_is_active_and_more'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usermanagementmodel',
+            index=models.Index(fields=['district'], name='accounts_us_distric_6fc4bf_idx'),
+        ),
+    ]
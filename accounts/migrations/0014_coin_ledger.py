@@ -0,0 +1,58 @@
+# Generated by Django 5.1.6 on 2026-10-19 08:11
+
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    """Give every non-zero clo_coin an opening entry so balances equal the ledger sum."""
+    CoinEntryModel = apps.get_model("accounts", "CoinEntryModel")
+    for account_type, model_name in [("customer", "CustomerModel"), ("seller", "SellerModel"),
+                                     ("deliveryboy", "DeliveryBoyModel")]:
+        balances = apps.get_model("accounts", model_name).objects.filter(clo_coin__gt=0).values_list("id", "clo_coin")
+        CoinEntryModel.objects.bulk_create(
+            (CoinEntryModel(account_type=account_type, account_id=account_id, amount=balance, reason="opening")
+             for account_id, balance in balances.iterator()),
+            batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_revokedtokenmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoinEntryModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_type', models.CharField(choices=[('customer', 'Customer'), ('seller', 'Seller'), ('deliveryboy', 'Delivery Boy')], max_length=11)),
+                ('account_id', models.PositiveBigIntegerField()),
+                ('amount', models.IntegerField()),
+                ('reason', models.CharField(max_length=50)),
+                ('reference', models.CharField(blank=True, default='', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['account_type', 'account_id', 'id'], name='accounts_co_account_d8c39e_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CoinSnapshotModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_type', models.CharField(choices=[('customer', 'Customer'), ('seller', 'Seller'), ('deliveryboy', 'Delivery Boy')], max_length=11)),
+                ('account_id', models.PositiveBigIntegerField()),
+                ('balance', models.PositiveIntegerField()),
+                ('last_entry_id', models.PositiveBigIntegerField()),
+                ('as_of', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['account_type', 'account_id', 'as_of'], name='accounts_co_account_c9ddc4_idx')],
+                'constraints': [models.UniqueConstraint(fields=('account_type', 'account_id', 'last_entry_id'), name='unique_coin_snapshot')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
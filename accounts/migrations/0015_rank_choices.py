@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-19 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_coin_ledger'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customermodel',
+            name='customer_rank',
+            field=models.CharField(choices=[('1', 'Noob'), ('2', 'Bronze'), ('3', 'Silver'), ('4', 'Gold'), ('5', 'Platinum')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='deliveryboymodel',
+            name='delivery_boy_rank',
+            field=models.CharField(choices=[('1', 'Noob'), ('2', 'Bronze'), ('3', 'Silver'), ('4', 'Gold'), ('5', 'Platinum')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='sellermodel',
+            name='seller_rank',
+            field=models.CharField(choices=[('1', 'Noob'), ('2', 'Bronze'), ('3', 'Silver'), ('4', 'Gold'), ('5', 'Platinum')], max_length=10),
+        ),
+    ]
@@ -7,7 +7,8 @@ from core.globalchoices import (DISTRICT_CHOICES,
                                 STATE_CHOICES,
                                 CUSTOMER_RANK_CHOICES,
                                 SELLER_RANK_CHOICES,
-                                DELIVERYBOY_RANK_CHOICES)
+                                DELIVERYBOY_RANK_CHOICES,
+                                COIN_ACCOUNT_CHOICES)
 from clovigo_main import settings
 from core.filepath import (hash_profile,
                             hash_document,
@@ -27,6 +28,11 @@ class UserManagementModel(AbstractUser):
     state = models.CharField(max_length=50, choices=STATE_CHOICES)
     pincode = models.CharField(max_length=10, null=True, blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["district"]),
+        ]
+
     def save(self, *args, **kwargs):
         """Ensure username is always saved in lowercase."""
         if self.username:
@@ -111,4 +117,57 @@ class OTPVerifyModel(models.Model):
     user = models.OneToOneField(UserManagementModel, on_delete=models.CASCADE)
 
     def __str__(self):
-        return f"OTP model of {self.user.username}"
\ No newline at end of file
+        return f"OTP model of {self.user.username}"
+
+
+class RevokedTokenModel(models.Model):
+    """Refresh token ids that can't be used anymore, kept until the token expires."""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Revoked token {self.jti}"
+
+
+class CoinEntryModel(models.Model):
+    """
+    Append-only clo_coin ledger. Every entry changes the role's clo_coin by `amount`
+    in the same transaction, so clo_coin is always the sum of its entries.
+    """
+    account_type = models.CharField(max_length=11, choices=COIN_ACCOUNT_CHOICES)
+    account_id = models.PositiveBigIntegerField()
+    amount = models.IntegerField()
+    reason = models.CharField(max_length=50)
+    reference = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["account_type", "account_id", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.account_type} {self.account_id} {self.amount:+d}"
+
+
+class CoinSnapshotModel(models.Model):
+    """clo_coin balance of a role including all its entries up to `last_entry_id`."""
+    account_type = models.CharField(max_length=11, choices=COIN_ACCOUNT_CHOICES)
+    account_id = models.PositiveBigIntegerField()
+    balance = models.PositiveIntegerField()
+    last_entry_id = models.PositiveBigIntegerField()
+    as_of = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["account_type", "account_id", "last_entry_id"],
+                                    name="unique_coin_snapshot"),
+        ]
+        indexes = [
+            models.Index(fields=["account_type", "account_id", "as_of"]),
+        ]
+
+    def __str__(self):
+        return f"{self.account_type} {self.account_id} at {self.as_of}"
@@ -0,0 +1,47 @@
+"""
+Role based permissions for Customer, Seller and Delivery Boy endpoints.
+"""
+from rest_framework.permissions import BasePermission
+
+from accounts.models import (CustomerModel,
+                             SellerModel,
+                             DeliveryBoyModel)
+
+
+class _RolePermission(BasePermission):
+    """
+    Allow authenticated users holding an active role.
+    The role row is attached to the request so views don't fetch it again.
+    """
+    model = None
+    attr = None
+    message = "Account not found or not activated."
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+
+        if getattr(request, self.attr, None) is None:
+            role = self.model.objects.filter(user=user, is_active=True).first()
+            setattr(request, self.attr, role)
+
+        return getattr(request, self.attr) is not None
+
+
+class IsCustomer(_RolePermission):
+    """Active customer, available as `request.customer`."""
+    model = CustomerModel
+    attr = "customer"
+
+
+class IsSeller(_RolePermission):
+    """Active seller, available as `request.seller`."""
+    model = SellerModel
+    attr = "seller"
+
+
+class IsDeliveryBoy(_RolePermission):
+    """Active delivery boy, available as `request.deliveryboy`."""
+    model = DeliveryBoyModel
+    attr = "deliveryboy"
@@ -0,0 +1,154 @@
+"""
+Rank engine for customers, sellers and delivery boys.
+
+The database aggregates activity per role row (delivered orders from the
+live and archived tables, reviews, units sold, deliveries) and the rows are
+streamed into NumPy column arrays next to each role's ids, clo_coin and
+current rank. Scores and ranks are computed for the whole role at once with
+array operations, and only rows whose rank changed are written back.
+"""
+import numpy as np
+from django.db import transaction
+from django.db.models import Avg, Count, Sum
+
+from clovigo_main import settings
+from accounts.models import (CustomerModel,
+                             SellerModel,
+                             DeliveryBoyModel)
+from orders.models import (OrderModel,
+                           ArchivedOrderModel)
+from products.models import ReviewModel
+
+
+ORDER_TABLES = [OrderModel, ArchivedOrderModel]
+
+RANK_FIELDS = {
+    "customer": (CustomerModel, "customer_rank"),
+    "seller": (SellerModel, "seller_rank"),
+    "deliveryboy": (DeliveryBoyModel, "delivery_boy_rank"),
+}
+
+STREAM_CHUNK_SIZE = 10000
+
+
+def _rank_number(value):
+    return int(value) if value.isdigit() else 0
+
+
+def _accounts(model, field):
+    """Ids, clo_coin and current rank of every row of `model`, ordered by id."""
+    rows = model.objects.order_by("id").values_list("id", "clo_coin", field).iterator(chunk_size=STREAM_CHUNK_SIZE)
+    columns = np.fromiter(
+        ((id, coins, _rank_number(rank)) for id, coins, rank in rows),
+        dtype=[("id", np.int64), ("coins", np.float64), ("rank", np.int8)]
+    )
+    return columns["id"], columns["coins"], columns["rank"]
+
+
+def _grouped(queryset, key, **aggregates):
+    """Keys and aggregate columns of `queryset` grouped by `key`, None keys left out."""
+    rows = (
+        queryset.filter(**{f"{key}__isnull": False}).order_by().values(key)
+        .annotate(**aggregates).values_list(key, *aggregates).iterator(chunk_size=STREAM_CHUNK_SIZE)
+    )
+    dtype = [("key", np.int64)] + [(name, np.float64) for name in aggregates]
+    columns = np.fromiter(rows, dtype=dtype)
+    return columns["key"], [columns[name] for name in aggregates]
+
+
+def _spread(ids, keys, values):
+    """Column aligned with `ids` holding `values` at their `keys`, 0 elsewhere."""
+    column = np.zeros(len(ids))
+    if len(ids) and len(keys):
+        positions = np.searchsorted(ids, keys).clip(max=len(ids) - 1)
+        found = ids[positions] == keys
+        column[positions[found]] = values[found]
+    return column
+
+
+def _delivered(ids, key, value=None):
+    """Delivered orders (or the sum of `value`) per id over the live and archived orders."""
+    total = np.zeros(len(ids))
+    for model in ORDER_TABLES:
+        aggregate = Sum(value) if value else Count("id")
+        keys, (counts,) = _grouped(model.objects.filter(order_status="D"), key, n=aggregate)
+        total += _spread(ids, keys, counts)
+    return total
+
+
+def customer_scores(ids, coins):
+    weights = settings.RANK_WEIGHTS["customer"]
+    keys, (reviews,) = _grouped(ReviewModel.objects.all(), "customer", n=Count("id"))
+    return (weights["orders"] * np.log1p(_delivered(ids, "customer"))
+            + weights["reviews"] * np.log1p(_spread(ids, keys, reviews))
+            + weights["coins"] * np.log1p(coins))
+
+
+def seller_scores(ids, coins):
+    """Units sold, plus review count weighted by the rating shrunk towards the overall average."""
+    weights = settings.RANK_WEIGHTS["seller"]
+    keys, (count, average) = _grouped(ReviewModel.objects.all(), "product__seller", n=Count("id"), rating=Avg("rating"))
+    count = _spread(ids, keys, count)
+    average = _spread(ids, keys, average)
+
+    prior = settings.RANK_RATING_PRIOR
+    overall = np.average(average[count > 0], weights=count[count > 0]) if count.any() else 0
+    rating = (average * count + overall * prior) / (count + prior) / 5
+
+    return (weights["sales"] * np.log1p(_delivered(ids, "product__seller", "quantity"))
+            + weights["rating"] * rating * np.log1p(count)
+            + weights["coins"] * np.log1p(coins))
+
+
+def deliveryboy_scores(ids, coins):
+    weights = settings.RANK_WEIGHTS["deliveryboy"]
+    return (weights["deliveries"] * np.log1p(_delivered(ids, "delivery_boy"))
+            + weights["coins"] * np.log1p(coins))
+
+
+SCORERS = {
+    "customer": customer_scores,
+    "seller": seller_scores,
+    "deliveryboy": deliveryboy_scores,
+}
+
+
+def assign_ranks(scores, percentiles=None):
+    """Rank 1 without any activity, otherwise 2 plus the number of percentile cutoffs the score is above."""
+    percentiles = settings.RANK_PERCENTILES if percentiles is None else percentiles
+    ranks = np.ones(len(scores), dtype=np.int8)
+    active = scores > 0
+    if active.any():
+        cutoffs = np.percentile(scores[active], percentiles)
+        ranks[active] = 2 + np.searchsorted(cutoffs, scores[active], side="left")
+    return ranks
+
+
+def _write_ranks(model, field, ids, ranks, batch_size):
+    # Changed rows are grouped by their new rank, one UPDATE ... WHERE id IN per batch.
+    with transaction.atomic():
+        for rank in np.unique(ranks):
+            rank_ids = ids[ranks == rank].tolist()
+            for start in range(0, len(rank_ids), batch_size):
+                model.objects.filter(id__in=rank_ids[start:start + batch_size]).update(**{field: str(rank)})
+
+
+def recompute_ranks(account_type, dry_run=False, batch_size=None):
+    """
+    Score every row of a role and store the ranks that changed.
+    Returns the row count, how many changed and how many rows hold each rank.
+    """
+    model, field = RANK_FIELDS[account_type]
+    ids, coins, current = _accounts(model, field)
+    ranks = assign_ranks(SCORERS[account_type](ids, coins))
+
+    changed = ranks != current
+    if not dry_run and changed.any():
+        _write_ranks(model, field, ids[changed], ranks[changed], batch_size or settings.RANK_WRITE_BATCH_SIZE)
+
+    values, counts = np.unique(ranks, return_counts=True)
+    return {
+        "rows": len(ids),
+        "changed": int(changed.sum()),
+        "ranks": {str(value): int(count) for value, count in zip(values, counts)},
+    }
@@ -0,0 +1,145 @@
+"""
+Revocation store for refresh tokens.
+
+RevokedTokenModel is the source of truth; the unique `jti` makes revoking a
+token an atomic insert that fails for a token already used. Each process keeps
+a Bloom filter of live revocations, synced incrementally from the table, so
+checking a token that was never revoked costs no query. Expired revocations
+leave the filter through a heap ordered by expiry and the table through
+batched cleanup.
+"""
+import heapq
+import math
+import threading
+import time
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from clovigo_main import settings
+from accounts.models import RevokedTokenModel
+
+
+class BloomFilter:
+    """
+    Fixed size Bloom filter over strings.
+    Positions come from the builtin str hash, which is cached on the string and
+    stable within a process; each process builds its own filter.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key):
+        value = hash(key)
+        first, second = value & 0xFFFFFFFF, (value >> 32) | 1
+        for i in range(self.hashes):
+            position = (first + i * second) % self.size
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        value = hash(key)
+        first, second = value & 0xFFFFFFFF, (value >> 32) | 1
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = (first + i * second) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class RevocationStore:
+    """Per-process view of revoked refresh tokens."""
+
+    def __init__(self, sync_interval, capacity, error_rate):
+        self.sync_interval = sync_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._expiries = []
+        self._expired = 0
+        self._last_id = 0
+        self._synced_at = None
+
+    def _add(self, jti, expires_at):
+        self._bloom.add(jti)
+        heapq.heappush(self._expiries, (expires_at, jti))
+
+    def _rebuild(self):
+        """Reload live revocations into a fresh filter sized for them."""
+        now = timezone.now()
+        rows = list(RevokedTokenModel.objects.filter(expires_at__gt=now).values_list("id", "jti", "expires_at"))
+        self.capacity = max(self.capacity, len(rows) * 2)
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        self._expiries = []
+        self._expired = 0
+        for row_id, jti, expires_at in rows:
+            self._add(jti, expires_at)
+        self._last_id = max([self._last_id] + [row_id for row_id, _, _ in rows])
+
+    def _sync(self):
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+
+        with self._lock:
+            if self._synced_at is None:
+                self._rebuild()
+            else:
+                rows = RevokedTokenModel.objects.filter(id__gt=self._last_id).values_list("id", "jti", "expires_at")
+                for row_id, jti, expires_at in rows:
+                    self._add(jti, expires_at)
+                    self._last_id = row_id
+
+            # Forget expired entries, rebuild once they dominate the filter.
+            current = timezone.now()
+            while self._expiries and self._expiries[0][0] <= current:
+                heapq.heappop(self._expiries)
+                self._expired += 1
+            if self._expired > len(self._expiries) or len(self._expiries) > self.capacity:
+                self._rebuild()
+
+            self._synced_at = now
+
+    def might_be_revoked(self, jti):
+        """False means the token is certainly not revoked as of the last sync."""
+        self._sync()
+        return jti in self._bloom
+
+    def is_revoked(self, jti):
+        """Exact check, the table is only queried for Bloom filter hits."""
+        return self.might_be_revoked(jti) and RevokedTokenModel.objects.filter(jti=jti).exists()
+
+    def revoke(self, jti, expires_at):
+        """Revoke a token. Returns False when it was already revoked."""
+        try:
+            with transaction.atomic():
+                RevokedTokenModel.objects.create(jti=jti, expires_at=expires_at)
+        except IntegrityError:
+            return False
+
+        with self._lock:
+            self._add(jti, expires_at)
+        return True
+
+
+def cleanup_revoked_tokens(batch_size=1000):
+    """Delete expired revocations in batches and return how many were removed."""
+    deleted = 0
+    now = timezone.now()
+    while True:
+        ids = list(RevokedTokenModel.objects.filter(expires_at__lte=now).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += RevokedTokenModel.objects.filter(id__in=ids).delete()[0]
+
+
+revocation_store = RevocationStore(
+    settings.REVOCATION_SYNC_INTERVAL,
+    settings.REVOCATION_BLOOM_CAPACITY,
+    settings.REVOCATION_BLOOM_ERROR_RATE
+)
@@ -8,10 +8,19 @@ from accounts.models import (UserManagementModel,
 from accounts.utils import (send_otp,
                             generate_first_otp,
                             create_otp_model_first)
+from accounts.tasks import deliver_otp
 
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.utils import timezone
 
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.revocation import revocation_store
+
 import random
 
 from django.contrib.auth import get_user_model
@@ -50,7 +59,7 @@ class CustomerSignUpSerializer(serializers.ModelSerializer):
         fields = ["user"]
 
     def create(self, validated_data):
-        """Send OTP and create CustomerModel."""
+        """Queue the OTP and create CustomerModel."""
         user_data = validated_data.pop("user")
 
         ######################## Need to add this to verify if the user already exists or registered with this phone_no
@@ -61,9 +70,10 @@ class CustomerSignUpSerializer(serializers.ModelSerializer):
         #         raise serializers.ValidationError("User with this mobile number exists but is not verified. Please verify OTP.")
         #     raise serializers.ValidationError("User with this mobile number already exists. Please try logging in.")
             
-        otp = generate_first_otp(user_data["phone_no"])
+        otp = generate_first_otp()
         user = UserManagementSignUpSerializer().create(user_data)
-        create_otp_model_first(user, otp)
+        otp_entry = create_otp_model_first(user, otp)
+        deliver_otp.enqueue(otp_id=otp_entry.id)
         customer = CustomerModel.objects.create(user=user, **validated_data)
         return customer
 
@@ -77,11 +87,12 @@ class SellerSignUpSerializer(serializers.ModelSerializer):
         exclude = ["is_active", "is_otp", "clo_coin", "seller_rank", "created_at", "updated_at"]
 
     def create(self, validated_data):
-        """Send OTP and create SellerModel."""
+        """Queue the OTP and create SellerModel."""
         user_data = validated_data.pop("user")
-        otp = generate_first_otp(user_data["phone_no"])
+        otp = generate_first_otp()
         user = UserManagementSignUpSerializer().create(user_data)
-        create_otp_model_first(user, otp)
+        otp_entry = create_otp_model_first(user, otp)
+        deliver_otp.enqueue(otp_id=otp_entry.id)
         seller = SellerModel.objects.create(user=user, **validated_data)
         return seller
 
@@ -95,11 +106,12 @@ class DeliveryBoySignUpSerializer(serializers.ModelSerializer):
         fields = ["license_no", "file_license", "user"]
 
     def create(self, validated_data):
-        """Send OTP and create DeliveryBoyModel."""
+        """Queue the OTP and create DeliveryBoyModel."""
         user_data = validated_data.pop("user")
-        otp = generate_first_otp(user_data["phone_no"])
+        otp = generate_first_otp()
         user = UserManagementSignUpSerializer().create(user_data)
-        create_otp_model_first(user, otp)
+        otp_entry = create_otp_model_first(user, otp)
+        deliver_otp.enqueue(otp_id=otp_entry.id)
         deliveryboy = DeliveryBoyModel.objects.create(user=user, **validated_data)
         return deliveryboy
 
@@ -173,3 +185,72 @@ class LoginResponseSerializer(serializers.Serializer):
     user_id = serializers.IntegerField()
     username = serializers.CharField()
 
+
+
+def revoke_refresh_token(token):
+    """Revoke a decoded refresh token, False when it was revoked already."""
+    expires_at = datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+    return revocation_store.revoke(token[jwt_settings.JTI_CLAIM], expires_at)
+
+
+class TokenRefreshRotateSerializer(TokenRefreshSerializer):
+    """
+    Refresh with rotation.
+    The used refresh token is revoked, so each one can be exchanged only once.
+    """
+
+    def validate(self, attrs):
+        """Reject revoked tokens and revoke the one being rotated."""
+        try:
+            token = self.token_class(attrs["refresh"])
+        except TokenError as error:
+            raise InvalidToken(error.args[0])
+
+        if revocation_store.is_revoked(token[jwt_settings.JTI_CLAIM]):
+            raise InvalidToken("Token is revoked")
+
+        user = User.objects.filter(**{jwt_settings.USER_ID_FIELD: token.get(jwt_settings.USER_ID_CLAIM)}).first()
+        if user is None or not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        # Revoking is an insert on a unique jti, a concurrent reuse of the same token loses here.
+        if not revoke_refresh_token(token):
+            raise InvalidToken("Token is revoked")
+
+        data = {"access": str(token.access_token)}
+        token.set_jti()
+        token.set_exp()
+        token.set_iat()
+        data["refresh"] = str(token)
+        return data
+
+
+class LogoutSerializer(serializers.Serializer):
+    """Revoke a refresh token."""
+    refresh = serializers.CharField()
+
+    def validate(self, data):
+        """Decode the refresh token."""
+        try:
+            token = RefreshToken(data["refresh"])
+        except TokenError as error:
+            raise serializers.ValidationError({"refresh": error.args[0]})
+
+        return {"token": token}
+
+
+class CoinEntrySerializer(serializers.Serializer):
+    """Serialize a clo_coin ledger entry with the balance after it."""
+    id = serializers.IntegerField()
+    amount = serializers.IntegerField()
+    reason = serializers.CharField()
+    reference = serializers.CharField()
+    balance = serializers.IntegerField()
+    created_at = serializers.DateTimeField()
+
+
+class CoinHistorySerializer(serializers.Serializer):
+    """Serialize a balance and a page of clo_coin entries."""
+    balance = serializers.IntegerField()
+    next = serializers.CharField(allow_null=True)
+    results = CoinEntrySerializer(many=True)
@@ -0,0 +1,43 @@
+"""
+Background tasks of the accounts.
+"""
+from datetime import timedelta
+
+from accounts.coins import snapshot_balances
+from accounts.models import OTPVerifyModel
+from accounts.ranks import (RANK_FIELDS,
+                            recompute_ranks)
+from accounts.utils import (send_otp,
+                            cleanup_expired_otps)
+from clovigo_main import settings
+from core.taskqueue import task
+
+
+@task(priority=10)
+def deliver_otp(otp_id):
+    """
+    Send the current OTP of an OTPVerifyModel by SMS, failing the attempt so it is retried when
+    the gateway refuses it. Only the id is queued, the OTP and phone number never reach the task row.
+    """
+    otp_entry = OTPVerifyModel.objects.select_related("user").filter(id=otp_id).first()
+    if otp_entry is None:
+        # Verified or cleaned up since, nothing left to send.
+        return
+    if not send_otp(otp_entry.user.phone_no, otp_entry.otp):
+        raise RuntimeError(f"OTP {otp_id} was not sent.")
+
+
+@task(every=timedelta(hours=1))
+def expire_otps():
+    cleanup_expired_otps()
+
+
+@task(every=timedelta(seconds=settings.COIN_SNAPSHOT_INTERVAL))
+def snapshot_coin_balances():
+    snapshot_balances()
+
+
+@task(every=timedelta(seconds=settings.RANK_RECOMPUTE_INTERVAL))
+def recompute_all_ranks():
+    for account_type in RANK_FIELDS:
+        recompute_ranks(account_type)
@@ -1,3 +1,98 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from accounts import coins
+from accounts.models import (UserManagementModel,
+                             CustomerModel,
+                             CoinEntryModel,
+                             CoinSnapshotModel)
+
+
+def make_customer(username):
+    user = UserManagementModel.objects.create(username=username, phone_no="9876543210", district="CH", state="TN")
+    return CustomerModel.objects.create(user=user, is_active=True, is_otp=True)
+
+
+class CoinLedgerTests(TestCase):
+    """credit, debit and balances read from snapshots."""
+
+    def setUp(self):
+        self.customer = make_customer("ledger")
+
+    def balance(self):
+        self.customer.refresh_from_db()
+        return self.customer.clo_coin
+
+    def test_credit_and_debit_write_entries(self):
+        coins.credit(self.customer, 100, "bonus")
+        entry = coins.debit(self.customer, 30, "order", "o1")
+
+        self.assertEqual(self.balance(), 70)
+        self.assertEqual((entry.account_type, entry.account_id, entry.amount, entry.reference),
+                         ("customer", self.customer.id, -30, "o1"))
+        self.assertEqual(CoinEntryModel.objects.count(), 2)
+
+    def test_debit_above_balance_leaves_no_entry(self):
+        coins.credit(self.customer, 50, "bonus")
+
+        with self.assertRaises(coins.InsufficientCoins):
+            coins.debit(self.customer, 51, "order")
+
+        self.assertEqual(self.balance(), 50)
+        self.assertEqual(list(CoinEntryModel.objects.values_list("amount", flat=True)), [50])
+
+    def test_debit_of_the_whole_balance(self):
+        coins.credit(self.customer, 20, "bonus")
+        coins.debit(self.customer, 20, "order")
+
+        self.assertEqual(self.balance(), 0)
+        with self.assertRaises(coins.InsufficientCoins):
+            coins.debit(self.customer, 1, "order")
+
+    def test_amounts_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            coins.credit(self.customer, 0, "bonus")
+        with self.assertRaises(ValueError):
+            coins.debit(self.customer, -5, "order")
+        self.assertFalse(CoinEntryModel.objects.exists())
+
+    def test_balance_at_reads_snapshot_and_tail(self):
+        before = timezone.now() - timedelta(seconds=1)
+        coins.credit(self.customer, 100, "bonus")
+        coins.debit(self.customer, 30, "order")
+        self.assertEqual(coins.snapshot_balances(), 1)
+        snapshot_taken = timezone.now()
+        coins.credit(self.customer, 5, "refund")
+        coins.credit(self.customer, 1, "refund")
+
+        snapshot = CoinSnapshotModel.objects.get()
+        self.assertEqual(snapshot.balance, 70)
+        with self.assertNumQueries(2):
+            self.assertEqual(coins.balance_at("customer", self.customer.id, timezone.now()), 76)
+        self.assertEqual(coins.balance_at("customer", self.customer.id, snapshot_taken), 70)
+        self.assertEqual(coins.balance_at("customer", self.customer.id, before), 0)
+
+    def test_balance_at_uses_the_snapshot_balance(self):
+        coins.credit(self.customer, 100, "bonus")
+        coins.snapshot_balances()
+        coins.credit(self.customer, 5, "refund")
+        # Entries covered by the snapshot are not summed again.
+        CoinSnapshotModel.objects.update(balance=40)
+
+        self.assertEqual(coins.balance_at("customer", self.customer.id, timezone.now()), 45)
+
+    def test_snapshot_only_accounts_with_new_entries(self):
+        other = make_customer("other")
+        coins.credit(self.customer, 10, "bonus")
+        coins.credit(other, 20, "bonus")
 
-# Create your tests here.
+        self.assertEqual(coins.snapshot_balances(), 2)
+        self.assertEqual(coins.snapshot_balances(), 0)
+        coins.credit(other, 1, "bonus")
+        self.assertEqual(coins.snapshot_balances(), 1)
+        self.assertEqual(
+            list(CoinSnapshotModel.objects.filter(account_id=other.id).order_by("id").values_list("balance", flat=True)),
+            [20, 21]
+        )
@@ -7,7 +7,10 @@ from accounts.views import (CustomerSignUpView,
                             OTPResendView,
                             SellerSignUpView,
                             DeliveryBoySignUpView,
-                            LoginUserView)
+                            LoginUserView,
+                            TokenRefreshRotateView,
+                            LogoutView,
+                            CoinHistoryView)
 
 
 app_name = "accounts"
@@ -20,4 +23,8 @@ urlpatterns = [
     path('user/otp/resend/', OTPResendView.as_view(), name="otp_resend"),
 
     path('login/<str:login_user>/', LoginUserView.as_view(), name="login"),
+    path('token/refresh/', TokenRefreshRotateView.as_view(), name="token_refresh"),
+    path('logout/', LogoutView.as_view(), name="logout"),
+
+    path('coins/<str:account_type>/', CoinHistoryView.as_view(), name="coin_history"),
 ]
@@ -8,7 +8,6 @@ import random
 from accounts.models import OTPVerifyModel
 from django.utils import timezone
 from datetime import timedelta
-from rest_framework import serializers
 
 
 # def send_otp(phone_no: int, otp: int) -> bool:
@@ -36,21 +35,26 @@ def send_otp(phone_no: int, otp: int) -> bool:
     print("                             ")
     return result
 
-def generate_first_otp(phone_no) -> int:
-    """Generate OTP and handling OTPVerifyModel."""
-    otp = random.randint(100000, 999999)
-    otp_sent = send_otp(phone_no, otp)
+def generate_first_otp() -> int:
+    """Generate OTP, sent by the deliver_otp task once the signup commits."""
+    return random.randint(100000, 999999)
 
-    if not otp_sent:
-        raise serializers.ValidationError({"otp": "Failed to send OTP. Please try again later."})
-
-    return otp
-
-def create_otp_model_first(user, otp) -> None:
+def create_otp_model_first(user, otp) -> OTPVerifyModel:
     """Create OTPVerifyModel for the user."""
-    OTPVerifyModel.objects.create(
+    return OTPVerifyModel.objects.create(
         user=user,
         otp = otp,
         otp_expiry = timezone.localtime(timezone.now()) + timedelta(minutes=10),
         otp_max_try = OTP_MAX_TRY - 1
     )
+
+def cleanup_expired_otps(batch_size=1000) -> int:
+    """Delete expired OTPs whose resend lockout is over, in batches. Returns how many were removed."""
+    now = timezone.now()
+    expired = OTPVerifyModel.objects.filter(otp_expiry__lt=now).exclude(otp_max_out__gt=now)
+    deleted = 0
+    while True:
+        ids = list(expired.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += OTPVerifyModel.objects.filter(id__in=ids).delete()[0]
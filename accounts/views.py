@@ -11,6 +11,7 @@ from rest_framework.response import Response
 from rest_framework.generics import CreateAPIView
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView
 
 from accounts.serializers import (CustomerSignUpSerializer,
                                   OTPValidateSerializer,
@@ -18,19 +19,38 @@ from accounts.serializers import (CustomerSignUpSerializer,
                                   SellerSignUpSerializer,
                                   DeliveryBoySignUpSerializer,
                                   LoginSerializer,
-                                  LoginResponseSerializer)
+                                  LoginResponseSerializer,
+                                  LogoutSerializer,
+                                  CoinHistorySerializer,
+                                  revoke_refresh_token)
 from accounts.models import (CustomerModel,
                              UserManagementModel,
                              OTPVerifyModel,
                              SellerModel,
-                             DeliveryBoyModel)
-from accounts.utils import send_otp
-
+                             DeliveryBoyModel,
+                             CoinEntryModel)
+from accounts.tasks import deliver_otp
+from accounts.coins import (ACCOUNT_MODELS,
+                            HISTORY_PAGINATION,
+                            balance_at,
+                            coin_history)
+from accounts.permissions import (IsCustomer,
+                                  IsSeller,
+                                  IsDeliveryBoy)
+
+from cart.guest import (read_guest_cart,
+                        merge_guest_cart,
+                        clear_guest_cart)
+
+from core.idempotency import (idempotent,
+                              IdempotentCreateMixin)
 from core.serializers import ErrorResponseSerializer
 
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.contrib.auth import authenticate
 
+from clovigo_main import settings
 from clovigo_main.settings import OTP_MAX_TRY
 
 import random
@@ -54,7 +74,7 @@ from drf_spectacular.utils import (extend_schema,
     },
     tags=["Account Creation"]
 )
-class CustomerSignUpView(CreateAPIView):
+class CustomerSignUpView(IdempotentCreateMixin, CreateAPIView):
     """
     Requires username, password, phone number to create a customer account as inactive.
     Use validated password and phonenumber.
@@ -74,7 +94,7 @@ class CustomerSignUpView(CreateAPIView):
     },
     tags=["Account Creation"]
 )
-class SellerSignUpView(CreateAPIView):
+class SellerSignUpView(IdempotentCreateMixin, CreateAPIView):
     """
     Requires username, password, phone number to create a seller account as inactive.
     Use validated password and phonenumber.
@@ -94,7 +114,7 @@ class SellerSignUpView(CreateAPIView):
     },
     tags=["Account Creation"]
 )
-class DeliveryBoySignUpView(CreateAPIView):
+class DeliveryBoySignUpView(IdempotentCreateMixin, CreateAPIView):
     """
     Requires username, password, phone number to create delivery boy account as inactive.
     Use validated password and phonenumber.
@@ -189,6 +209,7 @@ class OTPResendView(APIView):
         },
         tags=["OTP Management"]
     )
+    @idempotent
     def post(self, request):
         """Resend OTP if applicable."""
         serializer = OTPResendSerializer(data=request.data)
@@ -216,11 +237,7 @@ class OTPResendView(APIView):
                 otp_entry.otp_max_out = timezone.localtime(timezone.now()) + timedelta(hours=1)
 
             otp_entry.save()
-            otp_sent = send_otp(user.phone_no, otp_entry.otp)
-
-            if not otp_sent:
-                return Response({"message": "Failed to send OTP. Please try again later."},
-                                status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            deliver_otp.enqueue(otp_id=otp_entry.id)
 
             return Response({"message": "OTP resent successfully!"}, status=status.HTTP_200_OK)
 
@@ -338,7 +355,7 @@ class LoginUserView(APIView):
             # Generate JWT Tokens
             tokens = RefreshToken.for_user(user)
 
-            return Response(
+            response = Response(
                 {
                     "refresh": str(tokens),
                     "access": str(tokens.access_token),
@@ -348,5 +365,131 @@ class LoginUserView(APIView):
                 status=status.HTTP_200_OK
             )
 
+            # Move the guest cart into the customer's cart
+            if login_user == "customer":
+                guest_lines = read_guest_cart(request)
+                if guest_lines:
+                    merge_guest_cart(customer, guest_lines)
+                    clear_guest_cart(response)
+
+            return response
+
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+@extend_schema(
+    summary="Refresh Tokens",
+    description="Exchange a refresh token for a new access and refresh token. "
+                "The refresh token sent is revoked and can't be used again.",
+    tags=["Authentication"]
+)
+class TokenRefreshRotateView(TokenRefreshView):
+    """Rotate the refresh token, see TokenRefreshRotateSerializer."""
+
+
+class LogoutView(APIView):
+    """
+    Logout any user.
+    Revokes the refresh token, the access token expires on its own.
+    """
+
+    @extend_schema(
+        summary="Logout User",
+        description="Revoke the refresh token.",
+        request=LogoutSerializer,
+        responses={
+            205: OpenApiResponse(
+                response=None,
+                description="Refresh token revoked.",
+            )
+        },
+        tags=["Authentication"]
+    )
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+
+        if serializer.is_valid():
+            revoke_refresh_token(serializer.validated_data["token"])
+            return Response(status=status.HTTP_205_RESET_CONTENT)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CoinHistoryView(APIView):
+    """
+    clo_coin balance and ledger of the user's customer, seller or delivery boy role.
+    With `at`, the balance and entries as they were at that time.
+    """
+    permissions = {
+        "customer": IsCustomer,
+        "seller": IsSeller,
+        "deliveryboy": IsDeliveryBoy,
+    }
+
+    def get_permissions(self):
+        permission = self.permissions.get(self.kwargs.get("account_type"), IsCustomer)
+        return [permission()]
+
+    @extend_schema(
+        summary="clo_coin history",
+        description="Balance and entries newest first, each with the balance after it. "
+                    "Pass `next` of the previous page as `cursor`.",
+        parameters=[
+            OpenApiParameter(name="account_type", type=str, location=OpenApiParameter.PATH,
+                             enum=list(ACCOUNT_MODELS), description="Role whose coins to list."),
+            OpenApiParameter(name="cursor", type=str, location=OpenApiParameter.QUERY,
+                             description="Cursor returned by the previous page.", required=False),
+            OpenApiParameter(name="page_size", type=int, location=OpenApiParameter.QUERY,
+                             description=f"Entries per page, at most {settings.COIN_HISTORY_PAGE_SIZE * 5}.",
+                             required=False),
+            OpenApiParameter(name="at", type=str, location=OpenApiParameter.QUERY,
+                             description="ISO 8601 time to report the balance and entries at.", required=False),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=CoinHistorySerializer,
+                description="Balance and page of entries.",
+            ),
+            400: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Malformed cursor or time.",
+            ),
+            404: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Unknown role.",
+            )
+        },
+        tags=["Coins"]
+    )
+    def get(self, request, account_type):
+        if account_type not in self.permissions:
+            return Response({"error": "Unknown role."}, status=status.HTTP_404_NOT_FOUND)
+        account = getattr(request, account_type)
+
+        position = None
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            position = HISTORY_PAGINATION.decode(cursor, CoinEntryModel)
+            if position is None:
+                return Response({"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        until = None
+        if request.query_params.get("at"):
+            try:
+                until = parse_datetime(request.query_params["at"])
+            except ValueError:
+                until = None
+            if until is None:
+                return Response({"error": "Invalid time."}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(until):
+                until = timezone.make_aware(until)
+
+        try:
+            page_size = min(max(int(request.query_params.get("page_size")), 1), settings.COIN_HISTORY_PAGE_SIZE * 5)
+        except (TypeError, ValueError):
+            page_size = settings.COIN_HISTORY_PAGE_SIZE
+
+        rows, next_cursor = coin_history(account_type, account.id, position, page_size, until)
+        balance = account.clo_coin if until is None else balance_at(account_type, account.id, until)
+        data = CoinHistorySerializer({"balance": balance, "next": next_cursor, "results": rows}).data
+        return Response(data, status=status.HTTP_200_OK)
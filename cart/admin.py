@@ -2,6 +2,18 @@ from django.contrib import admin
 from cart.models import (CartModel,
                          FavoriteModel)
 
+from core.admin import LargeTableAdmin
 
-admin.site.register(CartModel)
-admin.site.register(FavoriteModel)
\ No newline at end of file
+
+@admin.register(CartModel)
+class CartModelAdmin(LargeTableAdmin):
+    list_display = ["id", "customer", "product", "quantity", "updated_at"]
+    list_select_related = ["customer__user", "product"]
+    raw_id_fields = ["customer", "product"]
+
+
+@admin.register(FavoriteModel)
+class FavoriteModelAdmin(LargeTableAdmin):
+    list_display = ["id", "customer", "product", "created_at"]
+    list_select_related = ["customer__user", "product"]
+    raw_id_fields = ["customer", "product"]
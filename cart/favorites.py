@@ -0,0 +1,69 @@
+"""
+Per-customer cache of favorite product ids.
+
+The set is loaded with one query on first use, so flagging a page of products
+is a membership test. It is cached under a per-customer version that every
+add/remove increments once its transaction commits, instead of editing the
+cached set in place: an increment is atomic in the shared cache, and a set
+loaded concurrently with a write is stored under the old version that no
+reader asks for anymore. This only holds when every process shares the cache
+(see CACHES in the settings).
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from clovigo_main import settings
+from cart.models import FavoriteModel
+
+
+def _key(customer_id, version):
+    return f"cart:favorites:{customer_id}:{version}"
+
+
+def _version_key(customer_id):
+    return f"cart:favorites:version:{customer_id}"
+
+
+def _version(customer_id):
+    key = _version_key(customer_id)
+    version = cache.get(key)
+    if version is None:
+        # A fresh start value, so an evicted version never brings back sets cached under it.
+        cache.add(key, time.time_ns(), settings.FAVORITES_CACHE_TTL)
+        version = cache.get(key)
+    return version
+
+
+def _bump(customer_id):
+    try:
+        cache.incr(_version_key(customer_id))
+    except ValueError:
+        # No version cached, the next read starts a new one.
+        pass
+
+
+def favorite_ids(customer_id):
+    """Product ids favorited by the customer."""
+    key = _key(customer_id, _version(customer_id))
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(FavoriteModel.objects.filter(customer_id=customer_id).values_list("product_id", flat=True))
+        cache.set(key, ids, settings.FAVORITES_CACHE_TTL)
+    return ids
+
+
+def add_favorite(customer_id, product_id):
+    """Favorite a product, adding it twice is a no-op."""
+    FavoriteModel.objects.bulk_create(
+        [FavoriteModel(customer_id=customer_id, product_id=product_id)],
+        ignore_conflicts=True
+    )
+    transaction.on_commit(lambda: _bump(customer_id))
+
+
+def remove_favorite(customer_id, product_id):
+    """Remove a favorite, removing a missing one is a no-op."""
+    FavoriteModel.objects.filter(customer_id=customer_id, product_id=product_id).delete()
+    transaction.on_commit(lambda: _bump(customer_id))
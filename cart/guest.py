@@ -0,0 +1,113 @@
+"""
+Guest cart kept in a signed cookie.
+
+Anonymous users add to cart without an account and without any database
+write. On customer login the cookie is merged into CartModel with one
+upsert, adding the quantities in SQL, and cleared.
+"""
+from django.core import signing
+from django.db import connection
+from django.utils import timezone
+
+from clovigo_main import settings
+from cart.models import CartModel
+from products.models import ProductModel
+
+
+SALT = "cart.guest"
+
+
+def read_guest_cart(request):
+    """`{product_id: quantity}` from the request cookie, empty when missing or tampered."""
+    raw = request.COOKIES.get(settings.GUEST_CART_COOKIE)
+    if not raw:
+        return {}
+
+    try:
+        lines = signing.loads(raw, salt=SALT, max_age=settings.GUEST_CART_MAX_AGE)
+    except signing.BadSignature:
+        return {}
+
+    try:
+        return {int(product_id): int(quantity) for product_id, quantity in lines if int(quantity) > 0}
+    except (TypeError, ValueError):
+        return {}
+
+
+def write_guest_cart(response, lines):
+    """Store the lines on the response, dropping the cookie when the cart is empty."""
+    if not lines:
+        clear_guest_cart(response)
+        return
+
+    value = signing.dumps(sorted(lines.items()), salt=SALT, compress=True)
+    response.set_cookie(
+        settings.GUEST_CART_COOKIE,
+        value,
+        max_age=settings.GUEST_CART_MAX_AGE,
+        httponly=True,
+        samesite="Lax"
+    )
+
+
+def clear_guest_cart(response):
+    response.delete_cookie(settings.GUEST_CART_COOKIE, samesite="Lax")
+
+
+def apply_guest_lines(lines, updates):
+    """
+    Set quantities from `(product_id, quantity)` pairs, 0 removes the line.
+    Returns the new lines and an error message when the cart would be too big.
+    """
+    lines = dict(lines)
+    for product_id, quantity in updates:
+        if quantity:
+            lines[product_id] = quantity
+        else:
+            lines.pop(product_id, None)
+
+    if len(lines) > settings.GUEST_CART_MAX_LINES:
+        return None, f"Guest cart can't hold more than {settings.GUEST_CART_MAX_LINES} products."
+    return lines, None
+
+
+def _merge_sql(rows):
+    """INSERT of `rows` lines whose conflicts add the new quantity to the stored one, capped."""
+    meta = CartModel._meta
+    quote = connection.ops.quote_name
+    table = quote(meta.db_table)
+    customer, product, quantity, created_at, updated_at = (
+        quote(meta.get_field(name).column)
+        for name in ("customer", "product", "quantity", "created_at", "updated_at")
+    )
+    total = f"{table}.{quantity} + excluded.{quantity}"
+    values = ", ".join(["(%s, %s, %s, %s, %s)"] * rows)
+    return (
+        f"INSERT INTO {table} ({customer}, {product}, {quantity}, {created_at}, {updated_at}) VALUES {values} "
+        f"ON CONFLICT ({customer}, {product}) DO UPDATE SET "
+        f"{quantity} = CASE WHEN {total} > %s THEN %s ELSE {total} END, {updated_at} = excluded.{updated_at}"
+    )
+
+
+def merge_guest_cart(customer, lines):
+    """
+    Add guest lines to the customer's cart, summing quantities of products already in it.
+    Lines of deleted products are dropped. Written with a single upsert that sums in SQL,
+    so a cart write landing concurrently with the merge isn't overwritten.
+    """
+    if not lines:
+        return 0
+
+    product_ids = sorted(ProductModel.objects.filter(id__in=lines).values_list("id", flat=True))
+    if not product_ids:
+        return 0
+
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    params = []
+    for product_id in product_ids:
+        params += [customer.id, product_id, min(lines[product_id], settings.CART_MAX_QUANTITY), now, now]
+    params += [settings.CART_MAX_QUANTITY, settings.CART_MAX_QUANTITY]
+
+    with connection.cursor() as cursor:
+        cursor.execute(_merge_sql(len(product_ids)), params)
+    return len(product_ids)
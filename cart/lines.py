@@ -0,0 +1,105 @@
+"""
+Cart line writes and totals.
+
+Batch edits are all or nothing: unknown products reject the whole batch
+before anything is written, otherwise it becomes one upsert plus one delete
+in a transaction. The cart with its totals
+is read with a single query where window sums carry the totals on every line.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (BooleanField,
+                              Case,
+                              DecimalField,
+                              ExpressionWrapper,
+                              F,
+                              Sum,
+                              Value,
+                              When,
+                              Window)
+
+from cart.models import CartModel
+from products.models import ProductModel
+
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Decimal("0.00")
+
+
+def apply_cart_lines(customer, updates):
+    """
+    Set quantities from `(product_id, quantity)` pairs, 0 removes the product.
+    Returns the ids of products that don't exist, nothing at all is written when there are any.
+    """
+    quantities = dict(updates)
+    known = set(ProductModel.objects.filter(id__in=quantities).values_list("id", flat=True))
+    missing = sorted(set(quantities) - known)
+    if missing:
+        return missing
+
+    remove = [product_id for product_id in known if not quantities[product_id]]
+    keep = [product_id for product_id in known if quantities[product_id]]
+
+    with transaction.atomic():
+        if keep:
+            CartModel.objects.bulk_create(
+                [CartModel(customer=customer, product_id=product_id, quantity=quantities[product_id])
+                 for product_id in keep],
+                update_conflicts=True,
+                unique_fields=["customer", "product"],
+                update_fields=["quantity", "updated_at"]
+            )
+        if remove:
+            CartModel.objects.filter(customer=customer, product_id__in=remove).delete()
+
+    return missing
+
+
+def cart_summary(customer):
+    """
+    Lines of the customer's cart with prices, stock and totals, in one query.
+    Cart totals are window sums repeated on every line, read off the first one.
+    """
+    line_actual = ExpressionWrapper(F("quantity") * F("product__actual_price"), output_field=MONEY)
+    line_price = ExpressionWrapper(F("quantity") * F("product__discount_price"), output_field=MONEY)
+    out_of_stock = Case(When(quantity__gt=F("product__stocks"), then=Value(1)), default=Value(0))
+    whole_cart = {"partition_by": [F("customer")]}
+
+    lines = list(
+        CartModel.objects.filter(customer=customer)
+        .annotate(
+            line_actual=line_actual,
+            line_price=line_price,
+            savings=ExpressionWrapper(line_actual - line_price, output_field=MONEY),
+            in_stock=Case(When(quantity__lte=F("product__stocks"), then=Value(True)),
+                          default=Value(False), output_field=BooleanField()),
+            total_items=Window(Sum("quantity"), **whole_cart),
+            total_actual=Window(Sum(line_actual), **whole_cart),
+            total_price=Window(Sum(line_price), **whole_cart),
+            total_out_of_stock=Window(Sum(out_of_stock), **whole_cart),
+        )
+        .order_by("created_at", "id")
+        .values(
+            "product", "quantity", "in_stock", "line_actual", "line_price", "savings",
+            "total_items", "total_actual", "total_price", "total_out_of_stock",
+            product_name=F("product__product_name"),
+            actual_price=F("product__actual_price"),
+            discount_price=F("product__discount_price"),
+            stocks=F("product__stocks"),
+        )
+    )
+
+    if not lines:
+        totals = {"items": 0, "actual_price": ZERO, "discount_price": ZERO, "savings": ZERO, "all_in_stock": True}
+    else:
+        first = lines[0]
+        totals = {
+            "items": first["total_items"],
+            "actual_price": first["total_actual"],
+            "discount_price": first["total_price"],
+            "savings": first["total_actual"] - first["total_price"],
+            "all_in_stock": not first["total_out_of_stock"],
+        }
+
+    return {"lines": lines, "totals": totals}
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-19 07:40
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_favorites(apps, schema_editor):
+    """Keep the oldest favorite per (customer, product) before adding the constraint."""
+    FavoriteModel = apps.get_model("cart", "FavoriteModel")
+    keep = (
+        FavoriteModel.objects.values("customer", "product")
+        .annotate(first=Min("id"))
+        .values("first")
+    )
+    FavoriteModel.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_customermodel_is_active_and_more'),
+        ('cart', '0001_initial'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_favorites, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='favoritemodel',
+            constraint=models.UniqueConstraint(fields=('customer', 'product'), name='unique_favorite_customer_product'),
+        ),
+    ]
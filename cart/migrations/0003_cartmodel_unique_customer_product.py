@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-19 07:41
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def remove_duplicate_cart_lines(apps, schema_editor):
+    """Keep the latest cart line per (customer, product) before adding the constraint."""
+    CartModel = apps.get_model("cart", "CartModel")
+    keep = (
+        CartModel.objects.values("customer", "product")
+        .annotate(last=Max("id"))
+        .values("last")
+    )
+    CartModel.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_customermodel_is_active_and_more'),
+        ('cart', '0002_favoritemodel_unique_customer_product'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_cart_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartmodel',
+            constraint=models.UniqueConstraint(fields=('customer', 'product'), name='unique_cart_customer_product'),
+        ),
+    ]
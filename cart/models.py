@@ -11,6 +11,11 @@ class CartModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["customer", "product"], name="unique_cart_customer_product"),
+        ]
+
 
 class FavoriteModel(models.Model):
     product = models.ForeignKey(ProductModel, on_delete=models.CASCADE)
@@ -18,3 +23,8 @@ class FavoriteModel(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["customer", "product"], name="unique_favorite_customer_product"),
+        ]
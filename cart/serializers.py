@@ -0,0 +1,71 @@
+from rest_framework import serializers
+
+from clovigo_main import settings
+
+
+class FavoriteListSerializer(serializers.Serializer):
+    """Favorite product ids visualise for Swagger UI."""
+    products = serializers.ListField(child=serializers.IntegerField())
+
+
+class FavoriteStatusSerializer(serializers.Serializer):
+    """Favorite toggle visualise for Swagger UI."""
+    product = serializers.IntegerField()
+    is_favorited = serializers.BooleanField()
+
+
+class CartLineSerializer(serializers.Serializer):
+    """Quantity of a product in the cart, 0 removes it."""
+    product = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=0, max_value=settings.CART_MAX_QUANTITY)
+
+
+class GuestCartSerializer(serializers.Serializer):
+    """Batch of guest cart line updates."""
+    lines = CartLineSerializer(many=True, allow_empty=False)
+
+
+class CartBatchSerializer(serializers.Serializer):
+    """Batch of cart line updates."""
+    lines = CartLineSerializer(many=True, allow_empty=False, max_length=settings.CART_MAX_BATCH)
+
+    def validate_lines(self, lines):
+        """Reject the same product twice in one batch."""
+        product_ids = [line["product"] for line in lines]
+        if len(product_ids) != len(set(product_ids)):
+            raise serializers.ValidationError("Each product can appear only once.")
+        return lines
+
+
+class CartQuantitySerializer(serializers.Serializer):
+    """Quantity of a single cart line."""
+    quantity = serializers.IntegerField(min_value=0, max_value=settings.CART_MAX_QUANTITY)
+
+
+class CartItemSerializer(serializers.Serializer):
+    """Cart line with prices and stock."""
+    product = serializers.IntegerField()
+    product_name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    actual_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    discount_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    line_actual = serializers.DecimalField(max_digits=12, decimal_places=2)
+    line_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    savings = serializers.DecimalField(max_digits=12, decimal_places=2)
+    stocks = serializers.IntegerField()
+    in_stock = serializers.BooleanField()
+
+
+class CartTotalsSerializer(serializers.Serializer):
+    """Cart totals."""
+    items = serializers.IntegerField()
+    actual_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    discount_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    savings = serializers.DecimalField(max_digits=12, decimal_places=2)
+    all_in_stock = serializers.BooleanField()
+
+
+class CartSerializer(serializers.Serializer):
+    """Customer cart with totals."""
+    lines = CartItemSerializer(many=True)
+    totals = CartTotalsSerializer()
@@ -0,0 +1,20 @@
+"""
+URL mappings for the cart and favorites.
+"""
+from django.urls import path
+from cart.views import (CartView,
+                        CartLineView,
+                        FavoriteListView,
+                        FavoriteView,
+                        GuestCartView)
+
+
+app_name = "cart"
+
+urlpatterns = [
+    path('', CartView.as_view(), name="cart"),
+    path('<int:product_id>/', CartLineView.as_view(), name="cart_line"),
+    path('guest/', GuestCartView.as_view(), name="guest_cart"),
+    path('favorites/', FavoriteListView.as_view(), name="favorite_list"),
+    path('favorites/<int:product_id>/', FavoriteView.as_view(), name="favorite"),
+]
@@ -1,3 +1,256 @@
-from django.shortcuts import render
+"""
+Views handling the cart and favorites.
+"""
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from accounts.permissions import IsCustomer
+from cart.favorites import (favorite_ids,
+                            add_favorite,
+                            remove_favorite)
+from cart.guest import (read_guest_cart,
+                        write_guest_cart,
+                        clear_guest_cart,
+                        apply_guest_lines)
+from cart.lines import (apply_cart_lines,
+                        cart_summary)
+from cart.serializers import (FavoriteListSerializer,
+                              FavoriteStatusSerializer,
+                              GuestCartSerializer,
+                              CartBatchSerializer,
+                              CartQuantitySerializer,
+                              CartSerializer)
+from cart.models import CartModel
+from products.models import ProductModel
+
+from drf_spectacular.utils import (extend_schema,
+                                   OpenApiResponse)
+
+
+class CartView(APIView):
+    """
+    Customer cart with prices, stock availability and totals.
+    POST sets several lines at once.
+    """
+    permission_classes = [IsCustomer]
+
+    @extend_schema(
+        summary="Cart",
+        description="Cart lines with actual and discount prices, savings, stock availability and totals.",
+        responses={
+            200: OpenApiResponse(
+                response=CartSerializer,
+                description="Cart with totals.",
+            )
+        },
+        tags=["Cart"]
+    )
+    def get(self, request):
+        return Response(CartSerializer(cart_summary(request.customer)).data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Update cart",
+        description="Set the quantity of one or more products, quantity 0 removes the product. "
+                    "Nothing is changed when any of the products doesn't exist.",
+        request=CartBatchSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=CartSerializer,
+                description="Cart with totals.",
+            ),
+            404: OpenApiResponse(
+                description="Some products don't exist, the cart is unchanged.",
+            )
+        },
+        tags=["Cart"]
+    )
+    def post(self, request):
+        serializer = CartBatchSerializer(data=request.data)
+
+        if serializer.is_valid():
+            updates = [(line["product"], line["quantity"]) for line in serializer.validated_data["lines"]]
+            missing = apply_cart_lines(request.customer, updates)
+            if missing:
+                return Response({"error": f"Products not found: {missing}"}, status=status.HTTP_404_NOT_FOUND)
+
+            return Response(CartSerializer(cart_summary(request.customer)).data, status=status.HTTP_200_OK)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CartLineView(APIView):
+    """Set or remove a single product of the cart."""
+    permission_classes = [IsCustomer]
+
+    @extend_schema(
+        summary="Set cart quantity",
+        description="Set the quantity of the product, 0 removes it.",
+        request=CartQuantitySerializer,
+        responses={
+            200: OpenApiResponse(
+                response=CartSerializer,
+                description="Cart with totals.",
+            )
+        },
+        tags=["Cart"]
+    )
+    def put(self, request, product_id):
+        serializer = CartQuantitySerializer(data=request.data)
+
+        if serializer.is_valid():
+            missing = apply_cart_lines(request.customer, [(product_id, serializer.validated_data["quantity"])])
+            if missing:
+                return Response({"error": "Product not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            return Response(CartSerializer(cart_summary(request.customer)).data, status=status.HTTP_200_OK)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @extend_schema(
+        summary="Remove from cart",
+        description="Remove the product from the cart.",
+        request=None,
+        responses={
+            200: OpenApiResponse(
+                response=CartSerializer,
+                description="Cart with totals.",
+            )
+        },
+        tags=["Cart"]
+    )
+    def delete(self, request, product_id):
+        CartModel.objects.filter(customer=request.customer, product_id=product_id).delete()
+        return Response(CartSerializer(cart_summary(request.customer)).data, status=status.HTTP_200_OK)
+
+
+class FavoriteListView(APIView):
+    """Product ids the customer has favorited."""
+    permission_classes = [IsCustomer]
+
+    @extend_schema(
+        summary="List favorites",
+        description="Ids of the products the customer has favorited.",
+        responses={
+            200: OpenApiResponse(
+                response=FavoriteListSerializer,
+                description="Favorite product ids.",
+            )
+        },
+        tags=["Favorites"]
+    )
+    def get(self, request):
+        return Response({"products": sorted(favorite_ids(request.customer.id))}, status=status.HTTP_200_OK)
+
+
+class FavoriteView(APIView):
+    """
+    Add or remove a favorite.
+    Both are idempotent, repeating them leaves the same state.
+    """
+    permission_classes = [IsCustomer]
+
+    @extend_schema(
+        summary="Add favorite",
+        description="Favorite the product.",
+        request=None,
+        responses={
+            200: OpenApiResponse(
+                response=FavoriteStatusSerializer,
+                description="Product favorited.",
+            )
+        },
+        tags=["Favorites"]
+    )
+    def put(self, request, product_id):
+        if not ProductModel.objects.filter(id=product_id).exists():
+            return Response({"error": "Product not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        add_favorite(request.customer.id, product_id)
+        return Response({"product": product_id, "is_favorited": True}, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Remove favorite",
+        description="Remove the product from favorites.",
+        request=None,
+        responses={
+            200: OpenApiResponse(
+                response=FavoriteStatusSerializer,
+                description="Product removed from favorites.",
+            )
+        },
+        tags=["Favorites"]
+    )
+    def delete(self, request, product_id):
+        remove_favorite(request.customer.id, product_id)
+        return Response({"product": product_id, "is_favorited": False}, status=status.HTTP_200_OK)
+
+
+def _guest_cart_data(lines):
+    return {"lines": [{"product": product_id, "quantity": quantity} for product_id, quantity in sorted(lines.items())]}
+
+
+class GuestCartView(APIView):
+    """
+    Cart of a user who hasn't logged in, stored in a signed cookie.
+    Nothing is written to the database until the customer logs in.
+    """
+    authentication_classes = []
+
+    @extend_schema(
+        summary="Guest cart",
+        description="Lines of the guest cart cookie.",
+        responses={
+            200: OpenApiResponse(
+                response=GuestCartSerializer,
+                description="Guest cart lines.",
+            )
+        },
+        tags=["Cart"]
+    )
+    def get(self, request):
+        return Response(_guest_cart_data(read_guest_cart(request)), status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Update guest cart",
+        description="Set the quantity of one or more products, quantity 0 removes the product.",
+        request=GuestCartSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=GuestCartSerializer,
+                description="Guest cart lines.",
+            )
+        },
+        tags=["Cart"]
+    )
+    def post(self, request):
+        serializer = GuestCartSerializer(data=request.data)
+
+        if serializer.is_valid():
+            updates = [(line["product"], line["quantity"]) for line in serializer.validated_data["lines"]]
+            lines, error = apply_guest_lines(read_guest_cart(request), updates)
+            if error:
+                return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+            response = Response(_guest_cart_data(lines), status=status.HTTP_200_OK)
+            write_guest_cart(response, lines)
+            return response
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @extend_schema(
+        summary="Clear guest cart",
+        description="Remove every line of the guest cart.",
+        request=None,
+        responses={
+            200: OpenApiResponse(
+                response=GuestCartSerializer,
+                description="Empty guest cart.",
+            )
+        },
+        tags=["Cart"]
+    )
+    def delete(self, request):
+        response = Response(_guest_cart_data({}), status=status.HTTP_200_OK)
+        clear_guest_cart(response)
+        return response
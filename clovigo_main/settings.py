@@ -10,6 +10,118 @@ SECRET_KEY = env("SECRET_KEY")
 SMS_API_KEY = env("SMS_API_KEY")
 OTP_MAX_TRY = 3
 
+# Order status event feed (seconds)
+ORDER_EVENT_POLL_INTERVAL = 1
+ORDER_EVENT_KEEPALIVE = 15
+ORDER_EVENT_SYNC_STREAM_TIMEOUT = 60
+
+# Delivery dispatcher
+DISPATCH_BATCH_SIZE = 1000
+DISPATCH_MAX_LOAD = 20
+
+# Order archival. Delivered and cancelled orders untouched for this many days
+# move to ArchivedOrderModel, order history pages read the archive after the
+# recent orders.
+ORDER_ARCHIVE_AFTER_DAYS = 90
+ORDER_ARCHIVE_BATCH_SIZE = 1000
+ORDER_HISTORY_PAGE_SIZE = 20
+
+# Catalog facets. Bounds start each band, the last band is open ended.
+# Other processes pick up changes through the cache version, or after the TTL
+# (seconds) when the cache is not shared.
+PRODUCT_PRICE_BUCKETS = [0, 100, 250, 500, 1000, 5000]
+PRODUCT_DISCOUNT_BANDS = [0, 10, 25, 50]
+PRODUCT_FACET_TTL = 300
+PRODUCT_PAGE_SIZE = 20
+
+# Seconds a serialized catalog row stays cached under its product's version.
+PRODUCT_ROW_CACHE_TTL = 600
+
+# Product name autocomplete. Workers map the snapshot file and check it and
+# its delta for changes every AUTOCOMPLETE_CHECK_INTERVAL seconds; product
+# writes reach the delta after AUTOCOMPLETE_FLUSH_DELAY seconds. The task
+# worker rebuilds the snapshot every AUTOCOMPLETE_REBUILD_INTERVAL seconds when
+# it is missing or the delta holds more than AUTOCOMPLETE_DELTA_LIMIT products.
+AUTOCOMPLETE_SNAPSHOT_PATH = BASE_DIR / "var" / "product_autocomplete.bin"
+AUTOCOMPLETE_CHECK_INTERVAL = 1
+AUTOCOMPLETE_FLUSH_DELAY = 1
+AUTOCOMPLETE_REBUILD_INTERVAL = 60
+AUTOCOMPLETE_DELTA_LIMIT = 1000
+AUTOCOMPLETE_MAX_RESULTS = 10
+AUTOCOMPLETE_SCAN_LIMIT = 256
+
+# Fuzzy product search. Products need this share of the query trigrams to
+# match. Candidates come from at most SEARCH_MAX_POSTINGS products per probed
+# trigram, and the SEARCH_MAX_CANDIDATES most similar of them are scored.
+SEARCH_MIN_SIMILARITY = 0.3
+SEARCH_MAX_POSTINGS = 250
+SEARCH_MAX_CANDIDATES = 200
+SEARCH_MAX_RESULTS = 20
+SEARCH_DESCRIPTION_CHARS = 1000
+
+REVIEW_PAGE_SIZE = 20
+
+# Rank engine. Scores add up log-scaled activity with these weights; rows with
+# activity are ranked 2-5 by the score percentiles below, the rest stay at 1.
+RANK_WEIGHTS = {
+    "customer": {"orders": 1.0, "reviews": 0.5, "coins": 0.25},
+    "seller": {"sales": 1.0, "rating": 1.0, "coins": 0.25},
+    "deliveryboy": {"deliveries": 1.0, "coins": 0.25},
+}
+RANK_PERCENTILES = [50, 80, 95]
+RANK_RATING_PRIOR = 10
+RANK_RECOMPUTE_INTERVAL = 60 * 60 * 24
+RANK_WRITE_BATCH_SIZE = 5000
+
+# clo_coin ledger. Balances are snapshotted every COIN_SNAPSHOT_INTERVAL
+# seconds, balance and history reads add up only the entries after a snapshot.
+COIN_SNAPSHOT_INTERVAL = 60 * 60
+COIN_SNAPSHOT_BATCH_SIZE = 1000
+COIN_HISTORY_PAGE_SIZE = 20
+
+# Bulk product import. Requests validate in-process, the command can use --workers.
+PRODUCT_IMPORT_BATCH_SIZE = 500
+PRODUCT_IMPORT_WORKERS = 1
+
+# Seller price campaigns. Due campaigns are started and ended every
+# PRICE_CAMPAIGN_INTERVAL seconds, previous prices are saved in batches.
+PRICE_CAMPAIGN_INTERVAL = 60
+PRICE_CAMPAIGN_BATCH_SIZE = 1000
+PRICE_CAMPAIGN_PAGE_SIZE = 20
+
+# Batch endpoint. At most BATCH_MAX_REQUESTS sub-requests per batch,
+# consecutive reads run on up to BATCH_MAX_WORKERS threads.
+BATCH_MAX_REQUESTS = 10
+BATCH_MAX_WORKERS = 4
+
+# Rows fetched and encoded per chunk by streaming exports.
+EXPORT_CHUNK_SIZE = 2000
+
+# Traffic capture, off unless TRAFFIC_CAPTURE_PATH is set. Requests under the
+# prefixes are appended to the file as NDJSON; replay them with replay_traffic.
+# Only the values of TRAFFIC_CAPTURE_FIELDS are written, every other value is
+# recorded as its type and length, so keep personal data out of this list.
+TRAFFIC_CAPTURE_PATH = env("TRAFFIC_CAPTURE_PATH", default=None)
+TRAFFIC_CAPTURE_PREFIXES = ["/api/"]
+TRAFFIC_CAPTURE_MAX_BODY = 64 * 1024
+TRAFFIC_CAPTURE_FIELDS = [
+    "q", "limit", "cursor", "page", "page_size", "sort", "fields", "expand", "archived", "after", "at",
+    "category", "color", "price", "discount", "filters", "ids",
+    "product", "products", "lines", "quantity", "order_status",
+    "kind", "value", "starts_at", "ends_at", "format", "method", "path",
+]
+
+# Seconds a customer's favorite ids stay cached. Writes bump a per-customer
+# version in the shared cache, the TTL only bounds how long unused sets linger.
+FAVORITES_CACHE_TTL = 600
+
+# Cart. Guests keep their cart in a signed cookie until they log in.
+CART_MAX_QUANTITY = 99
+CART_MAX_BATCH = 100
+GUEST_CART_COOKIE = "guest_cart"
+GUEST_CART_MAX_AGE = 60 * 60 * 24 * 30
+GUEST_CART_MAX_LINES = 50
+
 DEBUG = True
 
 ALLOWED_HOSTS = []
@@ -35,6 +147,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.traffic.TrafficCaptureMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -90,6 +203,15 @@ DATABASES = {
     }
 }
 
+# Shared cache. Favorites, facet index versions and product versions are
+# invalidated through it, so in production every web and task worker must use
+# the same Redis or Memcached server (CACHE_URL, e.g. redis://host:6379/1).
+# The LocMem default is per process and only fits a single-process dev server;
+# `check --deploy` warns about it.
+CACHES = {
+    'default': env.cache("CACHE_URL", default="locmemcache://"),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -115,16 +237,66 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Render and parse JSON with orjson (core.fastjson), falling back to the
+# stdlib json module when it isn't installed.
+FAST_JSON = env.bool("FAST_JSON", default=True)
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-    # 'DEFAULT_RENDERER_CLASSES': (
-    #     'rest_framework.renderers.JSONRenderer',
-    # ),
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.fastjson.FastJSONRenderer' if FAST_JSON else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.fastjson.FastJSONParser' if FAST_JSON else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
+# Idempotency-Key: seconds a response is replayed, and how long a duplicate
+# waits for the in-flight request with the same key. An unfinished request
+# holds its key for IDEMPOTENCY_PROCESSING_LEASE seconds, after which a retry
+# takes it over, so keep it above the slowest request. Fields listed in
+# IDEMPOTENCY_SECRET_FIELDS are left out of the stored request fingerprint.
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+IDEMPOTENCY_PROCESSING_LEASE = 60
+IDEMPOTENCY_WAIT_TIMEOUT = 10
+IDEMPOTENCY_POLL_INTERVAL = 0.1
+IDEMPOTENCY_SECRET_FIELDS = ("password", "otp", "refresh")
+
+# Background task queue (core.taskqueue). Workers lease claimed tasks for
+# TASK_LEASE_SECONDS, a task left by a dead worker runs again after that.
+# Retries wait TASK_RETRY_DELAY seconds, doubled every attempt. TASKS_EAGER runs
+# tasks in-process after commit instead, for development without a worker.
+TASK_LEASE_SECONDS = 300
+TASK_BATCH_SIZE = 10
+TASK_POLL_INTERVAL = 1
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 10
+TASK_FAILED_TTL_DAYS = 7
+TASKS_EAGER = env.bool("TASKS_EAGER", default=False)
+
+SIMPLE_JWT = {
+    'ROTATE_REFRESH_TOKENS': True,
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshRotateSerializer',
+}
+
+# Refresh token revocation: seconds between syncs of each process' Bloom filter.
+REVOCATION_SYNC_INTERVAL = 1
+REVOCATION_BLOOM_CAPACITY = 100000
+REVOCATION_BLOOM_ERROR_RATE = 0.001
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'CloviGo',
     'DESCRIPTION': 'E-commerce and Food delivery app',
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
+    'ENUM_NAME_OVERRIDES': {
+        'OrderStatusEnum': 'core.globalchoices.ORDER_STATUS_CHOICES',
+    },
 }
\ No newline at end of file
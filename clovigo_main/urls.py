@@ -12,9 +12,9 @@ urlpatterns = [
     
     path('', include("core.urls")), 
     path('api/accounts/', include("accounts.urls")),
-    # path('cart', include("cart.urls")),
-    # path('orders', include("orders.urls")),
-    # path('products', include("products.urls")),
+    path('api/cart/', include("cart.urls")),
+    path('api/orders/', include("orders.urls")),
+    path('api/products/', include("products.urls")),
 
 
     # YOUR PATTERNS
@@ -1,3 +1,27 @@
 from django.contrib import admin
+from django.utils import timezone
 
-# Register your models here.
+from core.models import TaskModel
+from core.paginator import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Base admin for tables that grow to millions of rows.
+    Counts are estimated and the changelist skips the full result COUNT(*).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(TaskModel)
+class TaskModelAdmin(LargeTableAdmin):
+    list_display = ["id", "name", "state", "priority", "run_at", "attempts", "locked_by", "updated_at"]
+    list_filter = ["state", "name"]
+    search_fields = ["name", "key"]
+    actions = ["retry"]
+
+    @admin.action(description="Retry selected tasks now")
+    def retry(self, request, queryset):
+        queryset.update(state="Q", run_at=timezone.now(), attempts=0, lease_token="", locked_by="")
@@ -0,0 +1,169 @@
+"""
+Batched API requests.
+
+A batch is a list of sub-requests that are resolved with the URL resolver
+and handed straight to their views, so a client pays for one HTTP round
+trip instead of one per call. Each sub-request carries the batch's
+headers (and so its Authorization) and session plus its own headers, is
+authenticated by its own view, CSRF check included for session users, and
+gets its own status and body back.
+
+Operations run in order, except that consecutive read-only ones (GET,
+HEAD, OPTIONS) run concurrently on a thread pool. The views are
+synchronous, so this is how reads overlap under ASGI as well as WSGI.
+Cookies set by an operation, like the guest cart, are seen by the ones
+after it and returned on the batch response.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.contrib import auth
+from django.db import connections
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from django.utils.functional import SimpleLazyObject
+
+from clovigo_main import settings
+from core.fastjson import (dumps,
+                           loads)
+
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Headers describing the batch's own body, never passed on to sub-requests.
+BODY_META = {"CONTENT_TYPE", "CONTENT_LENGTH", "HTTP_CONTENT_ENCODING", "HTTP_IDEMPOTENCY_KEY"}
+
+
+def _meta_key(header):
+    key = header.upper().replace("-", "_")
+    return key if key in ("CONTENT_TYPE", "CONTENT_LENGTH") else f"HTTP_{key}"
+
+
+def build_request(parent, operation, cookies):
+    """
+    HttpRequest for one operation, carrying `parent`'s headers and session.
+    The user is resolved from the session again: the batch view doesn't
+    authenticate, so `parent.user` is anonymous by now.
+    """
+    url = urlsplit(operation["path"])
+    body = b"" if operation.get("body") is None else dumps(operation["body"])
+
+    request = HttpRequest()
+    request.method = operation.get("method", "GET")
+    request.path = request.path_info = url.path
+    request.META = {key: value for key, value in parent.META.items() if key not in BODY_META}
+    request.META.update({
+        "REQUEST_METHOD": request.method,
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "HTTP_ACCEPT": "application/json",
+    })
+    if body:
+        request.META.update({"CONTENT_TYPE": "application/json", "CONTENT_LENGTH": str(len(body))})
+    for header, value in operation.get("headers", {}).items():
+        request.META[_meta_key(header)] = value
+
+    request.GET = QueryDict(url.query)
+    request.COOKIES = dict(cookies)
+    request._body = body
+    request._stream = BytesIO(body)
+    request._read_started = False
+    if hasattr(parent, "session"):
+        request.session = parent.session
+        request.user = SimpleLazyObject(lambda: auth.get_user(request))
+    return request
+
+
+def _body(response):
+    if not response.content:
+        return None
+    if response.get("Content-Type", "").startswith("application/json"):
+        return loads(response.content)
+    return response.content.decode(response.charset or "utf-8", "replace")
+
+
+def dispatch(request):
+    """Run one sub-request through its view. Returns the response, None for unknown paths."""
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    request.resolver_match = match
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, "render") and callable(response.render):
+        response.render()
+    return response
+
+
+def run_operation(parent, operation, cookies):
+    """Status, body and response (None when there is none) of one operation."""
+    try:
+        response = dispatch(build_request(parent, operation, cookies))
+    except Exception:
+        logger.exception("Batched %s %s failed", operation.get("method", "GET"), operation["path"])
+        return {"status": 500, "body": {"error": "Internal server error."}}, None
+
+    if response is None:
+        return {"status": 404, "body": {"error": "Not found."}}, None
+    if response.streaming:
+        return {"status": 400, "body": {"error": "Streaming responses can't be batched."}}, None
+    return {"status": response.status_code, "body": _body(response)}, response
+
+
+def _run_read(parent, operation, cookies):
+    # Worker threads open their own connections, closed so the pool doesn't leak them.
+    try:
+        return run_operation(parent, operation, cookies)
+    finally:
+        connections.close_all()
+
+
+def _groups(operations):
+    """Consecutive read-only operations grouped together, every write on its own."""
+    group = []
+    for operation in operations:
+        if operation.get("method", "GET") in READ_METHODS:
+            group.append(operation)
+            continue
+        if group:
+            yield group
+            group = []
+        yield [operation]
+    if group:
+        yield group
+
+
+def run_batch(parent, operations, workers=None):
+    """
+    Run `operations` (dicts with method, path, body and headers) for the `parent` request.
+    Returns one `{"status", "body"}` per operation, in order, and the cookies they set.
+    """
+    workers = workers or settings.BATCH_MAX_WORKERS
+    cookies = dict(parent.COOKIES)
+    set_cookies = SimpleCookie()
+    results = []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for group in _groups(operations):
+            if len(group) > 1 and workers > 1:
+                snapshot = dict(cookies)
+                outcomes = list(executor.map(lambda operation: _run_read(parent, operation, snapshot), group))
+            else:
+                outcomes = [run_operation(parent, group[0], cookies)]
+
+            for result, response in outcomes:
+                results.append(result)
+                if response is None:
+                    continue
+                for name, morsel in response.cookies.items():
+                    set_cookies[name] = morsel
+                    if morsel["max-age"] == 0:
+                        cookies.pop(name, None)
+                    else:
+                        cookies[name] = morsel.value
+    return results, set_cookies
@@ -0,0 +1,394 @@
+"""
+Endpoint benchmarks with query budgets.
+
+Each endpoint in ENDPOINTS is requested through the DRF test client against
+the configured (seeded) database. Every request runs in a savepoint that is
+rolled back, and the fixtures the run needs (known passwords, OTP users, a cart
+line) are created in an outer transaction that is rolled back at the
+end, so the data is left as it was. Latency percentiles come from plain
+timed requests, allocations from one extra request under tracemalloc.
+
+`bench_json` compares DRF's stdlib JSON renderer and parser with the orjson
+ones in core.fastjson on product and order lists read from the database.
+"""
+import contextlib
+import io
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver, reverse
+from django.urls.resolvers import URLResolver
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from clovigo_main import settings
+from accounts.models import (CustomerModel,
+                             SellerModel,
+                             DeliveryBoyModel,
+                             OTPVerifyModel,
+                             UserManagementModel)
+from cart.models import CartModel
+from core.fastjson import (FastJSONRenderer,
+                           FastJSONParser,
+                           orjson)
+from orders.archive import HISTORY_FIELDS
+from orders.models import OrderModel
+from orders.serializers import OrderHistorySerializer
+from products.models import (ProductModel,
+                             ProductTrigramModel,
+                             PriceCampaignModel)
+from products.search import rebuild_search_index
+from products.serializers import ProductSerializer
+
+
+# Namespaces whose every URL should have a benchmark.
+COVERED_NAMESPACES = ["accounts", "catalog", "cart", "orders", "products"]
+
+# Long-lived streams can't be timed per request, and batched reads run on other
+# threads, outside the rolled back transaction and the query capture.
+SKIPPED_URLS = {"orders:order_events_stream", "catalog:batch"}
+
+
+class Endpoint:
+    """
+    A request to benchmark and the most queries it may run.
+    `kwargs`, `data` and `query` may be callables taking the fixtures, called before every request.
+    """
+
+    def __init__(self, name, url_name, budget, method="GET", role=None, kwargs=None, data=None, query=None,
+                 data_format="json", status=200, iterations=None):
+        self.name = name
+        self.url_name = url_name
+        self.budget = budget
+        self.method = method
+        self.role = role
+        self.kwargs = kwargs
+        self.data = data
+        self.query = query
+        self.data_format = data_format
+        self.status = status
+        self.iterations = iterations
+
+
+def _value(value, fixtures):
+    return value(fixtures) if callable(value) else value
+
+
+def _signup(fixtures):
+    return {"user": {"username": fixtures.unique("bench"), "phone_no": "9000000000", "password": "bench12345"}}
+
+
+def _seller_signup(fixtures):
+    name = fixtures.unique("benchseller")
+    return {
+        "user.username": name, "user.phone_no": "9000000000", "user.password": "bench12345",
+        "shop_name": "Bench shop", "shop_address_1": "Main Road", "shop_address_2": "-", "shop_landmark": "-",
+        "GST_no": name, "file_gst": SimpleUploadedFile("gst.pdf", b"%PDF-1.4"),
+        "file_pan": SimpleUploadedFile("pan.pdf", b"%PDF-1.4"),
+    }
+
+
+def _deliveryboy_signup(fixtures):
+    name = fixtures.unique("benchrider")
+    return {
+        "user.username": name, "user.phone_no": "9000000000", "user.password": "bench12345",
+        "license_no": name, "file_license": SimpleUploadedFile("license.pdf", b"%PDF-1.4"),
+    }
+
+
+def _product(fixtures):
+    return {"product_id": fixtures.product.id}
+
+
+def _campaign(fixtures):
+    return {"campaign_id": fixtures.campaign.id}
+
+
+def _import_file(fixtures):
+    header = "product_name,description,product_category,color,image,trend_order,actual_price,discount_price,stocks," \
+             "return_before,delivered_within\n"
+    row = f"Bench product,Bench,GROCERY,RED,{fixtures.product.image_id},1,100,90,10,7 days,2 days\n"
+    return {"file": SimpleUploadedFile("products.csv", (header + row * 20).encode()), "format": "csv"}
+
+
+ENDPOINTS = [
+    Endpoint("catalog_home", "catalog:catalog", 0),
+
+    Endpoint("customer_signup", "accounts:customer_signup", 6, "POST", data=_signup, status=201),
+    Endpoint("seller_signup", "accounts:seller_signup", 7, "POST", data=_seller_signup,
+             data_format="multipart", status=201),
+    Endpoint("deliveryboy_signup", "accounts:deliveryboy_signup", 7, "POST", data=_deliveryboy_signup,
+             data_format="multipart", status=201),
+    Endpoint("otp_validate", "accounts:otp_validate", 5, "POST",
+             data=lambda f: {"username": f.otp_user.username, "otp": "123456"}),
+    Endpoint("otp_resend", "accounts:otp_resend", 8, "POST", data=lambda f: {"username": f.resend_user.username}),
+    Endpoint("login_customer", "accounts:login", 3, "POST", kwargs={"login_user": "customer"},
+             data=lambda f: {"username": f.customer.user.username, "password": f.password}, iterations=5),
+    Endpoint("token_refresh", "accounts:token_refresh", 4, "POST",
+             data=lambda f: {"refresh": f.refresh_token("customer")}),
+    Endpoint("logout", "accounts:logout", 3, "POST", data=lambda f: {"refresh": f.refresh_token("customer")},
+             status=205),
+    Endpoint("coin_history", "accounts:coin_history", 5, role="customer", kwargs={"account_type": "customer"}),
+
+    Endpoint("product_list", "products:product_list", 1),
+    Endpoint("product_list_filtered", "products:product_list", 1, query={"category": "GROCERY", "price": "100-250"}),
+    Endpoint("product_list_customer", "products:product_list", 3, role="customer"),
+    Endpoint("product_list_sparse", "products:product_list", 1, query={"fields": "id,product_name,discount_price"}),
+    Endpoint("product_list_expanded", "products:product_list", 1, query={"expand": "seller,image,color_available"}),
+    Endpoint("product_autocomplete", "products:product_autocomplete", 0, query={"q": "ri"}),
+    Endpoint("product_search", "products:product_search", 3, query={"q": "basmti rice"}),
+    Endpoint("product_reviews", "products:product_reviews", 1, kwargs=_product),
+    Endpoint("product_reviews_highest", "products:product_reviews", 1, kwargs=_product, query={"sort": "highest"}),
+    Endpoint("product_import", "products:product_import", 6, "POST", role="seller", data=_import_file,
+             data_format="multipart"),
+    Endpoint("product_export", "products:product_export", 3, role="seller", kwargs={"export_format": "csv"}),
+    Endpoint("price_campaigns", "products:price_campaigns", 3, role="seller"),
+    Endpoint("price_campaign_create", "products:price_campaigns", 10, "POST", role="seller", status=201,
+             data={"name": "bench", "kind": "P", "value": "10", "filters": {"category": ["GROCERY"]}}),
+    Endpoint("price_campaign", "products:price_campaign", 3, role="seller", kwargs=_campaign),
+    Endpoint("price_campaign_end", "products:price_campaign", 7, "DELETE", role="seller", kwargs=_campaign),
+
+    Endpoint("cart", "cart:cart", 3, role="customer"),
+    Endpoint("cart_update", "cart:cart", 7, "POST", role="customer",
+             data=lambda f: {"lines": [{"product": f.product.id, "quantity": 2}]}),
+    Endpoint("cart_line_put", "cart:cart_line", 7, "PUT", role="customer", kwargs=_product,
+             data={"quantity": 3}),
+    Endpoint("cart_line_delete", "cart:cart_line", 4, "DELETE", role="customer", kwargs=_product),
+    Endpoint("guest_cart", "cart:guest_cart", 0),
+    Endpoint("guest_cart_update", "cart:guest_cart", 0, "POST",
+             data=lambda f: {"lines": [{"product": f.product.id, "quantity": 1}]}),
+    Endpoint("guest_cart_clear", "cart:guest_cart", 0, "DELETE"),
+    Endpoint("favorite_list", "cart:favorite_list", 2, role="customer"),
+    Endpoint("favorite_add", "cart:favorite", 4, "PUT", role="customer", kwargs=_product),
+    Endpoint("favorite_remove", "cart:favorite", 3, "DELETE", role="customer", kwargs=_product),
+
+    Endpoint("order_history", "orders:order_history", 4, role="customer"),
+    Endpoint("order_history_seller", "orders:order_history", 5, role="seller"),
+    Endpoint("order_events", "orders:order_events", 3, role="customer"),
+    Endpoint("order_export", "orders:order_export", 3, role="seller", kwargs={"export_format": "ndjson"}),
+]
+
+
+class BenchFixtures:
+    """Users with known passwords and tokens, created inside the benchmark's outer transaction."""
+
+    def __init__(self, password):
+        self.password = password
+        self._counter = 0
+
+        self.customer = CustomerModel.objects.filter(is_active=True).select_related("user").order_by("id").first()
+        self.seller = SellerModel.objects.filter(is_active=True).select_related("user").order_by("id").first()
+        self.rider = DeliveryBoyModel.objects.filter(is_active=True).select_related("user").order_by("id").first()
+        self.product = ProductModel.objects.order_by("-trend_order", "id").first()
+        missing = [name for name in ("customer", "seller", "rider", "product") if getattr(self, name) is None]
+        if missing:
+            raise ValueError(f"No active {', '.join(missing)} in the database, run generate_data first.")
+
+        self.users = {"customer": self.customer.user, "seller": self.seller.user, "deliveryboy": self.rider.user}
+        for user in self.users.values():
+            user.set_password(password)
+            user.is_active = True
+            user.save(update_fields=["password", "is_active"])
+        self.access = {role: str(RefreshToken.for_user(user).access_token) for role, user in self.users.items()}
+
+        self.otp_user = UserManagementModel.objects.create(username=self.unique("benchotp"), phone_no="9000000000",
+                                                           district=self.customer.user.district,
+                                                           state=self.customer.user.state)
+        OTPVerifyModel.objects.create(user=self.otp_user, otp="123456",
+                                      otp_expiry=timezone.now() + timedelta(hours=1))
+        self.resend_user = UserManagementModel.objects.create(username=self.unique("benchresend"),
+                                                              phone_no="9000000000",
+                                                              district=self.customer.user.district,
+                                                              state=self.customer.user.state)
+        CartModel.objects.get_or_create(customer=self.customer, product=self.product, defaults={"quantity": 1})
+        # Search is measured against a populated trigram index, as after build_search_index.
+        if not ProductTrigramModel.objects.exists():
+            rebuild_search_index()
+        self.campaign = PriceCampaignModel.objects.create(seller=self.seller, name="bench", kind="P", value=10,
+                                                          starts_at=timezone.now() + timedelta(days=1))
+
+    def unique(self, prefix):
+        self._counter += 1
+        return f"{prefix}{time.time_ns()}{self._counter}"
+
+    def refresh_token(self, role):
+        return str(RefreshToken.for_user(self.users[role]))
+
+
+def uncovered_urls(endpoints):
+    """Names of URLs in COVERED_NAMESPACES without a benchmark."""
+    benchmarked = {endpoint.url_name for endpoint in endpoints} | SKIPPED_URLS
+    names = set()
+    for pattern in get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver) and pattern.namespace in COVERED_NAMESPACES:
+            names.update(f"{pattern.namespace}:{child.name}" for child in pattern.url_patterns if child.name)
+    return sorted(names - benchmarked)
+
+
+def _request(client, endpoint, fixtures):
+    client.credentials()
+    if endpoint.role:
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {fixtures.access[endpoint.role]}")
+
+    path = reverse(endpoint.url_name, kwargs=_value(endpoint.kwargs, fixtures))
+    query = _value(endpoint.query, fixtures)
+    data = _value(endpoint.data, fixtures)
+
+    method = getattr(client, endpoint.method.lower())
+    if endpoint.method == "GET":
+        response = method(path, query)
+    else:
+        if query:
+            path = f"{path}?{'&'.join(f'{key}={value}' for key, value in query.items())}"
+        response = method(path, data, format=endpoint.data_format)
+
+    if response.streaming:
+        b"".join(response.streaming_content)
+    return response
+
+
+def _rolled_back(client, endpoint, fixtures):
+    with transaction.atomic():
+        response = _request(client, endpoint, fixtures)
+        transaction.set_rollback(True)
+    return response
+
+
+def _percentile(cuts, percent):
+    return round(cuts[percent - 1] * 1000, 3) if cuts else None
+
+
+def measure(client, endpoint, fixtures, iterations, warmup):
+    """Time `iterations` requests and return the result row."""
+    iterations = endpoint.iterations or iterations
+    for _ in range(warmup):
+        _rolled_back(client, endpoint, fixtures)
+
+    timings = []
+    queries = []
+    statuses = set()
+    for _ in range(iterations):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = _request(client, endpoint, fixtures)
+                timings.append(time.perf_counter() - started)
+            transaction.set_rollback(True)
+        queries.append(len(captured))
+        statuses.add(response.status_code)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        _rolled_back(client, endpoint, fixtures)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    cuts = statistics.quantiles(timings, n=100, method="inclusive") if len(timings) > 1 else []
+    problems = []
+    if max(queries) > endpoint.budget:
+        problems.append(f"{max(queries)} queries, budget {endpoint.budget}")
+    if statuses != {endpoint.status}:
+        problems.append(f"status {sorted(statuses)}, expected {endpoint.status}")
+
+    return {
+        "name": endpoint.name,
+        "method": endpoint.method,
+        "url": endpoint.url_name,
+        "iterations": iterations,
+        "status": sorted(statuses),
+        "queries": max(queries),
+        "budget": endpoint.budget,
+        "p50_ms": _percentile(cuts, 50),
+        "p95_ms": _percentile(cuts, 95),
+        "p99_ms": _percentile(cuts, 99),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "alloc_peak_kb": round(peak / 1024, 1),
+        "passed": not problems,
+        "problems": problems,
+    }
+
+
+def run_benchmarks(endpoints, iterations=50, warmup=3, password="bench12345", log=None):
+    """Benchmark every endpoint and roll back everything they wrote. Returns the result rows."""
+    results = []
+    client = APIClient()
+    # The test client's host has to be allowed, signups store uploads in memory, and OTP printouts
+    # and 4xx warnings are swallowed.
+    storages = {"default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}}
+    request_logger = logging.getLogger("django.request")
+    level = request_logger.level
+    request_logger.setLevel(logging.ERROR)
+    try:
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], STORAGES=storages), \
+                transaction.atomic():
+            fixtures = BenchFixtures(password)
+            for endpoint in endpoints:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    row = measure(client, endpoint, fixtures, iterations, warmup)
+                results.append(row)
+                if log:
+                    log(row)
+            transaction.set_rollback(True)
+    finally:
+        request_logger.setLevel(level)
+    return results
+
+
+def json_payloads(rows):
+    """
+    Up to `rows` products and orders serialized as the API returns them, plus raw
+    product `.values()` rows whose Decimals and datetimes the renderer has to encode itself.
+    """
+    orders = (
+        OrderModel.objects.order_by("id")
+        .values(*HISTORY_FIELDS, product_name=F("product__product_name"), archived=Value(False))[:rows]
+    )
+    return {
+        "products": ProductSerializer(ProductModel.objects.order_by("id")[:rows], many=True).data,
+        "orders": OrderHistorySerializer(orders, many=True).data,
+        "product_values": list(ProductModel.objects.order_by("id").values()[:rows]),
+    }
+
+
+def _best(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def bench_json(payloads, repeat=5):
+    """Best of `repeat` encode and decode times per payload, stdlib against fast. Returns the result rows."""
+    renderers = {"stdlib": JSONRenderer(), "fast": FastJSONRenderer()}
+    parsers = {"stdlib": JSONParser(), "fast": FastJSONParser()}
+    results = []
+    for name, data in payloads.items():
+        row = {"name": name, "rows": len(data)}
+        decoded = {}
+        for kind in renderers:
+            encode, content = _best(lambda: renderers[kind].render(data), repeat)
+            decode, decoded[kind] = _best(lambda: parsers[kind].parse(io.BytesIO(content)), repeat)
+            row.update({f"{kind}_encode_ms": round(encode * 1000, 2), f"{kind}_decode_ms": round(decode * 1000, 2)})
+            row[f"{kind}_kb"] = round(len(content) / 1024, 1)
+        row["encode_speedup"] = round(row["stdlib_encode_ms"] / max(row["fast_encode_ms"], 0.01), 1)
+        row["decode_speedup"] = round(row["stdlib_decode_ms"] / max(row["fast_decode_ms"], 0.01), 1)
+        row["same_output"] = json.dumps(decoded["stdlib"]) == json.dumps(decoded["fast"])
+        results.append(row)
+    return results
@@ -0,0 +1,28 @@
+"""
+System checks for the deployment settings the apps rely on.
+"""
+from django.conf import settings as django_settings
+from django.core.checks import (Tags,
+                                Warning,
+                                register)
+
+
+# Backends whose entries only the current process sees.
+LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Cached favorites and the facet and product versions must be shared by every process."""
+    if django_settings.CACHES["default"]["BACKEND"] not in LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process, other workers keep serving stale favorites and facets.",
+            hint="Set CACHE_URL to a Redis or Memcached server shared by the web and task workers.",
+            id="core.W001",
+        )
+    ]
@@ -0,0 +1,306 @@
+"""
+Synthetic data for scale testing.
+
+Rows are built in memory and written with `bulk_create`, many batches per
+transaction, without model signals. Popularity follows a Zipf distribution:
+a few products take most orders, reviews, cart lines and favorites, a few
+customers place most orders and a few sellers own most products. Every user
+shares one precomputed password hash, hashing per user would dominate the run.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import (UserManagementModel,
+                             CustomerModel,
+                             SellerModel,
+                             DeliveryBoyModel)
+from cart.models import (CartModel,
+                         FavoriteModel)
+from core.globalchoices import (DISTRICT_CHOICES,
+                                PRODUCTS_CHOICES,
+                                COLOR_CHOICES)
+from core.models import ImageModel
+from orders.models import OrderModel
+from products.models import (ProductModel,
+                             ReviewModel)
+
+
+DEFAULT_COUNTS = {
+    "customers": 10000,
+    "sellers": 200,
+    "riders": 300,
+    "products": 20000,
+    "reviews": 100000,
+    "cart": 30000,
+    "favorites": 50000,
+    "orders": 200000,
+}
+
+BRANDS = ["Aachi", "Aavin", "Amul", "Britannia", "Daawat", "Everest", "Fortune", "Haldiram", "MTR", "Nilgiris",
+          "Patanjali", "Sakthi", "Tata", "Organic Tattva", "24 Mantra"]
+QUALIFIERS = ["Fresh", "Organic", "Premium", "Classic", "Farm", "Natural", "Roasted", "Whole", "Pure", "Spicy"]
+ITEMS = ["Basmati Rice", "Ponni Rice", "Toor Dal", "Moong Dal", "Urad Dal", "Chana Dal", "Wheat Atta", "Ragi Flour",
+         "Rava", "Maida", "Sugar", "Jaggery", "Salt", "Turmeric Powder", "Chilli Powder", "Coriander Powder",
+         "Sambar Powder", "Rasam Powder", "Garam Masala", "Mustard Seeds", "Cumin Seeds", "Groundnut Oil",
+         "Sesame Oil", "Coconut Oil", "Ghee", "Butter", "Paneer", "Curd", "Milk", "Tea", "Coffee Powder", "Biscuits",
+         "Cashew", "Almonds", "Raisins", "Tamarind", "Papad", "Pickle", "Noodles", "Vermicelli", "Poha", "Oats",
+         "Honey", "Jam", "Bread", "Eggs", "Banana", "Apple", "Tomato", "Onion", "Potato", "Garlic", "Ginger"]
+SIZES = ["100g", "200g", "250g", "500g", "1kg", "2kg", "5kg", "500ml", "1L"]
+REVIEWS = {
+    1: ["Poor quality, not fresh.", "Package arrived damaged.", "Not worth the price."],
+    2: ["Below average.", "Quantity was less than expected.", "Taste is not good."],
+    3: ["Okay for the price.", "Average product.", "Decent, nothing special."],
+    4: ["Good quality.", "Fresh and well packed.", "Value for money."],
+    5: ["Excellent, will buy again!", "Best in the market.", "Very fresh, loved it."],
+}
+RATINGS = [1, 2, 3, 4, 5]
+RATING_WEIGHTS = list(accumulate([5, 5, 15, 35, 40]))
+ORDER_STATUSES = ["D", "C", "P", "S", "O"]
+ORDER_STATUS_WEIGHTS = list(accumulate([70, 8, 8, 7, 7]))
+QUANTITIES = [1, 2, 3, 4, 5]
+QUANTITY_WEIGHTS = list(accumulate([60, 20, 10, 5, 5]))
+
+
+class Zipf:
+    """Sample indexes `0..n-1` with probability proportional to `1 / (rank + 1) ** exponent`."""
+
+    def __init__(self, rng, n, exponent, shuffle=True):
+        self.rng = rng
+        self.n = n
+        self.ranks = list(range(n))
+        if shuffle:
+            rng.shuffle(self.ranks)
+        self.cumulative = list(accumulate(1 / (rank + 1) ** exponent for rank in self.ranks))
+
+    def sample(self, k):
+        return self.rng.choices(range(self.n), cum_weights=self.cumulative, k=k)
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    """Let bulk_create keep the generated created_at/updated_at."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+@contextmanager
+def _fast_sqlite():
+    """Skip fsync on SQLite while loading, the data is disposable."""
+    if connection.vendor != "sqlite":
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        synchronous = cursor.fetchone()[0]
+        cursor.execute("PRAGMA synchronous = OFF")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA synchronous = {int(synchronous)}")
+
+
+class DataGenerator:
+    """Generate `counts` rows per table, see DEFAULT_COUNTS for the keys."""
+
+    def __init__(self, counts, seed=None, batch_size=5000, transaction_size=100000, password="password123",
+                 zipf_exponent=1.1, log=print):
+        self.counts = counts
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.transaction_size = transaction_size
+        self.password_hash = make_password(password)
+        self.exponent = zipf_exponent
+        self.log = log
+        self.prefix = f"gen{self.rng.randrange(16 ** 6):06x}"
+        self.now = timezone.now()
+
+    def _timestamp(self, days=365):
+        return self.now - timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def _insert(self, model, rows, total, ignore_conflicts=False, return_ids=False):
+        """
+        Bulk insert `total` rows from the `rows` iterator, committing every transaction_size rows.
+        Returns the new ids with `return_ids`.
+        """
+        started = time.perf_counter()
+        ids = []
+        inserted = 0
+        while inserted < total:
+            with transaction.atomic():
+                in_transaction = 0
+                while in_transaction < self.transaction_size and inserted < total:
+                    size = min(self.batch_size, total - inserted)
+                    batch = [next(rows) for _ in range(size)]
+                    model.objects.bulk_create(batch, ignore_conflicts=ignore_conflicts)
+                    if return_ids:
+                        ids.extend(obj.pk for obj in batch)
+                    inserted += size
+                    in_transaction += size
+        elapsed = time.perf_counter() - started
+        self.log(f"{model.__name__}: {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)")
+        return ids
+
+    def _users(self, role, total):
+        districts = [code for code, _ in DISTRICT_CHOICES]
+        district_of = Zipf(self.rng, len(districts), 1.0)
+
+        def rows():
+            for i, district in enumerate(self._sampled(district_of, total)):
+                yield UserManagementModel(
+                    username=f"{self.prefix}{role}{i}",
+                    password=self.password_hash,
+                    phone_no=f"9{self.rng.randrange(10 ** 9):09d}",
+                    is_active=True,
+                    district=districts[district],
+                    state="TN",
+                    date_joined=self._timestamp(),
+                )
+
+        return self._insert(UserManagementModel, rows(), total, return_ids=True)
+
+    def _sampled(self, zipf, total):
+        """Zipf samples drawn a batch at a time."""
+        drawn = 0
+        while drawn < total:
+            size = min(self.batch_size, total - drawn)
+            yield from zipf.sample(size)
+            drawn += size
+
+    def generate(self):
+        counts = self.counts
+        rng = self.rng
+
+        with _fast_sqlite(), _explicit_timestamps(ProductModel, ReviewModel, CartModel, FavoriteModel, OrderModel):
+            customer_users = self._users("c", counts["customers"])
+            customers = self._insert(CustomerModel, (
+                CustomerModel(user_id=user_id, customer_rank="1", is_otp=True, is_active=True)
+                for user_id in customer_users
+            ), len(customer_users), return_ids=True)
+
+            seller_users = self._users("s", counts["sellers"])
+            sellers = self._insert(SellerModel, (
+                SellerModel(user_id=user_id, is_active=True, is_otp=True, shop_name=f"Shop {i}",
+                            shop_address_1="Main Road", shop_address_2="", shop_landmark="",
+                            GST_no=f"{self.prefix}G{i}", file_gst="documents/generated.pdf",
+                            file_pan="documents/generated.pdf", seller_rank="1")
+                for i, user_id in enumerate(seller_users)
+            ), len(seller_users), return_ids=True)
+
+            rider_users = self._users("d", counts["riders"])
+            riders = self._insert(DeliveryBoyModel, (
+                DeliveryBoyModel(user_id=user_id, is_active=True, is_otp=True, license_no=f"{self.prefix}L{i}",
+                                 file_license="license/generated.pdf", delivery_boy_rank="1")
+                for i, user_id in enumerate(rider_users)
+            ), len(rider_users), return_ids=True)
+
+            images = [ImageModel.objects.create(img=f"images/generated_{i}.png").id for i in range(10)]
+            products = self._products(sellers, images)
+
+            customer_of = Zipf(rng, len(customers), self.exponent)
+            product_of = Zipf(rng, len(products), self.exponent, shuffle=False)
+
+            def pairs(total):
+                for customer, product in zip(self._sampled(customer_of, total), self._sampled(product_of, total)):
+                    yield customers[customer], products[product]
+
+            self._insert(ReviewModel, (
+                self._review(customer_id, product_id) for customer_id, product_id in pairs(counts["reviews"])
+            ), counts["reviews"])
+
+            # Repeated (customer, product) pairs are dropped by the unique constraints.
+            self._insert(CartModel, (
+                self._line(CartModel, customer_id, product_id, 30, quantity=rng.randint(1, 5))
+                for customer_id, product_id in pairs(counts["cart"])
+            ), counts["cart"], ignore_conflicts=True)
+
+            self._insert(FavoriteModel, (
+                self._line(FavoriteModel, customer_id, product_id, 365)
+                for customer_id, product_id in pairs(counts["favorites"])
+            ), counts["favorites"], ignore_conflicts=True)
+
+            self._insert(OrderModel, (
+                self._order(customer_id, product_id, riders) for customer_id, product_id in pairs(counts["orders"])
+            ), counts["orders"])
+
+    def _products(self, sellers, images):
+        rng = self.rng
+        total = self.counts["products"]
+        seller_of = Zipf(rng, len(sellers), self.exponent)
+        # Trend order follows the same popularity the orders are drawn with.
+        ranks = list(range(total))
+        rng.shuffle(ranks)
+        categories = [code for code, _ in PRODUCTS_CHOICES]
+        colors = [code for code, _ in COLOR_CHOICES]
+
+        def rows():
+            for i, seller in enumerate(self._sampled(seller_of, total)):
+                actual = Decimal(rng.randrange(1000, 200000)) / 100
+                discount = rng.choice([0, 0, 5, 10, 15, 20, 30, 50])
+                created = self._timestamp()
+                yield ProductModel(
+                    seller_id=sellers[seller],
+                    product_name=f"{rng.choice(BRANDS)} {rng.choice(QUALIFIERS)} {rng.choice(ITEMS)} {rng.choice(SIZES)}",
+                    description=f"{rng.choice(QUALIFIERS)} quality, sourced and packed for freshness.",
+                    product_category=rng.choice(categories),
+                    color=rng.choice(colors),
+                    trend_order=total - ranks[i],
+                    actual_price=actual,
+                    discount_price=(actual * (100 - discount) / 100).quantize(Decimal("0.01")),
+                    discount_percentage=discount,
+                    stocks=rng.randrange(0, 500),
+                    image_id=rng.choice(images),
+                    is_return_policy=rng.random() < 0.5,
+                    return_before="7 days",
+                    delivered_within="2 days",
+                    created_at=created,
+                    updated_at=created,
+                )
+
+        ids = self._insert(ProductModel, rows(), total, return_ids=True)
+        # Ordered by popularity rank, the first product has the highest trend order.
+        return [product_id for _, product_id in sorted(zip(ranks, ids))]
+
+    def _line(self, model, customer_id, product_id, days, **fields):
+        created = self._timestamp(days)
+        return model(customer_id=customer_id, product_id=product_id, created_at=created, updated_at=created, **fields)
+
+    def _review(self, customer_id, product_id):
+        rating = self.rng.choices(RATINGS, cum_weights=RATING_WEIGHTS)[0]
+        created = self._timestamp()
+        return ReviewModel(customer_id=customer_id, product_id=product_id, rating=rating,
+                           review=self.rng.choice(REVIEWS[rating]), created_at=created, updated_at=created)
+
+    def _order(self, customer_id, product_id, riders):
+        rng = self.rng
+        status = rng.choices(ORDER_STATUSES, cum_weights=ORDER_STATUS_WEIGHTS)[0]
+        created = self._timestamp()
+        updated = min(created + timedelta(hours=rng.randrange(1, 24 * 7)), self.now)
+        rider = rng.choice(riders) if riders and status in ("S", "O", "D") and rng.random() < 0.9 else None
+        return OrderModel(
+            customer_id=customer_id,
+            product_id=product_id,
+            quantity=rng.choices(QUANTITIES, cum_weights=QUANTITY_WEIGHTS)[0],
+            order_status=status,
+            delivery_boy_id=rider,
+            assigned_at=created + (updated - created) / 2 if rider else None,
+            created_at=created,
+            updated_at=updated,
+        )
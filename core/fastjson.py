@@ -0,0 +1,135 @@
+"""
+orjson renderer and parser for DRF.
+
+orjson encodes and decodes in C, several times faster than the stdlib json
+module DRF uses, which matters for large product and order lists. Output
+matches DRF's JSONRenderer: values orjson has no encoding for (Decimal,
+lazy strings) and datetimes go through DRF's JSONEncoder, so prices and
+timestamps look the same whichever renderer produced them. What orjson
+renders differently goes through DRF's renderer instead: integers beyond 64
+bits, which orjson refuses, and NaN or infinite numbers, which orjson writes
+as null while DRF refuses them (or writes NaN with STRICT_JSON off). The
+parser likewise leaves bodies orjson rejects, and integers too long for it
+to keep exact, to DRF's parser.
+
+Without orjson installed, or when a client asks for indented output, both
+classes fall back to DRF's pure-Python implementation. FAST_JSON in the
+settings picks them as the defaults; views can also list them in
+`renderer_classes` / `parser_classes`.
+"""
+import datetime
+import json
+import math
+import uuid
+from decimal import Decimal
+from io import BytesIO
+from itertools import chain
+
+from django.conf import settings as django_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_encoder = JSONEncoder()
+
+OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+# orjson reads integers beyond 64 bits as floats, bodies with digit runs this long go to
+# DRF's parser. Digits are mapped to "0" and the rest to spaces, so a substring search finds them.
+LONG_NUMBER = b"0" * 19
+DIGITS = bytes(48 if 48 <= byte <= 57 else 32 for byte in range(256))
+
+# Values that can't be or hold a non-finite float. Non-finite Decimals are refused in `_default`.
+SCALARS = frozenset({str, int, bool, type(None), Decimal, datetime.datetime, datetime.date, datetime.time,
+                     datetime.timedelta, uuid.UUID})
+
+# Escaped like JSONRenderer does, so the output stays valid JavaScript.
+LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+def _finite(value):
+    """False when a NaN or infinite float is nested anywhere in `value`."""
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            value = value.values()
+        elif not isinstance(value, (list, tuple)):
+            if isinstance(value, float) and not math.isfinite(value):
+                return False
+            continue
+        types = set(map(type, value))
+        if types <= SCALARS:
+            continue
+        # A list of rows is checked at once when all their values are plain.
+        if all(issubclass(kind, dict) for kind in types) and set(
+                map(type, chain.from_iterable(map(dict.values, value)))) <= SCALARS:
+            continue
+        stack.extend(value)
+    return True
+
+
+def _default(value):
+    if isinstance(value, Decimal) and not value.is_finite():
+        raise TypeError("Non-finite Decimal.")
+    return _encoder.default(value)
+
+
+def dumps(data):
+    """`data` as UTF-8 JSON bytes, encoded (or refused) like DRF's JSONRenderer does."""
+    if orjson is None:
+        return JSONRenderer().render(data)
+    try:
+        content = orjson.dumps(data, default=_default, option=OPTIONS)
+    except orjson.JSONEncodeError:
+        return JSONRenderer().render(data)
+    # Non-finite numbers came out as null, only worth looking for when there is one.
+    if b"null" in content and not _finite(data):
+        return JSONRenderer().render(data)
+    for separator, escaped in LINE_SEPARATORS:
+        if separator in content:
+            content = content.replace(separator, escaped)
+    return content
+
+
+def loads(content):
+    """Decode JSON bytes or str, raising ValueError when malformed."""
+    if orjson is None:
+        return json.loads(content)
+    return orjson.loads(content)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson when it is installed."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser decoding with orjson when it is installed."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", django_settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        if LONG_NUMBER not in content.translate(DIGITS):
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                pass
+        # DRF's parser decides, and words the error for, whatever orjson can't read the same way.
+        return super().parse(BytesIO(content), media_type, parser_context)
@@ -18,6 +18,6 @@ def hash_license(instance, filename):
 def hash_document(instance, filename):
     return f"document/{hash_file(filename)}"
 
-def hash_file(instance, filename):
+def hash_upload(instance, filename):
     return f"file/{hash_file(filename)}"
 
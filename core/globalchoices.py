@@ -1,13 +1,21 @@
-CUSTOMER_RANK_CHOICES = [
-    ("1", "Noob")
+RANK_CHOICES = [
+    ("1", "Noob"),
+    ("2", "Bronze"),
+    ("3", "Silver"),
+    ("4", "Gold"),
+    ("5", "Platinum"),
 ]
 
-SELLER_RANK_CHOICES = [
-    ("1", "Noob")
-]
+CUSTOMER_RANK_CHOICES = RANK_CHOICES
+
+SELLER_RANK_CHOICES = RANK_CHOICES
+
+DELIVERYBOY_RANK_CHOICES = RANK_CHOICES
 
-DELIVERYBOY_RANK_CHOICES = [
-    ("1", "Noob")
+COIN_ACCOUNT_CHOICES = [
+    ("customer", "Customer"),
+    ("seller", "Seller"),
+    ("deliveryboy", "Delivery Boy"),
 ]
 
 STATE_CHOICES = [
@@ -78,7 +86,7 @@ COLOR_CHOICES = [
     ("YELLOW", "Yellow")
 ]
 
-RATING_CHOICES = [(str(i), str(i)) for i in range(1, 6)]
+RATING_CHOICES = [(i, str(i)) for i in range(1, 6)]
 
 ORDER_STATUS_CHOICES = [
     ("P", "Pending"),
@@ -87,3 +95,24 @@ ORDER_STATUS_CHOICES = [
     ("D", "Delivered"),
     ("C", "Cancelled"),
 ]
+
+IDEMPOTENCY_STATE_CHOICES = [
+    ("P", "Processing"),
+    ("D", "Done"),
+]
+
+TASK_STATE_CHOICES = [
+    ("Q", "Queued"),
+    ("F", "Failed"),
+]
+
+PRICE_CAMPAIGN_KIND_CHOICES = [
+    ("P", "Percentage"),
+    ("A", "Amount"),
+]
+
+PRICE_CAMPAIGN_STATE_CHOICES = [
+    ("S", "Scheduled"),
+    ("A", "Active"),
+    ("E", "Ended"),
+]
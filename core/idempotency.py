@@ -0,0 +1,157 @@
+"""
+Idempotency-Key support for POST views.
+
+The first request with a key claims it by inserting an IdempotencyKeyModel
+row, runs the view and stores the response. Retries with the same key get the
+stored response back; a retry arriving while the first request is still
+running waits for it instead of running the view twice.
+
+While the first request runs, its row only lives for the short processing
+lease. If the worker dies before finishing, a retry after the lease takes the
+key over instead of getting 409 until the key expires. Finishing extends the
+row to the full key TTL.
+"""
+import hashlib
+import hmac
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from clovigo_main import settings
+from core.models import IdempotencyKeyModel
+
+
+HEADER = "Idempotency-Key"
+
+
+def _fingerprint(request):
+    """
+    Keyed hash of the request payload, files count by name and size.
+    Secret fields are left out, so the stored hash can't be used to guess them.
+    """
+    payload = {}
+    for name in request.data:
+        if name in settings.IDEMPOTENCY_SECRET_FIELDS:
+            continue
+        value = request.data.getlist(name) if hasattr(request.data, "getlist") else request.data[name]
+        payload[name] = value
+    for name, upload in request.FILES.items():
+        payload[name] = [upload.name, upload.size]
+    encoded = json.dumps(payload, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return hmac.new(settings.SECRET_KEY.encode(), encoded.encode(), hashlib.sha256).hexdigest()
+
+
+def _claim(scope, key, request_hash):
+    """Insert the key row, None when another request holds it."""
+    try:
+        with transaction.atomic():
+            return IdempotencyKeyModel.objects.create(
+                scope=scope,
+                key=key,
+                request_hash=request_hash,
+                expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_PROCESSING_LEASE)
+            )
+    except IntegrityError:
+        return None
+
+
+def _wait_for(scope, key):
+    """Poll the key row until its request finishes, gives up after the wait timeout."""
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        record = IdempotencyKeyModel.objects.filter(scope=scope, key=key).first()
+        if record is None or record.state == "D" or time.monotonic() >= deadline:
+            return record
+        time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+
+def idempotent(view_method):
+    """
+    Make a view method replay its first response for a repeated Idempotency-Key.
+    Requests without the header run as usual. Server errors release the key so it can be retried.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > 255:
+            return Response({"error": f"{HEADER} must be at most 255 characters."}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.pk if request.user and request.user.is_authenticated else ""
+        scope = f"{request.method}:{request.path}:{user_id}"
+        request_hash = _fingerprint(request)
+
+        record = _claim(scope, key, request_hash)
+        if record is None:
+            # Expired keys, and processing leases of crashed workers, are free again.
+            IdempotencyKeyModel.objects.filter(scope=scope, key=key, expires_at__lte=timezone.now()).delete()
+            record = _claim(scope, key, request_hash)
+
+        if record is None:
+            existing = _wait_for(scope, key)
+
+            if existing is None:
+                return Response({"error": "Request with this Idempotency-Key failed, retry it."},
+                                status=status.HTTP_409_CONFLICT)
+
+            if existing.request_hash != request_hash:
+                return Response({"error": f"{HEADER} was already used with a different request."},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+            if existing.state != "D":
+                return Response({"error": "Request with this Idempotency-Key is still in progress."},
+                                status=status.HTTP_409_CONFLICT)
+
+            response = Response(existing.response_body, status=existing.status_code)
+            response["Idempotent-Replayed"] = "true"
+            return response
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500 or not isinstance(response, Response):
+            record.delete()
+            return response
+
+        # Matches nothing when a retry took the key over after this request outlived its lease.
+        IdempotencyKeyModel.objects.filter(id=record.id, state="P").update(
+            state="D",
+            status_code=response.status_code,
+            response_body=response.data,
+            expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+        )
+        return response
+
+    return wrapper
+
+
+class IdempotentCreateMixin:
+    """Idempotency-Key support for the POST of a CreateAPIView."""
+
+    @idempotent
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+
+def cleanup_idempotency_keys(batch_size=1000):
+    """Delete expired keys in batches and return how many were removed."""
+    deleted = 0
+    now = timezone.now()
+    while True:
+        ids = list(IdempotencyKeyModel.objects.filter(expires_at__lte=now).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += IdempotencyKeyModel.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,75 @@
+"""
+Benchmark the API endpoints against the configured database and enforce their query budgets.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.benchmarks import (ENDPOINTS,
+                             run_benchmarks,
+                             uncovered_urls)
+
+
+class Command(BaseCommand):
+    help = ("Request every benchmarked endpoint through the test client against a seeded database "
+            "(see generate_data), report latency percentiles, queries and allocations, and fail when "
+            "an endpoint runs more queries than its budget. Everything written is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50, help="Timed requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per endpoint.")
+        parser.add_argument("--only", nargs="+", default=None, help="Benchmark only these endpoint names.")
+        parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+        parser.add_argument("--baseline", default=None, help="Earlier --output file to compare p95 and queries with.")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+
+        endpoints = ENDPOINTS
+        if options["only"]:
+            unknown = set(options["only"]) - {endpoint.name for endpoint in ENDPOINTS}
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}.")
+            endpoints = [endpoint for endpoint in ENDPOINTS if endpoint.name in options["only"]]
+
+        baseline = {}
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = {row["name"]: row for row in json.load(file)["results"]}
+
+        self.stdout.write(f"{'endpoint':<26}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+                          f"{'alloc KB':>10}  notes")
+
+        def log(row):
+            notes = list(row["problems"])
+            previous = baseline.get(row["name"])
+            if previous and previous["p95_ms"] and row["p95_ms"]:
+                notes.append(f"p95 {(row['p95_ms'] - previous['p95_ms']) / previous['p95_ms']:+.0%}")
+            if previous and previous["queries"] != row["queries"]:
+                notes.append(f"queries {row['queries'] - previous['queries']:+d}")
+            line = (f"{row['name']:<26}{row['p50_ms'] or row['mean_ms']:>9.2f}{row['p95_ms'] or row['mean_ms']:>9.2f}"
+                    f"{row['p99_ms'] or row['mean_ms']:>9.2f}{row['queries']:>5}/{row['budget']:<3}"
+                    f"{row['alloc_peak_kb']:>10.1f}  {', '.join(notes)}")
+            self.stdout.write(line if row["passed"] else self.style.ERROR(line))
+
+        try:
+            results = run_benchmarks(endpoints, iterations=options["iterations"], warmup=options["warmup"], log=log)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if not options["only"]:
+            for name in uncovered_urls(ENDPOINTS):
+                self.stdout.write(self.style.WARNING(f"No benchmark for {name}."))
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump({"created_at": timezone.now().isoformat(), "database": connection.vendor,
+                           "iterations": options["iterations"], "results": results}, file, indent=2)
+
+        failed = [row["name"] for row in results if not row["passed"]]
+        if failed:
+            raise CommandError(f"{len(failed)} endpoints failed: {', '.join(failed)}.")
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} endpoints within budget."))
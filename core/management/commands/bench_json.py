@@ -0,0 +1,37 @@
+"""
+Compare the stdlib and orjson JSON renderers and parsers on catalog and order data.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import (bench_json,
+                             json_payloads,
+                             orjson)
+
+
+class Command(BaseCommand):
+    help = ("Encode and decode product and order lists from the configured (seeded, see generate_data) "
+            "database with DRF's stdlib JSON renderer and parser and with core.fastjson, and report "
+            "the timings and speedups.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="Products and orders per payload.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the best is kept.")
+
+    def handle(self, *args, **options):
+        if options["rows"] < 1 or options["repeat"] < 1:
+            raise CommandError("--rows and --repeat must be at least 1.")
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed, fast timings use the fallback."))
+
+        payloads = json_payloads(options["rows"])
+        if not any(payloads.values()):
+            raise CommandError("No products or orders, seed the database with generate_data first.")
+
+        self.stdout.write(f"{'payload':<16} {'rows':>6} {'KB':>8}  {'encode ms':>17} {'x':>5}  {'decode ms':>17} {'x':>5}  same")
+        for row in bench_json(payloads, options["repeat"]):
+            self.stdout.write(
+                f"{row['name']:<16} {row['rows']:>6} {row['stdlib_kb']:>8}  "
+                f"{row['stdlib_encode_ms']:>8} {row['fast_encode_ms']:>8} {row['encode_speedup']:>5}  "
+                f"{row['stdlib_decode_ms']:>8} {row['fast_decode_ms']:>8} {row['decode_speedup']:>5}  "
+                f"{'yes' if row['same_output'] else 'NO'}"
+            )
@@ -0,0 +1,17 @@
+"""
+Delete stored Idempotency-Key responses that have expired.
+"""
+from django.core.management.base import BaseCommand
+
+from core.idempotency import cleanup_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = "Delete expired IdempotencyKeyModel rows in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = cleanup_idempotency_keys(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys."))
@@ -0,0 +1,49 @@
+"""
+Populate the database with synthetic users, products, reviews, carts, favorites and orders.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.datagen import (DEFAULT_COUNTS,
+                          DataGenerator)
+
+
+class Command(BaseCommand):
+    help = ("Generate Zipf-skewed synthetic data for scale testing. Counts default to DEFAULT_COUNTS "
+            "multiplied by --scale. Product indexes are not refreshed, run build_autocomplete and "
+            "build_search_index afterwards.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=1.0, help="Multiplier applied to every default count.")
+        for name, count in DEFAULT_COUNTS.items():
+            parser.add_argument(f"--{name}", type=int, default=None, help=f"Rows to generate (default {count}).")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for a repeatable dataset.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per bulk_create.")
+        parser.add_argument("--transaction-size", type=int, default=100000, help="Rows per transaction.")
+        parser.add_argument("--password", default="password123", help="Password of every generated user.")
+        parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of popularity.")
+
+    def handle(self, *args, **options):
+        counts = {}
+        for name, count in DEFAULT_COUNTS.items():
+            value = options[name]
+            counts[name] = int(count * options["scale"]) if value is None else value
+            if counts[name] < 0:
+                raise CommandError(f"--{name} can't be negative.")
+        if counts["products"] and not counts["sellers"]:
+            raise CommandError("Products need at least one seller.")
+        if any(counts[name] for name in ("reviews", "cart", "favorites", "orders")) and not (
+                counts["customers"] and counts["products"]):
+            raise CommandError("Reviews, cart lines, favorites and orders need customers and products.")
+
+        generator = DataGenerator(
+            counts,
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            transaction_size=options["transaction_size"],
+            password=options["password"],
+            zipf_exponent=options["zipf"],
+            log=self.stdout.write
+        )
+        generator.generate()
+        self.stdout.write(self.style.SUCCESS(f"Generated {sum(counts.values())} rows, usernames start with "
+                                             f"{generator.prefix}."))
@@ -0,0 +1,79 @@
+"""
+Replay a traffic capture against a running server.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.traffic import (load_capture,
+                          replay,
+                          summarize)
+
+
+class Command(BaseCommand):
+    help = ("Re-issue the requests of a TRAFFIC_CAPTURE_PATH file against a server with their original "
+            "timing, or --speed times faster, and report latency per route and status differences "
+            "from the capture.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("capture", help="NDJSON file written by TrafficCaptureMiddleware.")
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Server to replay against.")
+        parser.add_argument("--speed", type=float, default=1.0,
+                            help="Divide the gaps between requests by this, 0 sends them back to back.")
+        parser.add_argument("--workers", type=int, default=16, help="Requests in flight at most.")
+        parser.add_argument("--limit", type=int, default=None, help="Replay only the first N requests.")
+        parser.add_argument("--password", default=None, help="Password to send in place of redacted passwords.")
+        parser.add_argument("--authorization", default=None,
+                            help="Authorization header for requests that were authenticated, e.g. \"Bearer <token>\".")
+        parser.add_argument("--timeout", type=float, default=30, help="Seconds to wait for each response.")
+        parser.add_argument("--output", default=None, help="Write the summary as JSON to this file.")
+
+    def handle(self, *args, **options):
+        if options["speed"] < 0:
+            raise CommandError("--speed can't be negative.")
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        try:
+            records = load_capture(options["capture"])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Can't read the capture: {e}")
+        records = records[:options["limit"]]
+        if not records:
+            raise CommandError("The capture has no requests.")
+
+        self.stdout.write(f"Replaying {len(records)} requests recorded over "
+                          f"{records[-1]['t'] - records[0]['t']:.1f}s against {options['base_url']}.")
+        results, max_lag = replay(
+            records,
+            options["base_url"],
+            speed=options["speed"],
+            workers=options["workers"],
+            password=options["password"],
+            authorization=options["authorization"],
+            timeout=options["timeout"]
+        )
+        summary = summarize(results)
+
+        self.stdout.write(f"{'route':<36}{'requests':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+                          f"{'was p95':>9}{'errors':>8}  status diffs")
+        for row in summary:
+            diffs = ", ".join(f"{diff} x{count}" for diff, count in row["status_diffs"].items())
+            line = (f"{row['method'] + ' ' + str(row['route']):<36}{row['requests']:>9}"
+                    f"{row['p50_ms'] or 0:>9.2f}{row['p95_ms'] or 0:>9.2f}{row['p99_ms'] or 0:>9.2f}"
+                    f"{row['recorded_p95_ms']:>9.2f}{row['errors']:>8}  {diffs}")
+            self.stdout.write(self.style.ERROR(line) if row["errors"] else line)
+
+        if options["speed"] and max_lag > 0.1:
+            self.stdout.write(self.style.WARNING(f"Requests were sent up to {max_lag:.2f}s late, "
+                                                 f"raise --workers or lower --speed."))
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump({"capture": options["capture"], "base_url": options["base_url"],
+                           "speed": options["speed"], "max_lag_s": round(max_lag, 3), "routes": summary},
+                          file, indent=2)
+
+        mismatched = sum(1 for result in results if result["status"] != result["recorded"])
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} requests replayed, {mismatched} with a different "
+                                             f"status than recorded."))
@@ -0,0 +1,68 @@
+"""
+Run background task workers.
+"""
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.taskqueue import (TASKS,
+                            discover_tasks,
+                            schedule_periodic,
+                            run_worker)
+
+
+def _work(stop, options):
+    # Children share the parent's stop event; Ctrl-C reaches the whole process group.
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    run_worker(stop, options["batch_size"], options["lease"], options["poll_interval"], options["drain"])
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ("Claim and run queued tasks from every app's tasks module. Workers finish their current "
+            "task and exit on SIGINT or SIGTERM.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes to run.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Tasks claimed at a time.")
+        parser.add_argument("--lease", type=int, default=None, help="Seconds a claimed batch is leased for.")
+        parser.add_argument("--poll-interval", type=float, default=None, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--drain", action="store_true", help="Exit once no task is due.")
+
+    def handle(self, *args, **options):
+        if options["processes"] < 1:
+            raise CommandError("--processes must be at least 1.")
+
+        discover_tasks()
+        schedule_periodic()
+        self.stdout.write(f"Running {options['processes']} workers for {len(TASKS)} tasks.")
+
+        if options["processes"] == 1:
+            stop = multiprocessing.Event()
+            signal.signal(signal.SIGINT, lambda *args: stop.set())
+            signal.signal(signal.SIGTERM, lambda *args: stop.set())
+            succeeded, failed = run_worker(stop, options["batch_size"], options["lease"],
+                                           options["poll_interval"], options["drain"])
+            self.stdout.write(self.style.SUCCESS(f"{succeeded} tasks succeeded, {failed} failed."))
+            return
+
+        # Forked children must not share the parent's database connection.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        stop = context.Event()
+        workers = [context.Process(target=_work, args=(stop, options), daemon=True)
+                   for _ in range(options["processes"])]
+        for worker in workers:
+            worker.start()
+
+        signal.signal(signal.SIGINT, lambda *args: stop.set())
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        for worker in workers:
+            worker.join()
+        exit_codes = [worker.exitcode for worker in workers]
+        if any(exit_codes):
+            raise CommandError(f"Workers exited with {exit_codes}.")
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-19 08:08
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_idempotencykeymodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('kwargs', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('key', models.CharField(blank=True, max_length=255, null=True, unique=True)),
+                ('priority', models.SmallIntegerField(default=0)),
+                ('state', models.CharField(choices=[('Q', 'Queued'), ('F', 'Failed')], default='Q', max_length=1)),
+                ('run_at', models.DateTimeField()),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField()),
+                ('lease_token', models.CharField(blank=True, db_index=True, default='', max_length=32)),
+                ('locked_by', models.CharField(blank=True, default='', max_length=255)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['state', '-priority', 'run_at'], name='core_taskmo_state_1d0deb_idx')],
+            },
+        ),
+    ]
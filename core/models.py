@@ -1,8 +1,11 @@
 """
 Supporting models for document uploads.
 """
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
-from core.globalchoices import COLOR_CHOICES
+from core.globalchoices import (COLOR_CHOICES,
+                                IDEMPOTENCY_STATE_CHOICES,
+                                TASK_STATE_CHOICES)
 
 
 class ImageModel(models.Model):
@@ -28,3 +31,51 @@ class ColorModel(models.Model):
 
     def __str__(self):
         return self.color
+
+
+class IdempotencyKeyModel(models.Model):
+    """First response stored per Idempotency-Key, replayed for retries until it expires."""
+    key = models.CharField(max_length=255)
+    scope = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    state = models.CharField(max_length=1, choices=IDEMPOTENCY_STATE_CHOICES, default="P")
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="unique_idempotency_scope_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key}"
+
+
+class TaskModel(models.Model):
+    """
+    A queued background task. Claimed tasks stay queued with `run_at` pushed to the end of the
+    lease, finished ones are deleted and failed ones kept until cleanup.
+    """
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    priority = models.SmallIntegerField(default=0)
+    state = models.CharField(max_length=1, choices=TASK_STATE_CHOICES, default="Q")
+    run_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField()
+    lease_token = models.CharField(max_length=32, blank=True, default="", db_index=True)
+    locked_by = models.CharField(max_length=255, blank=True, default="")
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["state", "-priority", "run_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name} {self.id}"
@@ -0,0 +1,54 @@
+"""
+Paginator that estimates the row count of large unfiltered tables.
+"""
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+
+def estimate_row_count(model, using="default"):
+    """
+    Cheap row count estimate from the database statistics, None when unavailable.
+    SQLite has no statistics table by default so the highest primary key is used.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+
+        if connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+                [table]
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    if model._meta.pk.get_internal_type() in ("AutoField", "BigAutoField", "SmallAutoField"):
+        return model._default_manager.using(using).aggregate(last=Max("pk"))["last"] or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Use the estimated row count for unfiltered querysets of large tables.
+    Small tables and filtered querysets still get an exact COUNT(*).
+    """
+    exact_below = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+
+        if query is not None and not query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.exact_below:
+                return estimate
+
+        return super().count
@@ -1,6 +1,39 @@
-"""Error Serializers for Doc's."""
+"""Error Serializers for Doc's, and the batch request."""
+from django.urls import reverse
 from rest_framework import serializers
 
+from clovigo_main import settings
+
 
 class ErrorResponseSerializer(serializers.Serializer):
     error = serializers.CharField()
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    """One sub-request of a batch. `path` may carry a query string."""
+    method = serializers.ChoiceField(choices=["GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"], default="GET")
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False, allow_null=True)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+
+    def validate_path(self, path):
+        if not path.startswith("/api/") or path.split("?")[0] == reverse("catalog:batch"):
+            raise serializers.ValidationError("Must be an API path other than the batch endpoint.")
+        return path
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """Validate a batch of sub-requests."""
+    requests = serializers.ListField(child=BatchOperationSerializer(), min_length=1,
+                                     max_length=settings.BATCH_MAX_REQUESTS)
+
+
+class BatchResultSerializer(serializers.Serializer):
+    """Sub-request outcome visualise for Swagger UI."""
+    status = serializers.IntegerField()
+    body = serializers.JSONField(allow_null=True)
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    """Batch response visualise for Swagger UI."""
+    responses = BatchResultSerializer(many=True)
@@ -0,0 +1,86 @@
+"""
+Sparse fieldsets for model serializers.
+
+`?fields=a,b` keeps only those fields in the output and `?expand=rel` nests a
+related object instead of its id. The same choice prunes the SQL: the
+queryset loads only the columns behind the kept fields with `.only()` and
+joins exactly the expanded relations with `select_related`.
+"""
+
+
+def _split(raw):
+    return [name for name in (part.strip() for part in raw.split(",")) if name]
+
+
+def _concrete(model):
+    return {field.name for field in model._meta.concrete_fields}
+
+
+def sparse_options(query_params, serializer_class):
+    """
+    Serializer kwargs from the `fields` and `expand` query params.
+    Raises ValueError naming the fields or relations the serializer doesn't have.
+    """
+    options = {}
+    fields = _split(query_params.get("fields", ""))
+    expand = _split(query_params.get("expand", ""))
+
+    if fields:
+        unknown = sorted(set(fields) - set(serializer_class().fields))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}.")
+        options["fields"] = fields
+    if expand:
+        unknown = sorted(set(expand) - set(getattr(serializer_class.Meta, "expandable", {})))
+        if unknown:
+            raise ValueError(f"Relations that can't be expanded: {', '.join(unknown)}.")
+        options["expand"] = expand
+    return options
+
+
+class SparseFieldsMixin:
+    """
+    ModelSerializer limited to `fields` (all when None), with the `expand`ed relations nested.
+    `Meta.expandable` maps relation fields to the serializer nesting them.
+    """
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse = fields is not None
+        self.expanded = list(dict.fromkeys(expand))
+
+        expandable = getattr(self.Meta, "expandable", {})
+        for name in self.expanded:
+            self.fields[name] = expandable[name](read_only=True)
+        if self.sparse:
+            keep = set(fields) | set(self.expanded)
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
+    def columns(self):
+        """Model fields (and `relation__field` for expanded relations) the kept fields read."""
+        model = self.Meta.model
+        concrete = _concrete(model)
+        columns = {model._meta.pk.name}
+        for name, field in self.fields.items():
+            source = field.source.split(".")[0]
+            if name in self.expanded:
+                related = _concrete(field.Meta.model)
+                columns.update(
+                    f"{source}__{child.source}" for child in field.fields.values() if child.source in related
+                )
+            elif source in concrete:
+                columns.add(source)
+        return columns
+
+    def restrict(self, queryset, *columns):
+        """
+        `queryset` loading only what this serializer outputs, plus `columns` the caller needs.
+        Unchanged when neither fields nor relations were picked.
+        """
+        if not self.sparse and not self.expanded:
+            return queryset
+        if self.expanded:
+            queryset = queryset.select_related(*self.expanded)
+        return queryset.only(*self.columns(), *columns)
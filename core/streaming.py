@@ -0,0 +1,87 @@
+"""
+Streaming CSV/NDJSON exports.
+
+Rows are read with `values_list().iterator()` so no model instances are built
+and memory stays flat, encoded in chunks and optionally gzipped on the fly.
+"""
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from clovigo_main import settings
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes."""
+
+    def write(self, value):
+        return value
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def csv_stream(header, rows, chunk_size):
+    """Encode rows as CSV, one bytes chunk per `chunk_size` rows."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header).encode("utf-8")
+    for chunk in _chunks(rows, chunk_size):
+        yield "".join(writer.writerow(row) for row in chunk).encode("utf-8")
+
+
+def ndjson_stream(header, rows, chunk_size):
+    """Encode rows as one JSON object per line."""
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for chunk in _chunks(rows, chunk_size):
+        yield "".join(encoder.encode(dict(zip(header, row))) + "\n" for row in chunk).encode("utf-8")
+
+
+def gzip_stream(chunks):
+    """Gzip a byte stream, flushing every chunk so the client receives data immediately."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(request, queryset, fields, export_format, filename, header=None):
+    """
+    Stream `fields` of the queryset as a CSV or NDJSON download.
+    `header` renames the columns, it defaults to the field names.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    header = header or fields
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+    encode = csv_stream if export_format == "csv" else ndjson_stream
+    body = encode(header, rows, chunk_size)
+
+    gzipped = "gzip" in request.headers.get("Accept-Encoding", "")
+    if gzipped:
+        body = gzip_stream(body)
+
+    response = StreamingHttpResponse(body, content_type=EXPORT_FORMATS[export_format])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{export_format}"'
+    response["Vary"] = "Accept-Encoding"
+    if gzipped:
+        response["Content-Encoding"] = "gzip"
+    return response
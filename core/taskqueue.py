@@ -0,0 +1,234 @@
+"""
+Database-backed background task queue.
+
+Functions decorated with `@task` in an app's `tasks` module can be queued with
+`fn.enqueue(**kwargs)`. The row is written in the caller's transaction, so a
+task queued by a request that rolls back never runs. Workers (see run_tasks)
+claim batches of due tasks, highest priority first, by pushing their `run_at`
+to the end of a lease. Finished tasks are deleted; a failed attempt is retried
+with exponential backoff until `max_attempts`, then kept with state "F".
+
+Delivery is at least once: a worker that dies or overruns its lease leaves
+the task to be claimed again, so tasks have to be safe to repeat.
+
+Tasks with `every` re-queue themselves on completion under a fixed key, and
+every worker makes sure they are queued when it starts.
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from clovigo_main import settings
+from core.models import TaskModel
+
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+class TaskSpec:
+    """A registered task function and its queueing defaults."""
+
+    def __init__(self, fn, name, priority, max_attempts, every):
+        self.fn = fn
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.every = every
+
+    @property
+    def periodic_key(self):
+        return f"periodic:{self.name}"
+
+
+def task(name=None, priority=0, max_attempts=None, every=None):
+    """
+    Register a function as a task. `every` (a timedelta) makes it periodic.
+    The function gains `enqueue(delay=None, run_at=None, priority=None, key=None, **kwargs)`.
+    """
+    def register(fn):
+        spec = TaskSpec(fn, name or f"{fn.__module__}.{fn.__name__}", priority,
+                        max_attempts or settings.TASK_MAX_ATTEMPTS, every)
+        TASKS[spec.name] = spec
+
+        def enqueue_task(delay=None, run_at=None, priority=None, key=None, **kwargs):
+            return enqueue(spec.name, kwargs, delay=delay, run_at=run_at, priority=priority, key=key)
+
+        fn.enqueue = enqueue_task
+        fn.task_name = spec.name
+        return fn
+    return register
+
+
+def discover_tasks():
+    """Import every installed app's `tasks` module so their tasks are registered."""
+    autodiscover_modules("tasks")
+
+
+def enqueue(name, kwargs=None, delay=None, run_at=None, priority=None, key=None):
+    """
+    Queue task `name`. With a `key`, nothing is queued while a task with the same key exists.
+    Returns the TaskModel, None when skipped for its key. Runs the task after commit instead
+    when TASKS_EAGER is on.
+    """
+    spec = TASKS[name]
+    kwargs = kwargs or {}
+    if settings.TASKS_EAGER:
+        transaction.on_commit(lambda: spec.fn(**kwargs))
+        return None
+
+    run_at = run_at or timezone.now() + (delay or timedelta())
+    row = TaskModel(name=name, kwargs=kwargs, key=key, run_at=run_at,
+                    priority=spec.priority if priority is None else priority, max_attempts=spec.max_attempts)
+    if key is None:
+        row.save()
+        return row
+    try:
+        with transaction.atomic():
+            row.save()
+    except IntegrityError:
+        return None
+    return row
+
+
+def schedule_periodic():
+    """Queue every periodic task that isn't queued yet."""
+    for spec in TASKS.values():
+        if spec.every:
+            enqueue(spec.name, key=spec.periodic_key)
+
+
+def claim(worker, batch_size=None, lease=None):
+    """
+    Lease up to `batch_size` due tasks to `worker` for `lease` seconds.
+    Returns the claimed TaskModels, highest priority first.
+    """
+    batch_size = batch_size or settings.TASK_BATCH_SIZE
+    lease = lease or settings.TASK_LEASE_SECONDS
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = TaskModel.objects.filter(state="Q", run_at__lte=now)
+    ordering = ["-priority", "run_at", "id"]
+    changes = {"lease_token": token, "locked_by": worker, "run_at": now + timedelta(seconds=lease),
+               "attempts": F("attempts") + 1}
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).order_by(*ordering).values_list("id", flat=True)[:batch_size])
+            TaskModel.objects.filter(id__in=ids).update(**changes)
+    else:
+        # One UPDATE picks and leases the batch. The outer filter repeats the due check so a row
+        # leased by a concurrent worker meanwhile is skipped rather than taken over.
+        due.filter(id__in=due.order_by(*ordering).values("id")[:batch_size]).update(**changes)
+
+    return list(TaskModel.objects.filter(lease_token=token).order_by(*ordering))
+
+
+def complete(row):
+    """Delete a finished task, re-queueing periodic ones. False when the lease was lost meanwhile."""
+    spec = TASKS.get(row.name)
+    with transaction.atomic():
+        deleted = TaskModel.objects.filter(id=row.id, lease_token=row.lease_token).delete()[0]
+        if deleted and spec and spec.every and row.key == spec.periodic_key:
+            enqueue(spec.name, row.kwargs, delay=spec.every, key=row.key)
+    return bool(deleted)
+
+
+def fail(row, error):
+    """Schedule a retry with backoff, or mark the task failed after its last attempt."""
+    spec = TASKS.get(row.name)
+    changes = {"lease_token": "", "locked_by": "", "last_error": error}
+    if row.attempts < row.max_attempts:
+        delay = settings.TASK_RETRY_DELAY * 2 ** (row.attempts - 1)
+        changes["run_at"] = timezone.now() + timedelta(seconds=delay)
+        TaskModel.objects.filter(id=row.id, lease_token=row.lease_token).update(**changes)
+        return
+
+    # A periodic task gives up its key when it fails for good, so its next run can be queued.
+    changes.update(state="F", key=None)
+    with transaction.atomic():
+        updated = TaskModel.objects.filter(id=row.id, lease_token=row.lease_token).update(**changes)
+        if updated and spec and spec.every and row.key == spec.periodic_key:
+            enqueue(spec.name, row.kwargs, delay=spec.every, key=row.key)
+
+
+def release(rows):
+    """Hand leased tasks that weren't started back to the queue, without counting the attempt."""
+    for row in rows:
+        TaskModel.objects.filter(id=row.id, lease_token=row.lease_token).update(
+            lease_token="", locked_by="", run_at=timezone.now(), attempts=F("attempts") - 1
+        )
+
+
+def execute(row):
+    """Run one claimed task and record the outcome. Returns True when it succeeded."""
+    spec = TASKS.get(row.name)
+    if spec is None:
+        fail(row, f"Unknown task {row.name}.")
+        return False
+    try:
+        spec.fn(**row.kwargs)
+    except Exception:
+        logger.exception("Task %s %s failed", row.name, row.id)
+        fail(row, traceback.format_exc())
+        return False
+    complete(row)
+    return True
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(stop, batch_size=None, lease=None, poll_interval=None, drain=False):
+    """
+    Claim and run tasks until `stop` (a threading or multiprocessing Event) is set, or the queue
+    has no due tasks when `drain` is on. Returns how many tasks succeeded and failed.
+    """
+    lease = lease or settings.TASK_LEASE_SECONDS
+    poll_interval = settings.TASK_POLL_INTERVAL if poll_interval is None else poll_interval
+    worker = worker_name()
+    succeeded = failed = 0
+
+    while not stop.is_set():
+        rows = claim(worker, batch_size, lease)
+        if not rows:
+            if drain:
+                break
+            stop.wait(poll_interval)
+            continue
+
+        # Leave a margin so no task starts after its lease could have been taken over.
+        deadline = time.monotonic() + lease * 0.9
+        for index, row in enumerate(rows):
+            if stop.is_set() or time.monotonic() > deadline:
+                release(rows[index:])
+                break
+            if execute(row):
+                succeeded += 1
+            else:
+                failed += 1
+
+    return succeeded, failed
+
+
+def cleanup_failed_tasks(days=None, batch_size=1000):
+    """Delete tasks that failed more than `days` ago in batches and return how many were removed."""
+    days = settings.TASK_FAILED_TTL_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+    while True:
+        ids = list(TaskModel.objects.filter(state="F", updated_at__lt=cutoff).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += TaskModel.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,18 @@
+"""
+Periodic cleanups of the core tables.
+"""
+from datetime import timedelta
+
+from core.idempotency import cleanup_idempotency_keys
+from core.taskqueue import (task,
+                            cleanup_failed_tasks)
+
+
+@task(every=timedelta(hours=1))
+def expire_idempotency_keys():
+    cleanup_idempotency_keys()
+
+
+@task(every=timedelta(days=1))
+def expire_failed_tasks():
+    cleanup_failed_tasks()
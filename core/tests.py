@@ -1,3 +1,127 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from clovigo_main import settings
+from core import taskqueue
+from core.models import TaskModel
+
+
+CALLS = []
+
+
+@taskqueue.task(name="core.tests.record")
+def record(value):
+    CALLS.append(value)
+
+
+@taskqueue.task(name="core.tests.broken", max_attempts=3, every=timedelta(hours=1))
+def broken():
+    raise RuntimeError("broken")
+
+
+def make_due(row):
+    TaskModel.objects.filter(id=row.id).update(run_at=timezone.now() - timedelta(seconds=1))
+
+
+class TaskQueueTests(TestCase):
+    """Leases, retries and periodic re-queueing of the task queue."""
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_claim_leases_due_tasks(self):
+        first = taskqueue.enqueue("core.tests.record", {"value": 1})
+        taskqueue.enqueue("core.tests.record", {"value": 2}, delay=timedelta(hours=1))
+
+        rows = taskqueue.claim("w1", lease=60)
+        self.assertEqual([row.id for row in rows], [first.id])
+        self.assertEqual((rows[0].locked_by, rows[0].attempts), ("w1", 1))
+        self.assertGreater(rows[0].run_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(taskqueue.claim("w2", lease=60), [])
+
+    def test_execute_runs_and_deletes(self):
+        taskqueue.enqueue("core.tests.record", {"value": 7})
+        row, = taskqueue.claim("w1")
+
+        self.assertTrue(taskqueue.execute(row))
+        self.assertEqual(CALLS, [7])
+        self.assertFalse(TaskModel.objects.exists())
+
+    def test_lost_lease_is_not_completed_twice(self):
+        taskqueue.enqueue("core.tests.record", {"value": 1})
+        stale, = taskqueue.claim("w1", lease=60)
+        make_due(stale)
+        current, = taskqueue.claim("w2", lease=60)
+
+        self.assertEqual((current.id, current.attempts), (stale.id, 2))
+        self.assertFalse(taskqueue.complete(stale))
+        self.assertTrue(TaskModel.objects.filter(id=stale.id).exists())
+        self.assertTrue(taskqueue.complete(current))
+        self.assertFalse(taskqueue.complete(current))
+        self.assertFalse(TaskModel.objects.exists())
+
+    def test_lost_lease_failure_is_ignored(self):
+        taskqueue.enqueue("core.tests.record", {"value": 1})
+        stale, = taskqueue.claim("w1", lease=60)
+        make_due(stale)
+        current, = taskqueue.claim("w2", lease=60)
+
+        taskqueue.fail(stale, "late")
+        row = TaskModel.objects.get()
+        self.assertEqual((row.lease_token, row.last_error), (current.lease_token, ""))
+
+    def test_release_does_not_count_the_attempt(self):
+        taskqueue.enqueue("core.tests.record", {"value": 1})
+        rows = taskqueue.claim("w1")
+        taskqueue.release(rows)
+
+        row = TaskModel.objects.get()
+        self.assertEqual((row.attempts, row.lease_token), (0, ""))
+        self.assertEqual(len(taskqueue.claim("w2")), 1)
+
+    def test_enqueue_skips_a_taken_key(self):
+        self.assertIsNotNone(taskqueue.enqueue("core.tests.record", {"value": 1}, key="once"))
+        self.assertIsNone(taskqueue.enqueue("core.tests.record", {"value": 2}, key="once"))
+        self.assertEqual(TaskModel.objects.count(), 1)
+
+    def test_retry_backoff_then_failed_and_requeued(self):
+        key = taskqueue.TASKS["core.tests.broken"].periodic_key
+        taskqueue.enqueue("core.tests.broken", key=key)
+
+        for attempt in (1, 2):
+            row, = taskqueue.claim("w1")
+            started = timezone.now()
+            with self.assertLogs("core.taskqueue", "ERROR"):
+                self.assertFalse(taskqueue.execute(row))
+
+            row.refresh_from_db()
+            delay = timedelta(seconds=settings.TASK_RETRY_DELAY * 2 ** (attempt - 1))
+            self.assertEqual((row.state, row.attempts, row.lease_token), ("Q", attempt, ""))
+            self.assertIn("RuntimeError", row.last_error)
+            self.assertGreaterEqual(row.run_at, started + delay)
+            self.assertLessEqual(row.run_at, timezone.now() + delay)
+            self.assertEqual(taskqueue.claim("w1"), [])
+            make_due(row)
+
+        row, = taskqueue.claim("w1")
+        started = timezone.now()
+        with self.assertLogs("core.taskqueue", "ERROR"):
+            self.assertFalse(taskqueue.execute(row))
+
+        row.refresh_from_db()
+        self.assertEqual((row.state, row.attempts, row.key), ("F", 3, None))
+        next_run = TaskModel.objects.get(key=key)
+        self.assertEqual((next_run.state, next_run.attempts), ("Q", 0))
+        self.assertGreaterEqual(next_run.run_at, started + timedelta(hours=1))
+
+    def test_periodic_task_requeues_on_completion(self):
+        key = taskqueue.TASKS["core.tests.broken"].periodic_key
+        taskqueue.enqueue("core.tests.broken", key=key)
+        row, = taskqueue.claim("w1")
 
-# Create your tests here.
+        self.assertTrue(taskqueue.complete(row))
+        next_run = TaskModel.objects.get()
+        self.assertNotEqual(next_run.id, row.id)
+        self.assertEqual((next_run.key, next_run.state), (key, "Q"))
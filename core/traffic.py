@@ -0,0 +1,264 @@
+"""
+Traffic capture and replay.
+
+TrafficCaptureMiddleware appends every API request to an NDJSON file when
+TRAFFIC_CAPTURE_PATH is set: arrival time, method, path, resolved route,
+query, body and the response status and duration. Bodies and queries are
+recorded by shape: every key is kept, but only the values of fields listed in
+TRAFFIC_CAPTURE_FIELDS (ids, quantities, paging and filter parameters) are
+written. Any other value, which may be a password, phone number, name or
+address, is replaced by its type and length. Uploaded files are recorded by
+name and size only. Authorization headers are never written, only whether
+the request had one.
+
+`replay` re-issues a capture against a running server, keeping the original
+gaps between requests (optionally sped up), and compares the statuses with
+the recorded ones. Redacted values are sent as placeholders of the recorded
+type and length, and passwords as --password when one is given.
+"""
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.exceptions import MiddlewareNotUsed
+from django.http.multipartparser import MultiPartParserError
+from django.http.request import RawPostDataException
+
+from clovigo_main import settings
+
+
+logger = logging.getLogger(__name__)
+
+def _kept(key):
+    return str(key).lower() in settings.TRAFFIC_CAPTURE_FIELDS
+
+
+def redact(value, keep=False):
+    """
+    Shape of a decoded body or query: keys and the values of kept fields as they are, any
+    other value as `{"redacted": type name, "length": length of its text}`.
+    """
+    if isinstance(value, dict):
+        return {key: redact(item, _kept(key)) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item, keep) for item in value]
+    if keep or value is None:
+        return value
+    return {"redacted": type(value).__name__, "length": len(str(value))}
+
+
+def _redacted(value):
+    return isinstance(value, dict) and set(value) == {"redacted", "length"}
+
+
+def _flatten(querydict):
+    return {key: values[0] if len(values) == 1 else values for key, values in querydict.lists()}
+
+
+class TrafficCaptureMiddleware:
+    """Record API requests to TRAFFIC_CAPTURE_PATH. Not loaded at all when the path is unset."""
+
+    def __init__(self, get_response):
+        if not settings.TRAFFIC_CAPTURE_PATH:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.path = settings.TRAFFIC_CAPTURE_PATH
+        self.lock = threading.Lock()
+        self.file = None
+
+    def __call__(self, request):
+        if not request.path.startswith(tuple(settings.TRAFFIC_CAPTURE_PREFIXES)):
+            return self.get_response(request)
+
+        arrived = time.time()
+        content_type = request.content_type or ""
+        size = int(request.META.get("CONTENT_LENGTH") or 0)
+
+        # JSON bodies have to be read before the view consumes the stream. Form bodies are
+        # taken from request.POST afterwards, once DRF has parsed them.
+        body = None
+        if content_type == "application/json" and 0 < size <= settings.TRAFFIC_CAPTURE_MAX_BODY:
+            try:
+                body = redact(json.loads(request.body))
+            except ValueError:
+                body = None
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        if content_type in ("multipart/form-data", "application/x-www-form-urlencoded"):
+            body = self._form_body(request)
+
+        match = request.resolver_match
+        self.write({
+            "t": round(arrived, 3),
+            "method": request.method,
+            "path": request.path,
+            "route": match.view_name if match else None,
+            "query": redact(_flatten(request.GET)),
+            "type": content_type if size else None,
+            "size": size,
+            "body": body,
+            "auth": "HTTP_AUTHORIZATION" in request.META,
+            "status": response.status_code,
+            "ms": round(duration * 1000, 2),
+        })
+        return response
+
+    @staticmethod
+    def _form_body(request):
+        try:
+            body = redact(_flatten(request.POST))
+            files = request.FILES
+        except (RawPostDataException, MultiPartParserError):
+            return None
+        for key, file in files.items():
+            body[key] = {"file": file.name, "size": file.size, "content_type": file.content_type}
+        return body
+
+    def write(self, record):
+        line = json.dumps(record, separators=(",", ":"), default=str).encode() + b"\n"
+        with self.lock:
+            try:
+                if self.file is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    # Unbuffered append, each record is a single write even with several workers.
+                    self.file = open(self.path, "ab", buffering=0)
+                self.file.write(line)
+            except OSError:
+                logger.exception("Traffic capture write failed")
+
+
+def load_capture(path):
+    """Records of a capture file in arrival order."""
+    with open(path) as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    records.sort(key=lambda record: record["t"])
+    return records
+
+
+# Stand-ins sent for redacted values of each recorded type.
+PLACEHOLDERS = {"int": 0, "float": 0.0, "bool": False}
+
+
+def fill_redacted(value, password=None):
+    """Copy of a recorded body or query with placeholders in place of the redacted values."""
+    if _redacted(value):
+        return PLACEHOLDERS.get(value["redacted"], "x" * value["length"])
+    if isinstance(value, dict):
+        return {key: password if password is not None and _redacted(item) and "password" in key.lower()
+                else fill_redacted(item, password)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill_redacted(item, password) for item in value]
+    return value
+
+
+def _send(session, base_url, record, password, authorization, timeout):
+    headers = {}
+    if record["auth"] and authorization:
+        headers["Authorization"] = authorization
+
+    raw = record["body"]
+    body = fill_redacted(raw, password)
+
+    kwargs = {}
+    if record["type"] == "application/json" and body is not None:
+        kwargs["json"] = body
+    elif record["type"] in ("multipart/form-data", "application/x-www-form-urlencoded") and body is not None:
+        uploads = {key for key, value in raw.items() if isinstance(value, dict) and "file" in value}
+        kwargs["data"] = {key: value for key, value in body.items() if key not in uploads}
+        files = {key: (body[key]["file"], b"\0" * body[key]["size"], body[key]["content_type"]) for key in uploads}
+        if files:
+            kwargs["files"] = files
+
+    started = time.perf_counter()
+    try:
+        response = session.request(record["method"], base_url + record["path"], params=fill_redacted(record["query"]),
+                                   headers=headers, timeout=timeout, **kwargs)
+        response.content
+        status, error = response.status_code, None
+    except requests.RequestException as e:
+        status, error = None, type(e).__name__
+    return {
+        "route": record["route"] or record["path"],
+        "method": record["method"],
+        "recorded": record["status"],
+        "status": status,
+        "error": error,
+        "ms": (time.perf_counter() - started) * 1000,
+        "recorded_ms": record["ms"],
+    }
+
+
+def replay(records, base_url, speed=1.0, workers=16, password=None, authorization=None, timeout=30):
+    """
+    Re-issue `records` against `base_url` with their original gaps divided by `speed`, 0 sends them
+    back to back. Returns one result per record and the most a request was sent late, in seconds.
+    """
+    base_url = base_url.rstrip("/")
+    sessions = threading.local()
+
+    def send(record):
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        return _send(sessions.session, base_url, record, password, authorization, timeout)
+
+    futures = []
+    max_lag = 0.0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if records:
+            first = records[0]["t"]
+            started = time.monotonic()
+            for record in records:
+                if speed:
+                    due = started + (record["t"] - first) / speed
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        max_lag = max(max_lag, -delay)
+                futures.append(executor.submit(send, record))
+    return [future.result() for future in futures], max_lag
+
+
+def _percentiles(timings):
+    if len(timings) < 2:
+        value = round(timings[0], 2) if timings else None
+        return value, value, value
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    return round(cuts[49], 2), round(cuts[94], 2), round(cuts[98], 2)
+
+
+def summarize(results):
+    """Latency percentiles, recorded latency and status differences per route."""
+    routes = defaultdict(list)
+    for result in results:
+        routes[(result["method"], result["route"])].append(result)
+
+    summary = []
+    for (method, route), rows in sorted(routes.items(), key=lambda item: (item[0][1], item[0][0])):
+        p50, p95, p99 = _percentiles([row["ms"] for row in rows if row["error"] is None])
+        diffs = Counter(
+            f"{row['recorded']} -> {row['status'] or row['error']}"
+            for row in rows if row["status"] != row["recorded"]
+        )
+        summary.append({
+            "method": method,
+            "route": route,
+            "requests": len(rows),
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "recorded_p95_ms": _percentiles([row["recorded_ms"] for row in rows])[1],
+            "errors": sum(1 for row in rows if row["error"] or row["status"] >= 500),
+            "status_diffs": dict(diffs),
+        })
+    return summary
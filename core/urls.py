@@ -6,4 +6,5 @@ app_name = "catalog"
 
 urlpatterns = [
     path('', CatalogHomeView.as_view(), name='catalog'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
 ]
@@ -7,6 +7,11 @@ from django.core.exceptions import ImproperlyConfigured
 from drf_spectacular.utils import (extend_schema,
                                    OpenApiResponse)
 
+from clovigo_main import settings
+from core.batch import run_batch
+from core.serializers import (BatchRequestSerializer,
+                              BatchResponseSerializer)
+
 
 class CatalogHomeView(APIView):
     """
@@ -52,3 +57,40 @@ class CatalogHomeView(APIView):
                 {"error": f"An unexpected error occurred: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+class BatchView(APIView):
+    """
+    Run several API calls in one request.
+    Each sub-request is authenticated by its own view with the batch's headers.
+    """
+    authentication_classes = []
+    permission_classes = []
+
+    @extend_schema(
+        summary="Batch requests",
+        description=f"Up to {settings.BATCH_MAX_REQUESTS} sub-requests, each with `method`, `path` (with "
+                    "query string), JSON `body` and extra `headers`. They run in order, consecutive "
+                    "reads concurrently, and every one gets its own status and body in the response.",
+        request=BatchRequestSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=BatchResponseSerializer,
+                description="Status and body of every sub-request, in order.",
+            ),
+            400: OpenApiResponse(
+                description="Validation errors.",
+            )
+        },
+        tags=["Catalog"]
+    )
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+
+        if serializer.is_valid():
+            results, cookies = run_batch(request._request, serializer.validated_data["requests"])
+            response = Response({"responses": results}, status=status.HTTP_200_OK)
+            response.cookies.update(cookies)
+            return response
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
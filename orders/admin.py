@@ -1,7 +1,44 @@
 from django.contrib import admin
 from orders.models import (OrderModel,
+                            ArchivedOrderModel,
+                            OrderStatusEventModel,
                             LatestDealModel)
 
+from core.admin import LargeTableAdmin
 
-admin.site.register(OrderModel)
-admin.site.register(LatestDealModel)
\ No newline at end of file
+
+@admin.register(OrderModel)
+class OrderModelAdmin(LargeTableAdmin):
+    list_display = ["id", "product", "customer", "quantity", "order_status", "delivery_boy", "created_at"]
+    list_select_related = ["product", "customer__user", "delivery_boy__user"]
+    list_filter = ["order_status"]
+    raw_id_fields = ["product", "customer", "delivery_boy"]
+
+
+@admin.register(ArchivedOrderModel)
+class ArchivedOrderModelAdmin(LargeTableAdmin):
+    """Archived orders are read-only."""
+    list_display = ["id", "product", "customer", "quantity", "order_status", "created_at", "archived_at"]
+    list_select_related = ["product", "customer__user"]
+    list_filter = ["order_status"]
+    raw_id_fields = ["product", "customer", "delivery_boy"]
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OrderStatusEventModel)
+class OrderStatusEventModelAdmin(LargeTableAdmin):
+    """Status events are append-only."""
+    list_display = ["id", "order", "from_status", "to_status", "created_at"]
+    raw_id_fields = ["order", "customer"]
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LatestDealModel)
+class LatestDealModelAdmin(admin.ModelAdmin):
+    list_display = ["id", "product", "page_slug", "created_at"]
+    list_select_related = ["product"]
+    raw_id_fields = ["image", "product"]
@@ -0,0 +1,111 @@
+"""
+Hot/cold tiering of orders.
+
+Delivered and cancelled orders that haven't changed for a while are copied to
+ArchivedOrderModel and deleted from OrderModel in batches, so the table every
+order query hits only holds recent and open orders. Their status events stay
+in OrderStatusEventModel.
+
+Order history is paged newest first on `(created_at, id)`. A page is read from
+OrderModel alone unless it reaches back past the newest archived order of the
+customer or seller; only then is the archive queried and merged in.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.utils import timezone
+
+from clovigo_main import settings
+from core.pagination import KeysetPagination
+from orders.models import (OrderModel,
+                           ArchivedOrderModel)
+
+
+ARCHIVABLE_STATUSES = ["D", "C"]
+
+ARCHIVE_FIELDS = ["id", "product_id", "customer_id", "quantity", "order_status",
+                  "delivery_boy_id", "assigned_at", "created_at", "updated_at"]
+
+HISTORY_FIELDS = ["id", "product", "quantity", "order_status", "delivery_boy",
+                  "assigned_at", "created_at", "updated_at"]
+
+
+def archive_orders(days=None, batch_size=None):
+    """
+    Move delivered and cancelled orders not updated for `days` to the archive.
+    Every batch is copied and deleted in one transaction. Returns how many orders moved.
+    """
+    days = settings.ORDER_ARCHIVE_AFTER_DAYS if days is None else days
+    batch_size = batch_size or settings.ORDER_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+
+    candidates = OrderModel.objects.filter(order_status__in=ARCHIVABLE_STATUSES, updated_at__lt=cutoff)
+    archived = 0
+    last_id = 0
+
+    while True:
+        with transaction.atomic():
+            rows = list(
+                candidates.filter(id__gt=last_id).select_for_update()
+                .order_by("id").values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                return archived
+
+            # An id already in the archive is left in place rather than overwritten or lost.
+            existing = set(
+                ArchivedOrderModel.objects.filter(id__in=[row["id"] for row in rows])
+                .values_list("id", flat=True)
+            )
+            moved = [row for row in rows if row["id"] not in existing]
+            ArchivedOrderModel.objects.bulk_create([ArchivedOrderModel(**row) for row in moved])
+            OrderModel.objects.filter(id__in=[row["id"] for row in moved]).delete()
+
+        last_id = rows[-1]["id"]
+        archived += len(moved)
+
+
+HISTORY_PAGINATION = KeysetPagination(["-created_at", "-id"], settings.ORDER_HISTORY_PAGE_SIZE)
+
+
+def decode_cursor(cursor):
+    """`[created_at, id]` of a history cursor, None when it is malformed."""
+    return HISTORY_PAGINATION.decode(cursor, OrderModel)
+
+
+def _sort_key(row):
+    return row["created_at"], row["id"]
+
+
+def _history_page(model, filters, position, limit, archived):
+    queryset = HISTORY_PAGINATION.after(model.objects.filter(**filters), position)
+    return list(
+        queryset.order_by(*HISTORY_PAGINATION.ordering)
+        .values(*HISTORY_FIELDS, product_name=F("product__product_name"), archived=Value(archived))[:limit]
+    )
+
+
+def order_history(filters, position=None, page_size=None):
+    """
+    One page of orders matching `filters`, newest first, from both tables.
+    `position` is a decoded cursor. Returns the rows and the next cursor, None on the last page.
+    """
+    page_size = page_size or HISTORY_PAGINATION.page_size
+    rows = _history_page(OrderModel, filters, position, page_size + 1, False)
+
+    needs_archive = True
+    if len(rows) > page_size:
+        newest_archived = (
+            ArchivedOrderModel.objects.filter(**filters)
+            .order_by("-created_at", "-id").values_list("created_at", "id").first()
+        )
+        needs_archive = newest_archived is not None and newest_archived > _sort_key(rows[page_size - 1])
+
+    if needs_archive:
+        rows += _history_page(ArchivedOrderModel, filters, position, page_size + 1, True)
+        rows.sort(key=_sort_key, reverse=True)
+
+    if len(rows) > page_size:
+        return rows[:page_size], HISTORY_PAGINATION.encode(rows[page_size - 1])
+    return rows, None
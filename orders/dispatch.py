@@ -0,0 +1,138 @@
+"""
+Batched assignment of shipped orders to delivery boys.
+
+Riders are indexed in memory per district as min-heaps keyed by their open
+order count, so each batch is planned without touching the database and
+written back with one UPDATE per batch, picking each order's rider with a
+CASE on its id. The UPDATE only takes orders that are still shipped and
+unassigned, so a concurrent run or a cancellation between planning and
+writing never double-assigns an order or hands a cancelled one to a rider.
+"""
+import heapq
+
+from django.db.models import (Case,
+                              Count,
+                              IntegerField,
+                              Value,
+                              When)
+from django.utils import timezone
+
+from clovigo_main import settings
+from accounts.models import DeliveryBoyModel
+from orders.models import OrderModel
+
+
+# Statuses that keep a rider busy.
+OPEN_STATUSES = ("S", "O")
+
+
+class RiderIndex:
+    """Available riders per district, least loaded first."""
+
+    def __init__(self, max_load):
+        self.max_load = max_load
+        self._heaps = {}
+
+    def add(self, district, rider_id, load=0):
+        """Register a rider with its current number of open orders."""
+        if load < self.max_load:
+            heapq.heappush(self._heaps.setdefault(district, []), (load, rider_id))
+
+    def take(self, district):
+        """Return the least loaded rider of the district and count one order on it."""
+        heap = self._heaps.get(district)
+        if not heap:
+            return None
+
+        load, rider_id = heap[0]
+        if load + 1 < self.max_load:
+            heapq.heapreplace(heap, (load + 1, rider_id))
+        else:
+            heapq.heappop(heap)
+        return rider_id
+
+
+def plan_assignments(orders, index):
+    """
+    Assign `(order_id, district)` pairs using the rider index.
+    Returns the `(order_id, rider_id)` assignments and the unassigned order ids.
+    """
+    assigned = []
+    unassigned = []
+
+    for order_id, district in orders:
+        rider_id = index.take(district)
+        if rider_id is None:
+            unassigned.append(order_id)
+        else:
+            assigned.append((order_id, rider_id))
+
+    return assigned, unassigned
+
+
+def build_rider_index(max_load=None):
+    """Load active, OTP verified riders and their open order counts in two queries."""
+    index = RiderIndex(max_load or settings.DISPATCH_MAX_LOAD)
+
+    loads = dict(
+        OrderModel.objects.filter(order_status__in=OPEN_STATUSES, delivery_boy__isnull=False)
+        .values("delivery_boy")
+        .annotate(load=Count("id"))
+        .values_list("delivery_boy", "load")
+    )
+    riders = DeliveryBoyModel.objects.filter(
+        is_active=True, is_otp=True, user__is_active=True
+    ).values_list("id", "user__district")
+
+    for rider_id, district in riders.iterator(chunk_size=2000):
+        index.add(district, rider_id, loads.get(rider_id, 0))
+
+    return index
+
+
+def write_assignments(assigned):
+    """
+    Save `(order_id, rider_id)` assignments with one conditional UPDATE.
+    Returns how many orders were actually assigned.
+    """
+    if not assigned:
+        return 0
+
+    now = timezone.now()
+    rider = Case(
+        *[When(id=order_id, then=Value(rider_id)) for order_id, rider_id in assigned],
+        output_field=IntegerField()
+    )
+    return OrderModel.objects.filter(
+        id__in=[order_id for order_id, _ in assigned], order_status="S", delivery_boy__isnull=True
+    ).update(delivery_boy=rider, assigned_at=now, updated_at=now)
+
+
+def dispatch_shipped_orders(batch_size=None, max_load=None):
+    """
+    Assign every unassigned shipped order, one batch at a time.
+    Returns `(assigned, unassigned)` counts.
+    """
+    batch_size = batch_size or settings.DISPATCH_BATCH_SIZE
+    index = build_rider_index(max_load)
+    pending = OrderModel.objects.filter(order_status="S", delivery_boy__isnull=True).order_by("id")
+
+    assigned_total = 0
+    unassigned_total = 0
+    last_id = 0
+
+    while True:
+        batch = list(
+            pending.filter(id__gt=last_id).values_list("id", "customer__user__district")[:batch_size]
+        )
+        if not batch:
+            break
+        last_id = batch[-1][0]
+
+        assigned, unassigned = plan_assignments(batch, index)
+        unassigned_total += len(unassigned)
+
+        if assigned:
+            assigned_total += write_assignments(assigned)
+
+    return assigned_total, unassigned_total
@@ -0,0 +1,162 @@
+"""
+Shared change feed for order status events.
+
+One poller per process reads new OrderStatusEventModel rows and fans them out
+to every open stream, so connections don't each poll the database.
+"""
+import asyncio
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+
+from clovigo_main import settings
+from orders.models import OrderStatusEventModel
+
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = ("id", "order_id", "customer_id", "from_status", "to_status", "created_at")
+
+
+def fetch_events(after_id, customer_id=None, limit=500):
+    """Return events with id greater than `after_id` as plain dicts."""
+    queryset = OrderStatusEventModel.objects.filter(id__gt=after_id)
+    if customer_id is not None:
+        queryset = queryset.filter(customer_id=customer_id)
+    return list(queryset.order_by("id").values(*EVENT_FIELDS)[:limit])
+
+
+def latest_event_id():
+    """Id of the newest event or 0 when the log is empty."""
+    last = OrderStatusEventModel.objects.order_by("-id").values_list("id", flat=True).first()
+    return last or 0
+
+
+def format_sse(event):
+    """Encode an event dict as a server-sent-events message."""
+    data = {
+        "id": event["id"],
+        "order": event["order_id"],
+        "from_status": event["from_status"],
+        "to_status": event["to_status"],
+        "created_at": event["created_at"].isoformat(),
+    }
+    return f"id: {event['id']}\nevent: order_status\ndata: {json.dumps(data)}\n\n"
+
+
+class OrderEventFeed:
+    """Single poller per event loop fanning events out to per-customer queues."""
+
+    def __init__(self, poll_interval, queue_size=100):
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._task = None
+        self._last_id = None
+
+    async def subscribe(self, customer_id):
+        """Register a queue for the customer and start the poller if idle."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(customer_id, set()).add(queue)
+
+        if self._last_id is None:
+            self._last_id = await sync_to_async(latest_event_id)()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, customer_id, queue):
+        """Drop the queue; the poller stops once nobody is listening."""
+        queues = self._subscribers.get(customer_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[customer_id]
+
+    def _publish(self, event):
+        for queue in self._subscribers.get(event["customer_id"], ()):
+            if queue.full():
+                # Slow consumer, drop its oldest event; it can resume via Last-Event-ID.
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                events = await sync_to_async(fetch_events)(self._last_id)
+            except Exception:
+                logger.exception("Order event feed poll failed")
+                events = []
+
+            for event in events:
+                self._last_id = event["id"]
+                self._publish(event)
+
+            if len(events) < 500:
+                await asyncio.sleep(self.poll_interval)
+
+        # Next subscriber restarts from the live head.
+        self._last_id = None
+
+
+order_event_feed = OrderEventFeed(settings.ORDER_EVENT_POLL_INTERVAL)
+
+
+async def stream_events_async(customer_id, last_event_id=None):
+    """Async SSE body served from the shared feed (ASGI)."""
+    queue = await order_event_feed.subscribe(customer_id)
+    last_sent = last_event_id or 0
+
+    try:
+        yield "retry: 3000\n\n"
+
+        if last_event_id is not None:
+            backlog = await sync_to_async(fetch_events)(last_event_id, customer_id)
+            for event in backlog:
+                last_sent = event["id"]
+                yield format_sse(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.ORDER_EVENT_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if event["id"] <= last_sent:
+                continue
+            last_sent = event["id"]
+            yield format_sse(event)
+
+    finally:
+        order_event_feed.unsubscribe(customer_id, queue)
+
+
+def stream_events_sync(customer_id, last_event_id=None):
+    """
+    Sync SSE body for WSGI servers.
+    Each connection polls on its own here, so the stream is bounded and clients reconnect.
+    """
+    last_sent = last_event_id if last_event_id is not None else latest_event_id()
+    deadline = time.monotonic() + settings.ORDER_EVENT_SYNC_STREAM_TIMEOUT
+    idle_since = time.monotonic()
+
+    yield "retry: 3000\n\n"
+
+    while time.monotonic() < deadline:
+        events = fetch_events(last_sent, customer_id)
+        for event in events:
+            last_sent = event["id"]
+            yield format_sse(event)
+
+        if events:
+            idle_since = time.monotonic()
+        elif time.monotonic() - idle_since >= settings.ORDER_EVENT_KEEPALIVE:
+            idle_since = time.monotonic()
+            yield ": keepalive\n\n"
+
+        time.sleep(settings.ORDER_EVENT_POLL_INTERVAL)
@@ -0,0 +1,18 @@
+"""
+Move old delivered and cancelled orders to the archive table.
+"""
+from django.core.management.base import BaseCommand
+
+from orders.archive import archive_orders
+
+
+class Command(BaseCommand):
+    help = "Move delivered and cancelled orders not updated for --days days to ArchivedOrderModel in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Age in days, defaults to ORDER_ARCHIVE_AFTER_DAYS.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Orders moved per transaction.")
+
+    def handle(self, *args, **options):
+        archived = archive_orders(options["days"], options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} orders."))
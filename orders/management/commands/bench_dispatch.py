@@ -0,0 +1,60 @@
+"""
+Simulate the dispatcher planning step on synthetic orders and riders.
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.globalchoices import DISTRICT_CHOICES
+from orders.dispatch import (RiderIndex,
+                             plan_assignments)
+
+
+class Command(BaseCommand):
+    help = "Benchmark batched dispatch planning in memory, without the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=50000)
+        parser.add_argument("--riders", type=int, default=20000)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--max-load", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        districts = sorted({code for code, _ in DISTRICT_CHOICES})
+        # Skewed demand: a few districts get most of the orders.
+        weights = [1 / (rank + 1) for rank in range(len(districts))]
+
+        started = time.perf_counter()
+        index = RiderIndex(options["max_load"])
+        for rider_id in range(1, options["riders"] + 1):
+            index.add(rng.choice(districts), rider_id, rng.randrange(options["max_load"] // 2))
+        build_time = time.perf_counter() - started
+
+        orders = list(zip(range(1, options["orders"] + 1),
+                          rng.choices(districts, weights=weights, k=options["orders"])))
+
+        started = time.perf_counter()
+        assigned = []
+        unassigned = []
+        batch_size = options["batch_size"]
+        for start in range(0, len(orders), batch_size):
+            done, left = plan_assignments(orders[start:start + batch_size], index)
+            assigned.extend(done)
+            unassigned.extend(left)
+        plan_time = time.perf_counter() - started
+
+        per_rider = {}
+        for _, rider_id in assigned:
+            per_rider[rider_id] = per_rider.get(rider_id, 0) + 1
+        loads = list(per_rider.values()) or [0]
+
+        self.stdout.write(f"riders indexed     : {options['riders']} in {build_time * 1000:.1f} ms")
+        self.stdout.write(f"orders planned     : {len(orders)} in {plan_time * 1000:.1f} ms "
+                          f"({len(orders) / plan_time:,.0f} orders/s)")
+        self.stdout.write(f"assigned/unassigned: {len(assigned)}/{len(unassigned)}")
+        self.stdout.write(f"new orders per busy rider: min {min(loads)}, max {max(loads)}, "
+                          f"mean {statistics.mean(loads):.2f}, stdev {statistics.pstdev(loads):.2f}")
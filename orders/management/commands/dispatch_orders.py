@@ -0,0 +1,18 @@
+"""
+Assign shipped orders to available delivery boys.
+"""
+from django.core.management.base import BaseCommand
+
+from orders.dispatch import dispatch_shipped_orders
+
+
+class Command(BaseCommand):
+    help = "Assign unassigned shipped orders to delivery boys of the same district in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Orders planned and written per batch.")
+        parser.add_argument("--max-load", type=int, default=None, help="Maximum open orders per delivery boy.")
+
+    def handle(self, *args, **options):
+        assigned, unassigned = dispatch_shipped_orders(options["batch_size"], options["max_load"])
+        self.stdout.write(self.style.SUCCESS(f"Assigned {assigned} orders, {unassigned} left unassigned."))
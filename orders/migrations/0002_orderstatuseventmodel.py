@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-19 07:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_customermodel_is_active_and_more'),
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusEventModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('P', 'Pending'), ('S', 'Shipped'), ('O', 'Out for Delivery'), ('D', 'Delivered'), ('C', 'Cancelled')], max_length=10)),
+                ('to_status', models.CharField(choices=[('P', 'Pending'), ('S', 'Shipped'), ('O', 'Out for Delivery'), ('D', 'Delivered'), ('C', 'Cancelled')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.customermodel')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='orders.ordermodel')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer', 'id'], name='orders_orde_custome_dc6b18_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-19 07:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_customermodel_is_active_and_more'),
+        ('orders', '0002_orderstatuseventmodel'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordermodel',
+            name='assigned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ordermodel',
+            name='delivery_boy',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='accounts.deliveryboymodel'),
+        ),
+        migrations.AddIndex(
+            model_name='ordermodel',
+            index=models.Index(fields=['order_status', 'delivery_boy'], name='orders_orde_order_s_12af98_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.6 on 2026-10-19 07:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_revokedtokenmodel'),
+        ('orders', '0003_ordermodel_delivery_boy'),
+        ('products', '0002_productmodel_category_color_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrderModel',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('quantity', models.PositiveIntegerField()),
+                ('order_status', models.CharField(choices=[('P', 'Pending'), ('S', 'Shipped'), ('O', 'Out for Delivery'), ('D', 'Delivered'), ('C', 'Cancelled')], max_length=10)),
+                ('assigned_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ordermodel',
+            index=models.Index(fields=['order_status', 'updated_at'], name='orders_orde_order_s_5ea730_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ordermodel',
+            index=models.Index(fields=['customer', 'created_at', 'id'], name='orders_orde_custome_2abeb7_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedordermodel',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='accounts.customermodel'),
+        ),
+        migrations.AddField(
+            model_name='archivedordermodel',
+            name='delivery_boy',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_orders', to='accounts.deliveryboymodel'),
+        ),
+        migrations.AddField(
+            model_name='archivedordermodel',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='products.productmodel'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedordermodel',
+            index=models.Index(fields=['customer', 'created_at', 'id'], name='orders_arch_custome_a1a1df_idx'),
+        ),
+    ]
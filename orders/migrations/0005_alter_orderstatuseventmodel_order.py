@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-19 09:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_archivedordermodel'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orderstatuseventmodel',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='status_events', to='orders.ordermodel'),
+        ),
+    ]
@@ -1,19 +1,109 @@
-from django.db import models
+from django.db import models, transaction
 from core.globalchoices import ORDER_STATUS_CHOICES
 from core.models import ImageModel
-from accounts.models import CustomerModel
+from accounts.models import (CustomerModel,
+                             DeliveryBoyModel)
 from products.models import ProductModel
 
+# Marker for instances loaded without order_status, whose transition can't be known.
+_STATUS_NOT_LOADED = object()
+
 
 class OrderModel(models.Model):
     product = models.ForeignKey(ProductModel, on_delete=models.CASCADE)
     customer = models.ForeignKey(CustomerModel, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
     order_status = models.CharField(max_length=10, choices=ORDER_STATUS_CHOICES)
+    delivery_boy = models.ForeignKey(DeliveryBoyModel, on_delete=models.SET_NULL, null=True, blank=True, related_name="orders")
+    assigned_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["order_status", "delivery_boy"]),
+            models.Index(fields=["order_status", "updated_at"]),
+            models.Index(fields=["customer", "created_at", "id"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded status so save() can log transitions."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get("order_status", _STATUS_NOT_LOADED)
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Save and append an OrderStatusEventModel row when the status changes."""
+        previous = getattr(self, "_loaded_status", None)
+        update_fields = kwargs.get("update_fields")
+
+        if (previous is _STATUS_NOT_LOADED
+                or previous == self.order_status
+                or (update_fields is not None and "order_status" not in update_fields)):
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            OrderStatusEventModel.objects.create(
+                order=self,
+                customer_id=self.customer_id,
+                from_status=previous or "",
+                to_status=self.order_status
+            )
+        self._loaded_status = self.order_status
+
+
+class ArchivedOrderModel(models.Model):
+    """
+    Delivered and cancelled orders moved out of OrderModel by archive_orders.
+    Rows keep the id they had in OrderModel and are never updated.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    product = models.ForeignKey(ProductModel, on_delete=models.CASCADE, related_name="archived_orders")
+    customer = models.ForeignKey(CustomerModel, on_delete=models.CASCADE, related_name="archived_orders")
+    quantity = models.PositiveIntegerField()
+    order_status = models.CharField(max_length=10, choices=ORDER_STATUS_CHOICES)
+    delivery_boy = models.ForeignKey(DeliveryBoyModel, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name="archived_orders")
+    assigned_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "created_at", "id"]),
+        ]
+
+    def __str__(self):
+        return f"Archived order {self.id}"
+
+
+class OrderStatusEventModel(models.Model):
+    """
+    Append-only log of order status transitions.
+    Rows are only ever inserted; the auto id doubles as the change feed cursor.
+    Events outlive their order when it is archived, so `order` has no constraint.
+    """
+    order = models.ForeignKey(OrderModel, on_delete=models.DO_NOTHING, db_constraint=False,
+                              related_name="status_events")
+    customer = models.ForeignKey(CustomerModel, on_delete=models.CASCADE)
+    from_status = models.CharField(max_length=10, choices=ORDER_STATUS_CHOICES, blank=True)
+    to_status = models.CharField(max_length=10, choices=ORDER_STATUS_CHOICES)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "id"]),
+        ]
+
+    def __str__(self):
+        return f"Order {self.order_id}: {self.from_status or '-'} -> {self.to_status}"
+
 
 class LatestDealModel(models.Model):
     image = models.ForeignKey(ImageModel, on_delete=models.CASCADE)
@@ -0,0 +1,32 @@
+from rest_framework import serializers
+
+from core.globalchoices import ORDER_STATUS_CHOICES
+from orders.models import OrderStatusEventModel
+
+
+class OrderStatusEventSerializer(serializers.ModelSerializer):
+    """Serialize an order status transition."""
+
+    class Meta:
+        model = OrderStatusEventModel
+        fields = ["id", "order", "from_status", "to_status", "created_at"]
+
+
+class OrderHistorySerializer(serializers.Serializer):
+    """Serialize an order of the history, recent or archived."""
+    id = serializers.IntegerField()
+    product = serializers.IntegerField()
+    product_name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    order_status = serializers.ChoiceField(choices=ORDER_STATUS_CHOICES)
+    delivery_boy = serializers.IntegerField(allow_null=True)
+    assigned_at = serializers.DateTimeField(allow_null=True)
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+    archived = serializers.BooleanField()
+
+
+class OrderHistoryResponseSerializer(serializers.Serializer):
+    """Serialize a page of order history."""
+    next = serializers.CharField(allow_null=True)
+    results = OrderHistorySerializer(many=True)
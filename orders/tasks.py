@@ -0,0 +1,12 @@
+"""
+Background tasks of the orders.
+"""
+from datetime import timedelta
+
+from core.taskqueue import task
+from orders.archive import archive_orders
+
+
+@task(every=timedelta(days=1))
+def archive_old_orders():
+    archive_orders()
@@ -0,0 +1,18 @@
+"""
+URL mappings for the orders.
+"""
+from django.urls import path
+from orders.views import (OrderHistoryView,
+                          OrderEventListView,
+                          OrderEventStreamView,
+                          OrderExportView)
+
+
+app_name = "orders"
+
+urlpatterns = [
+    path('history/', OrderHistoryView.as_view(), name="order_history"),
+    path('events/', OrderEventListView.as_view(), name="order_events"),
+    path('events/stream/', OrderEventStreamView.as_view(), name="order_events_stream"),
+    path('export/<str:export_format>/', OrderExportView.as_view(), name="order_export"),
+]
@@ -1,3 +1,197 @@
-from django.shortcuts import render
+"""
+Views handling order tracking.
+"""
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from accounts.permissions import (IsCustomer,
+                                  IsSeller)
+from clovigo_main import settings
+from core.serializers import ErrorResponseSerializer
+from core.streaming import (EXPORT_FORMATS,
+                            export_response)
+from orders.archive import (order_history,
+                            decode_cursor)
+from orders.feed import (stream_events_async,
+                         stream_events_sync)
+from orders.models import (OrderModel,
+                           ArchivedOrderModel,
+                           OrderStatusEventModel)
+from orders.serializers import (OrderStatusEventSerializer,
+                                OrderHistoryResponseSerializer)
+
+from drf_spectacular.utils import (extend_schema,
+                                   OpenApiParameter,
+                                   OpenApiResponse)
+
+
+def _event_id(value):
+    """Parse an event cursor, None when missing or malformed."""
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class OrderHistoryView(APIView):
+    """
+    Orders of the customer, or of the seller's products, newest first.
+    Recent orders come from the live table, older pages continue into the archive.
+    """
+    permission_classes = [IsCustomer | IsSeller]
+
+    @extend_schema(
+        summary="Order history",
+        description="Page through orders newest first. Pass `next` of the previous page as `cursor`.",
+        parameters=[
+            OpenApiParameter(name="cursor", type=str, location=OpenApiParameter.QUERY,
+                             description="Cursor returned by the previous page.", required=False),
+            OpenApiParameter(name="page_size", type=int, location=OpenApiParameter.QUERY,
+                             description=f"Orders per page, at most {settings.ORDER_HISTORY_PAGE_SIZE * 5}.",
+                             required=False),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=OrderHistoryResponseSerializer,
+                description="Page of orders.",
+            ),
+            400: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Malformed cursor.",
+            )
+        },
+        tags=["Orders"]
+    )
+    def get(self, request):
+        customer = getattr(request, "customer", None)
+        if customer is not None:
+            filters = {"customer": customer}
+        else:
+            filters = {"product__seller": request.seller}
+
+        position = None
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            position = decode_cursor(cursor)
+            if position is None:
+                return Response({"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page_size = min(max(int(request.query_params.get("page_size")), 1), settings.ORDER_HISTORY_PAGE_SIZE * 5)
+        except (TypeError, ValueError):
+            page_size = settings.ORDER_HISTORY_PAGE_SIZE
+
+        rows, next_cursor = order_history(filters, position, page_size)
+        data = OrderHistoryResponseSerializer({"next": next_cursor, "results": rows}).data
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class OrderEventListView(APIView):
+    """
+    Status transitions of the customer's orders after a given event id.
+    Catch-up endpoint for clients that can't hold a stream open.
+    """
+    permission_classes = [IsCustomer]
+
+    @extend_schema(
+        summary="Order status events",
+        description="List the customer's order status transitions with id greater than `after`.",
+        parameters=[
+            OpenApiParameter(name="after", type=int, location=OpenApiParameter.QUERY,
+                             description="Last event id already seen.", required=False),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=OrderStatusEventSerializer(many=True),
+                description="Order status events.",
+            )
+        },
+        tags=["Orders"]
+    )
+    def get(self, request):
+        after = _event_id(request.query_params.get("after")) or 0
+        events = OrderStatusEventModel.objects.filter(
+            customer=request.customer, id__gt=after
+        ).order_by("id")[:500]
+        return Response(OrderStatusEventSerializer(events, many=True).data, status=status.HTTP_200_OK)
+
+
+class OrderEventStreamView(APIView):
+    """
+    Server-sent-events stream of the customer's order status transitions.
+    Resumes after the `Last-Event-ID` header when the client reconnects.
+    """
+    permission_classes = [IsCustomer]
+
+    @extend_schema(
+        summary="Stream order status events",
+        description="Server-sent-events stream (`text/event-stream`) of the customer's order status transitions.",
+        responses={
+            200: OpenApiResponse(
+                response=None,
+                description="Event stream.",
+            )
+        },
+        tags=["Orders"]
+    )
+    def get(self, request):
+        last_event_id = _event_id(request.headers.get("Last-Event-ID"))
+        customer_id = request.customer.id
+
+        if isinstance(request._request, ASGIRequest):
+            body = stream_events_async(customer_id, last_event_id)
+        else:
+            body = stream_events_sync(customer_id, last_event_id)
+
+        response = StreamingHttpResponse(body, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class OrderExportView(APIView):
+    """
+    Stream the orders of the seller's products as CSV or NDJSON.
+    Staff users without a seller account export every order.
+    `?archived=true` exports the archived orders instead.
+    """
+    permission_classes = [IsSeller | IsAdminUser]
+
+    fields = ["id", "product", "product__product_name", "customer", "quantity", "order_status",
+              "delivery_boy", "assigned_at", "created_at", "updated_at"]
+    header = ["id", "product", "product_name", "customer", "quantity", "order_status",
+              "delivery_boy", "assigned_at", "created_at", "updated_at"]
+
+    @extend_schema(
+        summary="Export orders",
+        description="Streams every order of the seller's products. Send `Accept-Encoding: gzip` for a compressed stream.",
+        parameters=[
+            OpenApiParameter(name="export_format", type=str, location=OpenApiParameter.PATH,
+                             enum=list(EXPORT_FORMATS), required=True),
+            OpenApiParameter(name="archived", type=bool, location=OpenApiParameter.QUERY,
+                             description="Export archived orders.", required=False),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=None,
+                description="CSV or NDJSON file.",
+            )
+        },
+        tags=["Orders"]
+    )
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": "Export format must be csv or ndjson."}, status=status.HTTP_400_BAD_REQUEST)
+
+        archived = request.query_params.get("archived") == "true"
+        queryset = (ArchivedOrderModel if archived else OrderModel).objects.order_by("id")
+        seller = getattr(request, "seller", None)
+        if seller is not None:
+            queryset = queryset.filter(product__seller=seller)
+
+        return export_response(request, queryset, self.fields, export_format, "orders", self.header)
@@ -1,7 +1,39 @@
 from django.contrib import admin
 from products.models import (ProductModel,
-                            ReviewModel)
+                            ReviewModel,
+                            PriceCampaignModel)
 
+from core.admin import LargeTableAdmin
 
-admin.site.register(ProductModel)
-admin.site.register(ReviewModel)
\ No newline at end of file
+
+@admin.register(ProductModel)
+class ProductModelAdmin(LargeTableAdmin):
+    list_display = ["id", "product_name", "seller", "product_category", "color", "actual_price",
+                    "discount_price", "stocks", "trend_order"]
+    list_select_related = ["seller__user"]
+    list_filter = ["product_category", "color"]
+    raw_id_fields = ["seller", "image", "color_available"]
+    search_fields = ["product_name"]
+
+
+@admin.register(ReviewModel)
+class ReviewModelAdmin(LargeTableAdmin):
+    list_display = ["id", "product", "customer", "rating", "created_at"]
+    list_select_related = ["product", "customer__user"]
+    raw_id_fields = ["product", "customer"]
+
+
+@admin.register(PriceCampaignModel)
+class PriceCampaignModelAdmin(LargeTableAdmin):
+    """Campaigns change prices only through products.pricing, so they are read-only here."""
+    list_display = ["id", "name", "seller", "kind", "value", "state", "starts_at", "ends_at", "products"]
+    list_select_related = ["seller__user"]
+    list_filter = ["state", "kind"]
+    raw_id_fields = ["seller"]
+    search_fields = ["name"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,394 @@
+"""
+Prefix autocomplete for product names.
+
+Every word position of a product name is an entry (`red apple juice` is found
+by `red`, `apple` and `juice`), kept sorted by its casefolded text so a prefix
+is a range found with two binary searches. Short prefixes match too many
+entries to rank per keystroke, so the best products of every prefix matching
+more than AUTOCOMPLETE_SCAN_LIMIT entries are ranked at build time.
+
+The index lives in a snapshot file that every worker memory-maps, suggestions
+never query the database. Product writes are batched for
+AUTOCOMPLETE_FLUSH_DELAY seconds and written to a small delta side file of
+changed and deleted products, which readers load next to the snapshot: its
+products hide their snapshot entries and are ranked with them. Rewriting the
+snapshot takes seconds for a large catalog, so it is only rebuilt by the
+build_autocomplete command and by the rebuild_autocomplete task once the delta
+grows past AUTOCOMPLETE_DELTA_LIMIT products; the new file replaces the old one
+atomically and the delta is cleared. Workers reload both files when they
+change on disk, without blocking suggestions on a write.
+
+Snapshot layout, little-endian:
+    header    b"PAC1", entry count, top prefix count, top list size
+    entries   (text offset, text length, name offset, name length, product id, trend) sorted by text
+    tops      (prefix offset, prefix length, entry index * top list size) sorted by prefix
+    strings   UTF-8 blob the offsets point into
+
+Delta layout: JSON list of `[product id, name, trend]`, name and trend null
+for deleted products.
+"""
+import bisect
+import heapq
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from django.db import connection
+
+from clovigo_main import settings
+from products.models import ProductModel
+
+try:
+    import fcntl
+except ImportError:  # Windows, writers are only serialized within a process.
+    fcntl = None
+
+
+MAGIC = b"PAC1"
+HEADER = struct.Struct("<4sIII")
+ENTRY = struct.Struct("<IHIHIi")
+TOP_PREFIX = struct.Struct("<IH")
+NO_ENTRY = 0xFFFFFFFF
+
+
+def normalize(text):
+    """Casefolded text with single spaces."""
+    return " ".join(text.casefold().split())
+
+
+def _entries(products):
+    """`(text, name, product_id, trend)` for every word position of every product name."""
+    entries = []
+    for product_id, (name, trend) in products.items():
+        words = normalize(name).split(" ")
+        for position in range(len(words)):
+            text = " ".join(words[position:])
+            if text:
+                entries.append((text.encode(), name, product_id, trend))
+    entries.sort(key=lambda entry: (entry[0], -entry[3], entry[2]))
+    return entries
+
+
+def _best(entries, indexes, limit):
+    """Up to `limit` entry indexes of distinct products, highest trend first."""
+    ranked = sorted(indexes, key=lambda i: (-entries[i][3], entries[i][1], entries[i][2]))
+    seen = set()
+    best = []
+    for i in ranked:
+        if entries[i][2] not in seen:
+            seen.add(entries[i][2])
+            best.append(i)
+            if len(best) == limit:
+                break
+    return best
+
+
+def _top_prefixes(entries, scan_limit, limit):
+    """Ranked entry indexes of every prefix matching more than `scan_limit` entries."""
+    tops = {}
+    stack = [(0, len(entries), 0)]
+    while stack:
+        low, high, depth = stack.pop()
+        if high - low <= scan_limit:
+            continue
+        if depth:
+            tops[entries[low][0][:depth]] = _best(entries, range(low, high), limit)
+
+        # Split the range on the byte after the shared prefix.
+        start = low
+        while start < high and len(entries[start][0]) <= depth:
+            start += 1
+        while start < high:
+            byte = entries[start][0][depth]
+            end = start
+            while end < high and entries[end][0][depth] == byte:
+                end += 1
+            stack.append((start, end, depth + 1))
+            start = end
+    return tops
+
+
+def write_snapshot(path, products, scan_limit, limit):
+    """Write the index of `{product_id: (name, trend)}` to `path`, replacing it atomically."""
+    entries = _entries(products)
+    tops = _top_prefixes(entries, scan_limit, limit)
+
+    strings = bytearray()
+    entry_table = bytearray()
+    for text, name, product_id, trend in entries:
+        name = name.encode()
+        entry_table += ENTRY.pack(len(strings), len(text), len(strings) + len(text), len(name), product_id, trend)
+        strings += text + name
+
+    top_format = struct.Struct("<" + "I" * limit)
+    top_table = bytearray()
+    for prefix in sorted(tops):
+        ranked = tops[prefix] + [NO_ENTRY] * (limit - len(tops[prefix]))
+        top_table += TOP_PREFIX.pack(len(strings), len(prefix)) + top_format.pack(*ranked)
+        strings += prefix
+
+    _replace(path, [HEADER.pack(MAGIC, len(entries), len(tops), limit), entry_table, top_table, strings])
+
+
+def _replace(path, chunks):
+    """Write `chunks` to a temporary file next to `path`, then move it over `path`."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(handle, "wb") as output:
+        for chunk in chunks:
+            output.write(chunk)
+    os.replace(temporary, path)
+
+
+def read_delta(path):
+    """`{product_id: (name, trend) or None}` of the delta file, empty when there is none."""
+    try:
+        with open(path, "rb") as delta:
+            rows = json.load(delta)
+    except FileNotFoundError:
+        return {}
+    return {product_id: None if name is None else (name, trend) for product_id, name, trend in rows}
+
+
+def write_delta(path, changes):
+    """Replace the delta file with `{product_id: (name, trend) or None}`."""
+    rows = [[product_id, *(row or (None, None))] for product_id, row in sorted(changes.items())]
+    _replace(path, [json.dumps(rows, ensure_ascii=False).encode()])
+
+
+def _file_id(stat):
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class _Keys:
+    """Sequence view of the sorted texts (or top prefixes) of a snapshot, for bisect."""
+
+    def __init__(self, snapshot, table, record, count):
+        self.snapshot = snapshot
+        self.table = table
+        self.record = record
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        offset, length = struct.unpack_from("<IH", self.snapshot.buffer, self.table + index * self.record)
+        start = self.snapshot.strings + offset
+        return self.snapshot.buffer[start:start + length]
+
+
+class Snapshot:
+    """Read-only view over a memory-mapped snapshot file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as snapshot:
+            self.stat = os.fstat(snapshot.fileno())
+            self.buffer = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, top_count, self.limit = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an autocomplete snapshot.")
+
+        self.top_record = TOP_PREFIX.size + 4 * self.limit
+        self.entry_table = HEADER.size
+        self.top_table = self.entry_table + self.count * ENTRY.size
+        self.strings = self.top_table + top_count * self.top_record
+        self.texts = _Keys(self, self.entry_table, ENTRY.size, self.count)
+        self.prefixes = _Keys(self, self.top_table, self.top_record, top_count)
+
+    def entry(self, index):
+        """`(name, product_id, trend)` of an entry."""
+        _, _, name_offset, name_length, product_id, trend = ENTRY.unpack_from(
+            self.buffer, self.entry_table + index * ENTRY.size
+        )
+        start = self.strings + name_offset
+        return self.buffer[start:start + name_length].decode(), product_id, trend
+
+    def _top(self, prefix):
+        position = bisect.bisect_left(self.prefixes, prefix)
+        if position == len(self.prefixes) or self.prefixes[position] != prefix:
+            return None
+        offset = self.top_table + position * self.top_record + TOP_PREFIX.size
+        return [index for index in struct.unpack_from("<" + "I" * self.limit, self.buffer, offset)
+                if index != NO_ENTRY]
+
+    def ranked(self, prefix, limit, hidden=()):
+        """
+        `(-trend, name, product_id)` of the best products whose name has a word starting with
+        `prefix`, best first, leaving out the `hidden` ids.
+        """
+        low = bisect.bisect_left(self.texts, prefix)
+        # 0xFF never occurs in UTF-8, so it sorts after every text starting with the prefix.
+        high = bisect.bisect_left(self.texts, prefix + b"\xff", low)
+        if low == high:
+            return []
+
+        ranked = self._top(prefix) if high - low > settings.AUTOCOMPLETE_SCAN_LIMIT else None
+        if ranked is not None:
+            # Hidden products leave their slot empty until the next rebuild.
+            best = [(-trend, name, product_id) for name, product_id, trend in map(self.entry, ranked)
+                    if product_id not in hidden]
+            return best[:limit]
+
+        best = {}
+        for index in range(low, high):
+            name, product_id, trend = self.entry(index)
+            if product_id not in hidden:
+                best[product_id] = (-trend, name, product_id)
+        return heapq.nsmallest(limit, best.values())
+
+
+class Delta:
+    """Products changed or deleted since the snapshot was written, read from the delta file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as delta:
+            self.stat = os.fstat(delta.fileno())
+        self.changes = read_delta(path)
+        self.entries = _entries({product_id: row for product_id, row in self.changes.items() if row is not None})
+        self.texts = [entry[0] for entry in self.entries]
+
+    def ranked(self, prefix, limit):
+        """`(-trend, name, product_id)` of the best changed products matching `prefix`, best first."""
+        low = bisect.bisect_left(self.texts, prefix)
+        high = bisect.bisect_left(self.texts, prefix + b"\xff", low)
+        best = {product_id: (-trend, name, product_id) for _, name, product_id, trend in self.entries[low:high]}
+        return heapq.nsmallest(limit, best.values())
+
+
+class ProductAutocomplete:
+    """Per-process handle on the shared autocomplete snapshot and its delta."""
+
+    def __init__(self, path, check_interval, flush_delay):
+        self.path = str(path)
+        self.check_interval = check_interval
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._snapshot = None
+        self._delta = None
+        self._checked_at = None
+        self._pending = set()
+        self._timer = None
+
+    @property
+    def delta_path(self):
+        return self.path + ".delta"
+
+    def _locked_file(self):
+        """Lock file serializing snapshot and delta writers across processes."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lock = open(self.path + ".lock", "a")
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def rebuild(self):
+        """
+        Rebuild the snapshot from the database and clear the delta. Readers keep the
+        previous files until the new ones are in place.
+        """
+        with self._locked_file():
+            products = {
+                product_id: (name, trend)
+                for product_id, name, trend in ProductModel.objects.values_list(
+                    "id", "product_name", "trend_order"
+                ).iterator(chunk_size=5000)
+            }
+            write_snapshot(self.path, products, settings.AUTOCOMPLETE_SCAN_LIMIT, settings.AUTOCOMPLETE_MAX_RESULTS)
+            write_delta(self.delta_path, {})
+        with self._lock:
+            self._checked_at = None
+
+    def needs_rebuild(self):
+        """True when there is no snapshot yet or the delta outgrew AUTOCOMPLETE_DELTA_LIMIT."""
+        if not os.path.exists(self.path):
+            return True
+        return len(read_delta(self.delta_path)) > settings.AUTOCOMPLETE_DELTA_LIMIT
+
+    def _reload(self, loader, path, current):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if current is not None and _file_id(stat) == _file_id(current.stat):
+            return current
+        return loader(path)
+
+    def _current(self):
+        """Mapped snapshot and delta (None when missing), reloaded when another process replaced them."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._snapshot, self._delta
+
+        with self._lock:
+            self._snapshot = self._reload(Snapshot, self.path, self._snapshot)
+            self._delta = self._reload(Delta, self.delta_path, self._delta)
+            self._checked_at = now
+            return self._snapshot, self._delta
+
+    def suggest(self, prefix, limit=None):
+        """Up to `limit` `{"id", "name"}` of products with a name word starting with `prefix`."""
+        limit = min(limit or settings.AUTOCOMPLETE_MAX_RESULTS, settings.AUTOCOMPLETE_MAX_RESULTS)
+        text = normalize(prefix)
+        if not text:
+            return []
+        if prefix[-1:].isspace():
+            text += " "
+        text = text.encode()
+
+        snapshot, delta = self._current()
+        ranked = []
+        if snapshot is not None:
+            ranked += snapshot.ranked(text, limit, delta.changes if delta is not None else ())
+        if delta is not None:
+            ranked += delta.ranked(text, limit)
+        return [{"id": product_id, "name": name} for _, name, product_id in heapq.nsmallest(limit, ranked)]
+
+    def refresh(self, product_ids):
+        """Queue changed or deleted products, written to the delta after the flush delay."""
+        with self._lock:
+            self._pending.update(product_ids)
+            if self.flush_delay <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self._flush_in_background)
+                self._timer.start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Write queued products to the delta file with one query."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            product_ids, self._pending = self._pending, set()
+        if not product_ids:
+            return
+
+        with self._locked_file():
+            changes = read_delta(self.delta_path)
+            changes.update(dict.fromkeys(product_ids))
+            rows = ProductModel.objects.filter(id__in=product_ids).values_list("id", "product_name", "trend_order")
+            for product_id, name, trend in rows:
+                changes[product_id] = (name, trend)
+            write_delta(self.delta_path, changes)
+        with self._lock:
+            self._checked_at = None
+
+
+product_autocomplete = ProductAutocomplete(
+    settings.AUTOCOMPLETE_SNAPSHOT_PATH,
+    settings.AUTOCOMPLETE_CHECK_INTERVAL,
+    settings.AUTOCOMPLETE_FLUSH_DELAY
+)
@@ -0,0 +1,234 @@
+"""
+In-memory facet index for catalog filters.
+
+Every facet value holds a bitset of product ids (a Python int, bit n set for
+product n). Filtered counts are bitwise intersections and popcounts, so the
+catalog never runs a GROUP BY per facet. A build collects the ids of each
+facet value first and turns them into a bitset in one NumPy pass, instead of
+growing a huge int one bit at a time. The index is kept current by the
+product signals and rebuilt when another process bumps the shared version.
+"""
+import threading
+import time
+from decimal import Decimal
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Q
+
+from clovigo_main import settings
+from products.models import ProductModel
+
+
+VERSION_KEY = "products:facets:version"
+
+
+def _bands(bounds):
+    """Labels for consecutive bounds, the last band is open ended."""
+    labels = [f"{low}-{high}" for low, high in zip(bounds, bounds[1:])]
+    labels.append(f"{bounds[-1]}+")
+    return labels
+
+
+def _band_of(value, bounds):
+    """Label of the band containing `value`."""
+    if value is None:
+        return None
+    for low, high in zip(bounds, bounds[1:]):
+        if value < high:
+            return f"{low}-{high}"
+    return f"{bounds[-1]}+"
+
+
+def _band_q(field, label, bounds):
+    """Q object selecting a band label, None when the label is unknown."""
+    if label not in _bands(bounds):
+        return None
+    low, _, high = label.rstrip("+").partition("-")
+    condition = Q(**{f"{field}__gte": Decimal(low)})
+    if high:
+        condition &= Q(**{f"{field}__lt": Decimal(high)})
+    return condition
+
+
+# facet name -> (model field, band bounds or None for plain values)
+FACETS = {
+    "category": ("product_category", None),
+    "color": ("color", None),
+    "price": ("discount_price", settings.PRODUCT_PRICE_BUCKETS),
+    "discount": ("discount_percentage", settings.PRODUCT_DISCOUNT_BANDS),
+}
+
+FACET_FIELDS = tuple(field for field, _ in FACETS.values())
+
+
+def _bitset(ids):
+    """Python int with bit n set for every product id n in `ids`."""
+    if not ids:
+        return 0
+    ids = np.fromiter(ids, dtype=np.int64, count=len(ids))
+    bits = np.zeros(int(ids.max()) + 1, dtype=bool)
+    bits[ids] = True
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+def facet_values(row):
+    """Map a `(category, color, price, discount)` row to facet values."""
+    values = {}
+    for (facet, (_, bounds)), value in zip(FACETS.items(), row):
+        values[facet] = value if bounds is None else _band_of(value, bounds)
+    return values
+
+
+def facet_q(filters):
+    """Translate `{facet: [values]}` into a Q for the SQL result page."""
+    condition = Q()
+    for facet, wanted in filters.items():
+        field, bounds = FACETS[facet]
+        if bounds is None:
+            condition &= Q(**{f"{field}__in": wanted})
+            continue
+
+        any_band = Q(pk__in=[])
+        for label in wanted:
+            band = _band_q(field, label, bounds)
+            if band is not None:
+                any_band |= band
+        condition &= any_band
+    return condition
+
+
+class FacetIndex:
+    """Bitsets of product ids per facet value."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._bits = {}
+        self._rows = {}
+        self._all = 0
+        self._built_at = None
+        self._version = None
+
+    def _add(self, product_id, values):
+        bit = 1 << product_id
+        self._rows[product_id] = values
+        self._all |= bit
+        for facet, value in values.items():
+            if value is not None:
+                facet_bits = self._bits[facet]
+                facet_bits[value] = facet_bits.get(value, 0) | bit
+
+    def _remove(self, product_id):
+        values = self._rows.pop(product_id, None)
+        if values is None:
+            return
+        mask = ~(1 << product_id)
+        self._all &= mask
+        for facet, value in values.items():
+            facet_bits = self._bits[facet]
+            if value in facet_bits:
+                facet_bits[value] &= mask
+                if not facet_bits[value]:
+                    del facet_bits[value]
+
+    def build(self):
+        """Rebuild every bitset with one query."""
+        with self._lock:
+            # Read before the rows, so a bump landing during the query triggers another build.
+            version = cache.get(VERSION_KEY)
+            ids = {facet: {} for facet in FACETS}
+            self._rows = {}
+            rows = ProductModel.objects.values_list("id", *FACET_FIELDS).iterator(chunk_size=5000)
+            for product_id, *row in rows:
+                values = self._rows[product_id] = facet_values(row)
+                for facet, value in values.items():
+                    if value is not None:
+                        ids[facet].setdefault(value, []).append(product_id)
+
+            self._all = _bitset(list(self._rows))
+            self._bits = {
+                facet: {value: _bitset(value_ids) for value, value_ids in facet_ids.items()}
+                for facet, facet_ids in ids.items()
+            }
+            self._built_at = time.monotonic()
+            self._version = version
+
+    def _ensure_fresh(self):
+        if (self._built_at is None
+                or time.monotonic() - self._built_at > self.ttl
+                or cache.get(VERSION_KEY) != self._version):
+            self.build()
+
+    def _bump_version(self):
+        """
+        Announce a local change to the other processes. The new version is only
+        adopted when no other process bumped in between; otherwise their changes
+        are missing here and the next search rebuilds.
+        """
+        if cache.add(VERSION_KEY, 1, None):
+            version = 1
+        else:
+            version = cache.incr(VERSION_KEY)
+        if version == (self._version or 0) + 1:
+            self._version = version
+        else:
+            self._built_at = None
+
+    def refresh(self, product_ids):
+        """Re-read the given products, dropping the ones that no longer exist."""
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+
+        rows = ProductModel.objects.filter(id__in=product_ids).values_list("id", *FACET_FIELDS)
+        with self._lock:
+            if self._built_at is not None:
+                for product_id in product_ids:
+                    self._remove(product_id)
+                for product_id, *row in rows:
+                    self._add(product_id, facet_values(row))
+            self._bump_version()
+
+    def discard(self, product_id):
+        """Drop a deleted product."""
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(product_id)
+            self._bump_version()
+
+    def _mask(self, filters, skip=None):
+        mask = self._all
+        for facet, wanted in filters.items():
+            if facet == skip:
+                continue
+            facet_bits = self._bits[facet]
+            selected = 0
+            for value in wanted:
+                selected |= facet_bits.get(value, 0)
+            mask &= selected
+        return mask
+
+    def search(self, filters):
+        """
+        Filter with `{facet: [values]}`, OR within a facet and AND across facets.
+        Returns the matching count and per-facet counts. Each facet is counted
+        against the other facets' filters so unselected options keep their counts.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            counts = {}
+            for facet, (_, bounds) in FACETS.items():
+                base = self._mask(filters, skip=facet)
+                facet_bits = self._bits[facet]
+                order = sorted(facet_bits) if bounds is None else _bands(bounds)
+                facet_counts = {}
+                for value in order:
+                    count = (base & facet_bits.get(value, 0)).bit_count()
+                    if count:
+                        facet_counts[value] = count
+                counts[facet] = facet_counts
+            return self._mask(filters).bit_count(), counts
+
+
+facet_index = FacetIndex(settings.PRODUCT_FACET_TTL)
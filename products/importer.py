@@ -0,0 +1,242 @@
+"""
+Streaming bulk product import for sellers.
+
+Rows are parsed incrementally from CSV or NDJSON, validated in batches
+(optionally across processes), their ColorModel/ImageModel references are
+resolved with one query each per batch and valid rows are inserted with
+`bulk_create`. Bad rows are reported individually instead of failing the import.
+"""
+import codecs
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+from django.db.models import Min
+
+from clovigo_main import settings
+from core.globalchoices import (PRODUCTS_CHOICES,
+                                COLOR_CHOICES)
+from core.models import (ColorModel,
+                         ImageModel)
+from products.models import ProductModel
+from products.signals import products_bulk_changed
+
+
+FORMATS = ("csv", "ndjson")
+
+CATEGORIES = {value for value, _ in PRODUCTS_CHOICES}
+COLORS = {value for value, _ in COLOR_CHOICES}
+TRUE_VALUES = {"1", "true", "yes", "y"}
+MAX_ERRORS = 1000
+
+
+def iter_rows(stream, fmt):
+    """Yield `(line_no, row)` from a binary stream without reading it whole."""
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_no, row if isinstance(row, dict) else {"__invalid__": "Line is not a JSON object."}
+
+
+def _text(row, field, errors, required=True, max_length=None):
+    value = row.get(field)
+    value = "" if value is None else str(value).strip()
+    if required and not value:
+        errors[field] = "This field is required."
+    elif max_length and len(value) > max_length:
+        errors[field] = f"Ensure this field has no more than {max_length} characters."
+    return value
+
+
+def _decimal(row, field, errors):
+    try:
+        value = Decimal(str(row.get(field, "")).strip())
+    except InvalidOperation:
+        errors[field] = "A valid number is required."
+        return None
+    if not value.is_finite() or value < 0 or value >= Decimal("1e8"):
+        errors[field] = "Enter a price between 0 and 99999999.99."
+        return None
+    return value.quantize(Decimal("0.01"))
+
+
+def _integer(row, field, errors, default=None):
+    raw = row.get(field)
+    if raw in (None, "") and default is not None:
+        return default
+    try:
+        value = int(str(raw).strip())
+    except ValueError:
+        errors[field] = "A valid integer is required."
+        return None
+    if value < 0:
+        errors[field] = "Ensure this value is greater than or equal to 0."
+        return None
+    return value
+
+
+def validate_row(row):
+    """
+    Validate one raw row without touching the database.
+    Returns `(cleaned, errors)`; module level so it can run in a worker process.
+    """
+    if "__invalid__" in row:
+        return None, {"row": row["__invalid__"]}
+
+    errors = {}
+    cleaned = {
+        "product_name": _text(row, "product_name", errors, max_length=255),
+        "description": _text(row, "description", errors),
+        "product_category": _text(row, "product_category", errors).upper(),
+        "color": _text(row, "color", errors).upper(),
+        "color_available": _text(row, "color_available", errors, required=False).upper() or None,
+        "image": _integer(row, "image", errors),
+        "trend_order": _integer(row, "trend_order", errors, default=0),
+        "actual_price": _decimal(row, "actual_price", errors),
+        "discount_price": _decimal(row, "discount_price", errors),
+        "stocks": _integer(row, "stocks", errors),
+        "is_return_policy": str(row.get("is_return_policy", "")).strip().lower() in TRUE_VALUES,
+        "return_before": _text(row, "return_before", errors, max_length=255),
+        "delivered_within": _text(row, "delivered_within", errors, max_length=255),
+    }
+
+    if "product_category" not in errors and cleaned["product_category"] not in CATEGORIES:
+        errors["product_category"] = f"\"{cleaned['product_category']}\" is not a valid choice."
+    if "color" not in errors and cleaned["color"] not in COLORS:
+        errors["color"] = f"\"{cleaned['color']}\" is not a valid choice."
+    if cleaned["color_available"] and cleaned["color_available"] not in COLORS:
+        errors["color_available"] = f"\"{cleaned['color_available']}\" is not a valid choice."
+
+    actual = cleaned["actual_price"]
+    discount = cleaned["discount_price"]
+    if actual is not None and discount is not None:
+        if discount > actual:
+            errors["discount_price"] = "Discount price can't be more than the actual price."
+        elif actual:
+            cleaned["discount_percentage"] = int((actual - discount) * 100 / actual)
+        else:
+            cleaned["discount_percentage"] = 0
+
+    return (None, errors) if errors else (cleaned, None)
+
+
+def _validate_batch(rows, executor):
+    if executor is None:
+        return list(map(validate_row, rows))
+    return list(executor.map(validate_row, rows, chunksize=max(len(rows) // 16, 1)))
+
+
+def _import_batch(seller, batch, executor, report):
+    line_numbers = [line_no for line_no, _ in batch]
+    results = _validate_batch([row for _, row in batch], executor)
+
+    color_names = {cleaned["color_available"] for cleaned, _ in results if cleaned and cleaned["color_available"]}
+    image_ids = {cleaned["image"] for cleaned, _ in results if cleaned}
+
+    colors = dict(
+        ColorModel.objects.filter(color__in=color_names).values("color").annotate(first=Min("id")).values_list("color", "first")
+    ) if color_names else {}
+    images = set(ImageModel.objects.filter(id__in=image_ids).values_list("id", flat=True)) if image_ids else set()
+
+    products = []
+    product_lines = []
+    for line_no, (cleaned, errors) in zip(line_numbers, results):
+        if cleaned is not None:
+            errors = {}
+            if cleaned["image"] not in images:
+                errors["image"] = f"Image {cleaned['image']} does not exist."
+            if cleaned["color_available"] and cleaned["color_available"] not in colors:
+                errors["color_available"] = f"Color {cleaned['color_available']} does not exist."
+
+        if errors:
+            report.add_error(line_no, errors)
+            continue
+
+        product_lines.append(line_no)
+        products.append(ProductModel(
+            seller=seller,
+            image_id=cleaned.pop("image"),
+            color_available_id=colors.get(cleaned.pop("color_available")),
+            **cleaned
+        ))
+
+    if not products:
+        return
+
+    try:
+        with transaction.atomic():
+            created = ProductModel.objects.bulk_create(products)
+            products_bulk_changed.send(sender=ProductModel, product_ids=[product.id for product in created])
+    except DatabaseError as error:
+        for line_no in product_lines:
+            report.add_error(line_no, {"row": f"Batch could not be saved: {error}"})
+        return
+
+    report.created += len(created)
+
+
+class ImportReport:
+    """Counts and per-row errors of an import."""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line_no, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": line_no, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def import_products(seller, stream, fmt="csv", batch_size=None, workers=None):
+    """Import products for the seller from a binary stream and return the report."""
+    batch_size = batch_size or settings.PRODUCT_IMPORT_BATCH_SIZE
+    workers = workers or settings.PRODUCT_IMPORT_WORKERS
+    report = ImportReport()
+    rows = iter_rows(stream, fmt)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            try:
+                batch = list(islice(rows, batch_size))
+            except (csv.Error, UnicodeDecodeError) as error:
+                # The stream can't be read past this point, stop after what was parsed.
+                report.add_error(report.rows + 1, {"file": f"Could not parse file: {error}"})
+                break
+            if not batch:
+                break
+            report.rows += len(batch)
+            _import_batch(seller, batch, executor, report)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return report
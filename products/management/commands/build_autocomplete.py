@@ -0,0 +1,14 @@
+"""
+Rebuild the product autocomplete snapshot from the database.
+"""
+from django.core.management.base import BaseCommand
+
+from products.autocomplete import product_autocomplete
+
+
+class Command(BaseCommand):
+    help = "Rebuild the memory-mapped product name autocomplete snapshot."
+
+    def handle(self, *args, **options):
+        product_autocomplete.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {product_autocomplete.path}."))
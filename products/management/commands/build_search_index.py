@@ -0,0 +1,17 @@
+"""
+Rebuild the product trigram search index from the database.
+"""
+from django.core.management.base import BaseCommand
+
+from products.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild ProductTrigramModel and TrigramFrequencyModel for every product."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Products indexed per transaction.")
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} products."))
@@ -0,0 +1,40 @@
+"""
+Bulk import products for a seller from a CSV or NDJSON file.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import SellerModel
+from products.importer import (FORMATS,
+                               import_products)
+
+
+class Command(BaseCommand):
+    help = "Import products for a seller from a CSV or NDJSON file and print the per-row error report."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file.")
+        parser.add_argument("--seller", type=int, required=True, help="SellerModel id owning the products.")
+        parser.add_argument("--format", choices=FORMATS, default=None, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Validation processes, defaults to PRODUCT_IMPORT_WORKERS. Only pays off for large files."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            seller = SellerModel.objects.get(id=options["seller"])
+        except SellerModel.DoesNotExist:
+            raise CommandError(f"Seller {options['seller']} does not exist.")
+
+        fmt = options["format"]
+        if fmt is None:
+            fmt = "ndjson" if options["path"].lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+        with open(options["path"], "rb") as stream:
+            report = import_products(seller, stream, fmt, options["batch_size"], options["workers"])
+
+        self.stdout.write(json.dumps(report.as_dict(), indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Created {report.created} of {report.rows} rows."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-19 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_usermanagementmodel_district_index'),
+        ('core', '0002_alter_filemodel_file_alter_imagemodel_img'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productmodel',
+            index=models.Index(fields=['product_category', 'color'], name='products_pr_product_df9f2e_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-19 07:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_productmodel_category_color_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrigramFrequencyModel',
+            fields=[
+                ('gram', models.CharField(max_length=3, primary_key=True, serialize=False)),
+                ('products', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductTrigramModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=3)),
+                ('in_name', models.BooleanField(default=False)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='products.productmodel')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('gram', 'product'), name='unique_trigram_gram_product')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-19 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_revokedtokenmodel'),
+        ('products', '0003_producttrigrammodel'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reviewmodel',
+            name='rating',
+            field=models.PositiveSmallIntegerField(choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5')]),
+        ),
+        migrations.AddIndex(
+            model_name='reviewmodel',
+            index=models.Index(fields=['product', 'created_at', 'id'], name='products_re_product_e1de16_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reviewmodel',
+            index=models.Index(fields=['product', 'rating', 'created_at', 'id'], name='products_re_product_3eee29_idx'),
+        ),
+    ]
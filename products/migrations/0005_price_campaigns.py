@@ -0,0 +1,58 @@
+# Generated by Django 5.1.6 on 2026-10-19 08:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_rank_choices'),
+        ('products', '0004_reviewmodel_integer_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceCampaignModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('kind', models.CharField(choices=[('P', 'Percentage'), ('A', 'Amount')], max_length=1)),
+                ('value', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('filters', models.JSONField(default=dict)),
+                ('state', models.CharField(choices=[('S', 'Scheduled'), ('A', 'Active'), ('E', 'Ended')], default='S', max_length=1)),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField(blank=True, null=True)),
+                ('products', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_campaigns', to='accounts.sellermodel')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PriceCampaignItemModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('previous_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('previous_percentage', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='campaign_items', to='products.productmodel')),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='products.pricecampaignmodel')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='pricecampaignmodel',
+            index=models.Index(fields=['state', 'starts_at'], name='products_pr_state_d14311_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricecampaignmodel',
+            index=models.Index(fields=['state', 'ends_at'], name='products_pr_state_bf5fc7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricecampaignmodel',
+            index=models.Index(fields=['seller', 'id'], name='products_pr_seller__50a2f0_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='pricecampaignitemmodel',
+            constraint=models.UniqueConstraint(fields=('campaign', 'product'), name='unique_campaign_item'),
+        ),
+    ]
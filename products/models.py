@@ -1,7 +1,9 @@
 from django.db import models
 from core.globalchoices import (PRODUCTS_CHOICES,
                                 COLOR_CHOICES,
-                                RATING_CHOICES)
+                                RATING_CHOICES,
+                                PRICE_CAMPAIGN_KIND_CHOICES,
+                                PRICE_CAMPAIGN_STATE_CHOICES)
 from core.models import ImageModel, ColorModel
 from accounts.models import (SellerModel,
                              CustomerModel)
@@ -27,17 +29,89 @@ class ProductModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["product_category", "color"]),
+        ]
+
     def __str__(self):
         return self.product_name
 
 
+class ProductTrigramModel(models.Model):
+    """
+    Inverted trigram index of product names and descriptions.
+    One row per trigram a product contains, `in_name` when the name has it.
+    """
+    gram = models.CharField(max_length=3)
+    product = models.ForeignKey(ProductModel, on_delete=models.CASCADE, related_name="trigrams")
+    in_name = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["gram", "product"], name="unique_trigram_gram_product"),
+        ]
+
+
+class TrigramFrequencyModel(models.Model):
+    """Number of products containing each trigram, used to probe rare trigrams first."""
+    gram = models.CharField(max_length=3, primary_key=True)
+    products = models.IntegerField(default=0)
+
+
 class ReviewModel(models.Model):
     product = models.ForeignKey(ProductModel, on_delete=models.CASCADE)
     review = models.TextField()
-    rating = models.CharField(max_length=10, choices=RATING_CHOICES)
+    rating = models.PositiveSmallIntegerField(choices=RATING_CHOICES)
     customer = models.ForeignKey(CustomerModel, on_delete=models.CASCADE)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "created_at", "id"]),
+            models.Index(fields=["product", "rating", "created_at", "id"]),
+        ]
+
+
+class PriceCampaignModel(models.Model):
+    """
+    A seller's discount over a filtered set of their products, between `starts_at` and `ends_at`.
+    `value` is a percentage off the actual price or an amount off it, depending on `kind`.
+    """
+    seller = models.ForeignKey(SellerModel, on_delete=models.CASCADE, related_name="price_campaigns")
+    name = models.CharField(max_length=255)
+    kind = models.CharField(max_length=1, choices=PRICE_CAMPAIGN_KIND_CHOICES)
+    value = models.DecimalField(max_digits=10, decimal_places=2)
+    filters = models.JSONField(default=dict)
+    state = models.CharField(max_length=1, choices=PRICE_CAMPAIGN_STATE_CHOICES, default="S")
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField(null=True, blank=True)
+    products = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["state", "starts_at"]),
+            models.Index(fields=["state", "ends_at"]),
+            models.Index(fields=["seller", "id"]),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class PriceCampaignItemModel(models.Model):
+    """Price of a product before a campaign repriced it, restored when the campaign ends."""
+    campaign = models.ForeignKey(PriceCampaignModel, on_delete=models.CASCADE, related_name="items")
+    product = models.ForeignKey(ProductModel, on_delete=models.CASCADE, related_name="campaign_items")
+    previous_price = models.DecimalField(max_digits=10, decimal_places=2)
+    previous_percentage = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["campaign", "product"], name="unique_campaign_item"),
+        ]
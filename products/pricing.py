@@ -0,0 +1,153 @@
+"""
+Set-based repricing for seller price campaigns.
+
+Starting a campaign records the current price of every matching product
+(bulk inserted PriceCampaignItemModel rows) and reprices them all with one
+UPDATE whose expressions derive `discount_price` and `discount_percentage`
+from `actual_price`, so the two never disagree. Ending it restores the
+recorded prices with one UPDATE reading the items back. Products already in
+an active campaign are left out, a campaign never raises a price, and the
+products' cache versions and indexes are refreshed through
+`products_bulk_changed` once the transaction commits.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (Case,
+                              DecimalField,
+                              ExpressionWrapper,
+                              F,
+                              IntegerField,
+                              OuterRef,
+                              Q,
+                              Subquery,
+                              Value,
+                              When)
+from django.db.models.functions import (Cast,
+                                        Floor,
+                                        Greatest,
+                                        Least,
+                                        Round)
+from django.utils import timezone
+
+from clovigo_main import settings
+from products.facets import facet_q
+from products.models import (ProductModel,
+                             PriceCampaignModel,
+                             PriceCampaignItemModel)
+from products.signals import products_bulk_changed
+
+
+MONEY = DecimalField(max_digits=10, decimal_places=2)
+ZERO = Decimal("0.00")
+PRICE_FIELDS = ["discount_price", "discount_percentage", "updated_at"]
+
+
+def repriced(kind, value):
+    """
+    UPDATE expressions applying `value` percent ("P") or `value` off ("A") the actual price,
+    keeping the current discount price when it is already lower.
+    """
+    actual = F("actual_price")
+    if kind == "P":
+        target = actual * (Decimal(100) - value) / Decimal(100)
+    else:
+        target = actual - value
+    target = Round(ExpressionWrapper(target, output_field=MONEY), 2)
+    price = Least(F("discount_price"), Greatest(target, Value(ZERO), output_field=MONEY), output_field=MONEY)
+
+    # Rounded before the floor so a 20% discount isn't stored as 19 off float noise.
+    percentage = Floor(Round(ExpressionWrapper((actual - price) * 100 / actual, output_field=MONEY), 6))
+    percentage = Case(When(actual_price__gt=0, then=Cast(percentage, IntegerField())), default=Value(0))
+    return {"discount_price": price, "discount_percentage": percentage}
+
+
+def campaign_products(campaign):
+    """The seller's products matching the campaign filters and not in another active campaign."""
+    filters = dict(campaign.filters)
+    ids = filters.pop("ids", None)
+
+    products = ProductModel.objects.filter(seller_id=campaign.seller_id).filter(facet_q(filters))
+    if ids is not None:
+        products = products.filter(id__in=ids)
+    return products.exclude(campaign_items__campaign__state="A")
+
+
+def _changed(product_ids):
+    products_bulk_changed.send(sender=ProductModel, product_ids=product_ids, fields=PRICE_FIELDS)
+
+
+def start_campaign(campaign, batch_size=None):
+    """Reprice the campaign's products. False when it was no longer scheduled."""
+    batch_size = batch_size or settings.PRICE_CAMPAIGN_BATCH_SIZE
+    with transaction.atomic():
+        if not PriceCampaignModel.objects.filter(id=campaign.id, state="S").update(state="A"):
+            return False
+
+        product_ids = []
+        rows = campaign_products(campaign).values_list("id", "discount_price", "discount_percentage")
+        batch = []
+        for product_id, price, percentage in rows.iterator(chunk_size=batch_size):
+            product_ids.append(product_id)
+            batch.append(PriceCampaignItemModel(campaign_id=campaign.id, product_id=product_id,
+                                                previous_price=price, previous_percentage=percentage))
+            if len(batch) == batch_size:
+                PriceCampaignItemModel.objects.bulk_create(batch)
+                batch = []
+        PriceCampaignItemModel.objects.bulk_create(batch)
+
+        if product_ids:
+            ProductModel.objects.filter(campaign_items__campaign_id=campaign.id).update(
+                **repriced(campaign.kind, campaign.value), updated_at=timezone.now()
+            )
+            _changed(product_ids)
+
+        PriceCampaignModel.objects.filter(id=campaign.id).update(products=len(product_ids))
+    campaign.state = "A"
+    campaign.products = len(product_ids)
+    return True
+
+
+def end_campaign(campaign):
+    """
+    Restore the prices a campaign changed, or just close it when it never started.
+    False when it had already ended.
+    """
+    now = timezone.now()
+    ends_at = Q(ends_at__isnull=True) | Q(ends_at__gt=now)
+    closed = {"state": "E", "ends_at": Case(When(ends_at, then=Value(now)), default=F("ends_at"))}
+
+    with transaction.atomic():
+        if PriceCampaignModel.objects.filter(id=campaign.id, state="S").update(**closed):
+            campaign.state = "E"
+            return True
+        if not PriceCampaignModel.objects.filter(id=campaign.id, state="A").update(**closed):
+            return False
+
+        items = PriceCampaignItemModel.objects.filter(campaign_id=campaign.id)
+        previous = items.filter(product_id=OuterRef("pk"))
+        product_ids = list(items.values_list("product_id", flat=True))
+        if product_ids:
+            ProductModel.objects.filter(campaign_items__campaign_id=campaign.id).update(
+                discount_price=Subquery(previous.values("previous_price")[:1]),
+                discount_percentage=Subquery(previous.values("previous_percentage")[:1]),
+                updated_at=now
+            )
+            _changed(product_ids)
+        items.delete()
+    campaign.state = "E"
+    return True
+
+
+def run_due_campaigns(now=None):
+    """End campaigns past their end and start the ones due. Returns how many started and ended."""
+    now = now or timezone.now()
+    ended = sum(
+        end_campaign(campaign)
+        for campaign in PriceCampaignModel.objects.filter(state__in=["S", "A"], ends_at__lte=now).order_by("id")
+    )
+    started = sum(
+        start_campaign(campaign)
+        for campaign in PriceCampaignModel.objects.filter(state="S", starts_at__lte=now).order_by("starts_at", "id")
+    )
+    return started, ended
@@ -0,0 +1,211 @@
+"""
+Typo-tolerant product search over a trigram index.
+
+Names and descriptions are split into trigrams of their words (`apple` gives
+`  a`, ` ap`, `app`, `ppl`, `ple`, `le `) stored in ProductTrigramModel, and
+TrigramFrequencyModel counts the products holding each trigram. A search
+looks up the query trigrams and takes candidates from the postings of only
+the rarest ones, at most SEARCH_MAX_POSTINGS per trigram so common trigrams
+don't make a search slower. The full overlap, in the name and overall, is
+counted for every candidate before the SEARCH_MAX_CANDIDATES most similar are
+loaded and ranked by similarity and edit distance between the words.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import (Count,
+                              F,
+                              Q)
+
+from clovigo_main import settings
+from products.models import (ProductModel,
+                             ProductTrigramModel,
+                             TrigramFrequencyModel)
+
+
+WORD = re.compile(r"\w+")
+
+# Keeps `IN (...)` lists under SQLite's variable limit.
+CHUNK = 900
+
+
+def words(text):
+    return WORD.findall(text.casefold())
+
+
+def trigrams(text):
+    """Trigrams of the words of `text`, padded so word starts and ends count."""
+    grams = set()
+    for word in words(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def edit_distance(first, second, limit):
+    """Levenshtein distance, `limit + 1` as soon as it is known to exceed `limit`."""
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, 1):
+        current = [i]
+        for j, other in enumerate(second, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _chunks(items):
+    items = list(items)
+    for start in range(0, len(items), CHUNK):
+        yield items[start:start + CHUNK]
+
+
+def _adjust_frequencies(changes):
+    """Apply `{gram: change}` to the product counts, one UPDATE per distinct change."""
+    changes = {gram: change for gram, change in changes.items() if change}
+    if not changes:
+        return
+
+    TrigramFrequencyModel.objects.bulk_create(
+        [TrigramFrequencyModel(gram=gram) for gram in changes],
+        ignore_conflicts=True,
+        batch_size=CHUNK
+    )
+    by_change = defaultdict(list)
+    for gram, change in changes.items():
+        by_change[change].append(gram)
+    for change, grams in by_change.items():
+        for chunk in _chunks(grams):
+            TrigramFrequencyModel.objects.filter(gram__in=chunk).update(products=F("products") + change)
+
+
+def index_products(product_ids):
+    """Rewrite the trigrams of the given products, products that no longer exist lose theirs."""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+
+    postings = []
+    counts = Counter()
+    rows = ProductModel.objects.filter(id__in=product_ids).values_list("id", "product_name", "description")
+    for product_id, name, description in rows:
+        name_grams = trigrams(name)
+        grams = name_grams | trigrams(description[:settings.SEARCH_DESCRIPTION_CHARS])
+        counts.update(grams)
+        postings.extend(
+            ProductTrigramModel(gram=gram, product_id=product_id, in_name=gram in name_grams) for gram in grams
+        )
+
+    with transaction.atomic():
+        existing = ProductTrigramModel.objects.filter(product_id__in=product_ids)
+        counts.subtract(existing.values_list("gram", flat=True))
+        existing.delete()
+        ProductTrigramModel.objects.bulk_create(postings, batch_size=5000)
+        _adjust_frequencies(counts)
+
+
+def product_grams(product_id):
+    """Trigrams indexed for a product, read before deleting it since its postings go with it."""
+    return list(ProductTrigramModel.objects.filter(product_id=product_id).values_list("gram", flat=True))
+
+
+def unindex_product(grams):
+    """Drop a deleted product's trigrams (from `product_grams`) from the frequencies."""
+    _adjust_frequencies({gram: -1 for gram in grams})
+
+
+def rebuild_search_index(batch_size=500):
+    """Index every product from scratch. Returns how many were indexed."""
+    with transaction.atomic():
+        ProductTrigramModel.objects.all().delete()
+        TrigramFrequencyModel.objects.all().delete()
+
+    indexed = 0
+    last_id = 0
+    while True:
+        product_ids = list(
+            ProductModel.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if not product_ids:
+            return indexed
+        index_products(product_ids)
+        last_id = product_ids[-1]
+        indexed += len(product_ids)
+
+
+def _distance(query_words, name, known):
+    """
+    Average edit distance of each query word to its closest name word, relative to its length.
+    `known` caches word distances across the candidates of a search, names share most words.
+    """
+    name_words = words(name)
+    if not name_words:
+        return 1.0
+
+    total = 0.0
+    for word in query_words:
+        best = len(word)
+        for other in name_words:
+            # Compare against the start of longer words so a partial word isn't penalised.
+            other = other[:len(word) + 1]
+            if (word, other) not in known:
+                known[word, other] = edit_distance(word, other, len(word))
+            best = min(best, known[word, other])
+        total += best / len(word)
+    return total / len(query_words)
+
+
+def search_products(query, limit=None, products=None):
+    """
+    Products matching `query` despite typos, best first, read from the `products` queryset
+    (which has to load product_name and trend_order). Returns `(product, similarity, distance)` tuples.
+    """
+    limit = limit or settings.SEARCH_MAX_RESULTS
+    query_grams = trigrams(query)
+    query_words = words(query)
+    if not query_grams:
+        return []
+
+    frequencies = dict(
+        TrigramFrequencyModel.objects.filter(gram__in=query_grams, products__gt=0).values_list("gram", "products")
+    )
+    min_overlap = max(math.ceil(len(query_grams) * settings.SEARCH_MIN_SIMILARITY), 1)
+    if len(frequencies) < min_overlap:
+        return []
+
+    # A product sharing `min_overlap` trigrams with the query holds at least one
+    # of the rarest `len(frequencies) - min_overlap + 1`, the others are skipped.
+    rarest = sorted(frequencies, key=frequencies.get)
+    probe = rarest[:len(rarest) - min_overlap + 1]
+
+    postings = Q()
+    for gram in probe:
+        postings |= Q(id__in=ProductTrigramModel.objects.filter(gram=gram).values("id")[:settings.SEARCH_MAX_POSTINGS])
+    candidates = ProductTrigramModel.objects.filter(postings).values("product")
+
+    # Overlap of every candidate, so none is cut before its similarity is known.
+    overlap = (
+        ProductTrigramModel.objects.filter(product__in=candidates, gram__in=query_grams)
+        .values("product").annotate(hits=Count("id"), name_hits=Count("id", filter=Q(in_name=True)))
+        .filter(hits__gte=min_overlap).values_list("product", "hits", "name_hits")
+    )
+    similarity = {
+        product_id: (0.75 * name_hits + 0.25 * hits) / len(query_grams)
+        for product_id, hits, name_hits in overlap
+    }
+    matching = sorted(similarity, key=similarity.get, reverse=True)[:settings.SEARCH_MAX_CANDIDATES]
+
+    results = []
+    known = {}
+    products = ProductModel.objects.all() if products is None else products
+    for product in products.filter(id__in=matching):
+        results.append((product, similarity[product.id], _distance(query_words, product.product_name, known)))
+
+    results.sort(key=lambda result: (-round(result[1], 1), result[2], -result[0].trend_order, result[0].id))
+    return results[:limit]
@@ -0,0 +1,149 @@
+from django.utils import timezone
+from rest_framework import serializers
+
+from accounts.models import SellerModel
+from core.models import (ImageModel,
+                         ColorModel)
+from core.sparse import SparseFieldsMixin
+from products.facets import FACETS
+from products.models import (ProductModel,
+                             ReviewModel,
+                             PriceCampaignModel)
+
+
+class ProductSellerSerializer(serializers.ModelSerializer):
+    """Seller of an expanded product."""
+
+    class Meta:
+        model = SellerModel
+        fields = ["id", "shop_name", "seller_rank"]
+
+
+class ProductImageSerializer(serializers.ModelSerializer):
+    """Image of an expanded product."""
+
+    class Meta:
+        model = ImageModel
+        fields = ["id", "img"]
+
+
+class ProductColorSerializer(serializers.ModelSerializer):
+    """Color of an expanded product."""
+
+    class Meta:
+        model = ColorModel
+        fields = ["id", "color"]
+
+
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serialize products for the catalog.
+    `is_favorited` reads the customer's favorite ids from the context.
+    """
+    is_favorited = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProductModel
+        exclude = ["created_at", "updated_at"]
+        expandable = {
+            "seller": ProductSellerSerializer,
+            "image": ProductImageSerializer,
+            "color_available": ProductColorSerializer,
+        }
+
+    def get_is_favorited(self, obj) -> bool:
+        return obj.id in self.context.get("favorite_ids", ())
+
+
+class ProductListResponseSerializer(serializers.Serializer):
+    """Catalog page visualise for Swagger UI."""
+    count = serializers.IntegerField()
+    page = serializers.IntegerField()
+    facets = serializers.DictField(child=serializers.DictField(child=serializers.IntegerField()))
+    results = ProductSerializer(many=True)
+
+
+class ProductImportSerializer(serializers.Serializer):
+    """Validate a bulk import upload."""
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=["csv", "ndjson"], required=False)
+
+    def validate(self, data):
+        """Guess the format from the file extension when not given."""
+        if "format" not in data:
+            name = data["file"].name.lower()
+            data["format"] = "ndjson" if name.endswith((".ndjson", ".jsonl")) else "csv"
+        return data
+
+
+class ProductImportReportSerializer(serializers.Serializer):
+    """Import report visualise for Swagger UI."""
+    rows = serializers.IntegerField()
+    created = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    errors = serializers.ListField(child=serializers.DictField())
+    errors_truncated = serializers.BooleanField()
+
+
+class ProductSuggestionSerializer(serializers.Serializer):
+    """Autocomplete suggestion visualise for Swagger UI."""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+
+
+class ReviewSerializer(serializers.ModelSerializer):
+    """Serialize a product review with the reviewer's username."""
+    reviewer = serializers.CharField(source="customer.user.username", read_only=True)
+
+    class Meta:
+        model = ReviewModel
+        fields = ["id", "rating", "review", "reviewer", "created_at"]
+
+
+class ReviewPageSerializer(serializers.Serializer):
+    """Reviews page visualise for Swagger UI."""
+    next = serializers.CharField(allow_null=True)
+    results = ReviewSerializer(many=True)
+
+
+class PriceCampaignSerializer(serializers.ModelSerializer):
+    """
+    Serialize a seller's price campaign.
+    `filters` maps facet names (and `ids`) to lists of values, `starts_at` defaults to now.
+    """
+    starts_at = serializers.DateTimeField(required=False)
+
+    class Meta:
+        model = PriceCampaignModel
+        fields = ["id", "name", "kind", "value", "filters", "state", "starts_at", "ends_at", "products", "created_at"]
+        read_only_fields = ["state", "products", "created_at"]
+
+    def validate_filters(self, filters):
+        if not isinstance(filters, dict):
+            raise serializers.ValidationError("Filters must be an object.")
+        for name, values in filters.items():
+            if name != "ids" and name not in FACETS:
+                raise serializers.ValidationError(f"Unknown filter {name}.")
+            if not isinstance(values, list) or not values:
+                raise serializers.ValidationError(f"Filter {name} must be a non-empty list.")
+            if name == "ids" and not all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+                raise serializers.ValidationError("Filter ids must be product ids.")
+            if name != "ids" and not all(isinstance(value, str) for value in values):
+                raise serializers.ValidationError(f"Filter {name} must be a list of strings.")
+        return filters
+
+    def validate(self, data):
+        if data["value"] <= 0 or (data["kind"] == "P" and data["value"] > 100):
+            raise serializers.ValidationError({"value": "Must be above 0, and at most 100 for a percentage."})
+
+        data.setdefault("starts_at", timezone.now())
+        ends_at = data.get("ends_at")
+        if ends_at is not None and (ends_at <= data["starts_at"] or ends_at <= timezone.now()):
+            raise serializers.ValidationError({"ends_at": "Must be after starts_at and in the future."})
+        return data
+
+
+class PriceCampaignPageSerializer(serializers.Serializer):
+    """Price campaigns page visualise for Swagger UI."""
+    next = serializers.CharField(allow_null=True)
+    results = PriceCampaignSerializer(many=True)
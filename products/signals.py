@@ -0,0 +1,63 @@
+"""
+Keep in-memory product indexes in step with ProductModel writes.
+
+Bulk writers (`bulk_create`, `QuerySet.update`) skip model signals, so they
+send `products_bulk_changed` with the affected ids instead, and the changed
+`fields` when only some were written. Every write bumps the products' cache
+versions.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import Signal, receiver
+
+from products.autocomplete import product_autocomplete
+from products.facets import facet_index
+from products.models import ProductModel
+from products.search import (index_products,
+                             product_grams,
+                             unindex_product)
+from products.versions import bump_versions
+
+
+products_bulk_changed = Signal()
+
+
+AUTOCOMPLETE_FIELDS = {"product_name", "trend_order"}
+SEARCH_FIELDS = {"product_name", "description"}
+
+
+@receiver(post_save, sender=ProductModel)
+def product_saved(sender, instance, update_fields=None, **kwargs):
+    product_id = instance.id
+    transaction.on_commit(lambda: bump_versions([product_id]))
+    transaction.on_commit(lambda: facet_index.refresh([product_id]))
+    if update_fields is None or AUTOCOMPLETE_FIELDS & set(update_fields):
+        transaction.on_commit(lambda: product_autocomplete.refresh([product_id]))
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        transaction.on_commit(lambda: index_products([product_id]))
+
+
+@receiver(pre_delete, sender=ProductModel)
+def product_deleting(sender, instance, **kwargs):
+    # The postings are deleted with the product, the frequencies only change once that commits.
+    grams = product_grams(instance.id)
+    transaction.on_commit(lambda: unindex_product(grams))
+
+
+@receiver(post_delete, sender=ProductModel)
+def product_deleted(sender, instance, **kwargs):
+    product_id = instance.id
+    transaction.on_commit(lambda: bump_versions([product_id]))
+    transaction.on_commit(lambda: facet_index.discard(product_id))
+    transaction.on_commit(lambda: product_autocomplete.refresh([product_id]))
+
+
+@receiver(products_bulk_changed)
+def products_changed(sender, product_ids, fields=None, **kwargs):
+    product_ids = list(product_ids)
+    transaction.on_commit(lambda: bump_versions(product_ids))
+    transaction.on_commit(lambda: facet_index.refresh(product_ids))
+    if fields is None or AUTOCOMPLETE_FIELDS & set(fields):
+        transaction.on_commit(lambda: product_autocomplete.refresh(product_ids))
+    if fields is None or SEARCH_FIELDS & set(fields):
+        transaction.on_commit(lambda: index_products(product_ids))
@@ -0,0 +1,20 @@
+"""
+Background tasks of the products.
+"""
+from datetime import timedelta
+
+from clovigo_main import settings
+from core.taskqueue import task
+from products.autocomplete import product_autocomplete
+from products.pricing import run_due_campaigns
+
+
+@task(every=timedelta(seconds=settings.PRICE_CAMPAIGN_INTERVAL))
+def run_price_campaigns():
+    run_due_campaigns()
+
+
+@task(every=timedelta(seconds=settings.AUTOCOMPLETE_REBUILD_INTERVAL))
+def rebuild_autocomplete():
+    if product_autocomplete.needs_rebuild():
+        product_autocomplete.rebuild()
@@ -0,0 +1,26 @@
+"""
+URL mappings for the products.
+"""
+from django.urls import path
+from products.views import (ProductListView,
+                            ProductAutocompleteView,
+                            ProductSearchView,
+                            ProductReviewListView,
+                            ProductImportView,
+                            ProductExportView,
+                            PriceCampaignListView,
+                            PriceCampaignDetailView)
+
+
+app_name = "products"
+
+urlpatterns = [
+    path('', ProductListView.as_view(), name="product_list"),
+    path('autocomplete/', ProductAutocompleteView.as_view(), name="product_autocomplete"),
+    path('search/', ProductSearchView.as_view(), name="product_search"),
+    path('<int:product_id>/reviews/', ProductReviewListView.as_view(), name="product_reviews"),
+    path('import/', ProductImportView.as_view(), name="product_import"),
+    path('export/<str:export_format>/', ProductExportView.as_view(), name="product_export"),
+    path('campaigns/', PriceCampaignListView.as_view(), name="price_campaigns"),
+    path('campaigns/<int:campaign_id>/', PriceCampaignDetailView.as_view(), name="price_campaign"),
+]
@@ -0,0 +1,72 @@
+"""
+Per-product cache versions.
+
+Anything caching data derived from a product keys it with the product's
+version, so a write only has to give the product a new version instead of
+finding every cached copy. Versions of a whole batch of products are read
+with one `get_many` and bumped with one `set_many`. The catalog caches each
+product's serialized row this way (`cached_rows`).
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from clovigo_main import settings
+
+
+def _key(product_id):
+    return f"products:version:{product_id}"
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def product_versions(product_ids):
+    """
+    Current version of each product id. Products without one (never bumped or evicted)
+    get a fresh version, so nothing cached under an older one is read back.
+    """
+    product_ids = list(product_ids)
+    found = cache.get_many([_key(product_id) for product_id in product_ids])
+    versions = {product_id: found.get(_key(product_id)) for product_id in product_ids}
+
+    missing = [product_id for product_id, version in versions.items() if version is None]
+    if missing:
+        version = _new_version()
+        # add, not set, so a bump landing meanwhile isn't overwritten with an older version.
+        for product_id in missing:
+            cache.add(_key(product_id), version, None)
+        found = cache.get_many([_key(product_id) for product_id in missing])
+        versions.update({product_id: found.get(_key(product_id), version) for product_id in missing})
+    return versions
+
+
+def bump_versions(product_ids):
+    """Give every product in `product_ids` a new version."""
+    version = _new_version()
+    cache.set_many({_key(product_id): version for product_id in product_ids}, None)
+
+
+def cached_rows(product_ids, render, variant=""):
+    """
+    `{product_id: row}` for the products, cached under their current version.
+    `render(product_ids)` builds `{product_id: row}` for the ones not cached, `variant`
+    tells apart different renderings of the same product.
+    """
+    variant = hashlib.md5(variant.encode()).hexdigest()[:12]
+    keys = {
+        product_id: f"products:row:{variant}:{product_id}:{version}"
+        for product_id, version in product_versions(product_ids).items()
+    }
+    found = cache.get_many(list(keys.values()))
+    rows = {product_id: found[key] for product_id, key in keys.items() if key in found}
+
+    missing = [product_id for product_id in keys if product_id not in rows]
+    if missing:
+        rendered = render(missing)
+        cache.set_many({keys[product_id]: row for product_id, row in rendered.items()},
+                       settings.PRODUCT_ROW_CACHE_TTL)
+        rows.update(rendered)
+    return rows
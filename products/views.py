@@ -1,3 +1,500 @@
-from django.shortcuts import render
+"""
+Views handling the product catalog.
+"""
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from clovigo_main import settings
+from accounts.permissions import (IsCustomer,
+                                  IsSeller)
+from cart.favorites import favorite_ids
+from core.pagination import KeysetPagination
+from core.serializers import ErrorResponseSerializer
+from core.sparse import sparse_options
+from core.streaming import (EXPORT_FORMATS,
+                            export_response)
+from products.autocomplete import product_autocomplete
+from products.facets import (FACETS,
+                             facet_index,
+                             facet_q)
+from products.importer import import_products
+from products.models import (ProductModel,
+                             ReviewModel,
+                             PriceCampaignModel)
+from products.pricing import (start_campaign,
+                              end_campaign)
+from products.search import search_products
+from products.versions import cached_rows
+from products.serializers import (ProductSerializer,
+                                  ProductListResponseSerializer,
+                                  ProductImportSerializer,
+                                  ProductImportReportSerializer,
+                                  ProductSuggestionSerializer,
+                                  ReviewPageSerializer,
+                                  ReviewSerializer,
+                                  PriceCampaignSerializer,
+                                  PriceCampaignPageSerializer)
+
+from drf_spectacular.utils import (extend_schema,
+                                   OpenApiParameter,
+                                   OpenApiResponse)
+
+
+SPARSE_PARAMETERS = [
+    OpenApiParameter(name="fields", type=str, location=OpenApiParameter.QUERY, required=False,
+                     description="Comma separated product fields to return, all by default."),
+    OpenApiParameter(name="expand", type=str, location=OpenApiParameter.QUERY, required=False,
+                     description="Comma separated relations to nest instead of their id: "
+                                 f"{', '.join(ProductSerializer.Meta.expandable)}."),
+]
+
+
+def _catalog_rows(products, options):
+    """
+    `(product_id, row)` of the serialized products of a page queryset, with `is_favorited` False.
+    Rows are cached under their product's version, except expanded ones, which also depend on
+    the related rows.
+    """
+    def render(ids):
+        products = list(ProductSerializer(**options).restrict(ProductModel.objects.filter(id__in=ids)))
+        rows = ProductSerializer(products, many=True, **options).data
+        return {product.id: dict(row) for product, row in zip(products, rows)}
+
+    if options.get("expand"):
+        products = list(ProductSerializer(**options).restrict(products))
+        rows = ProductSerializer(products, many=True, **options).data
+        return [(product.id, row) for product, row in zip(products, rows)]
+
+    product_ids = list(products.values_list("id", flat=True))
+    rows = cached_rows(product_ids, render, ",".join(options.get("fields", ["*"])))
+    return [(product_id, rows[product_id]) for product_id in product_ids if product_id in rows]
+
+
+class ProductListView(APIView):
+    """
+    Catalog listing filtered by facets.
+    Each facet accepts several comma separated values, counts come from the facet index.
+    """
+
+    @extend_schema(
+        summary="List products",
+        description="Products filtered by category, color, price bucket and discount band, "
+                    "with the number of matching products per facet value.",
+        parameters=[
+            OpenApiParameter(name=facet, type=str, location=OpenApiParameter.QUERY, required=False,
+                             description=f"Comma separated `{facet}` values.")
+            for facet in FACETS
+        ] + [
+            OpenApiParameter(name="page", type=int, location=OpenApiParameter.QUERY, required=False),
+        ] + SPARSE_PARAMETERS,
+        responses={
+            200: OpenApiResponse(
+                response=ProductListResponseSerializer,
+                description="Catalog page with facet counts.",
+            ),
+            400: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Unknown field or relation.",
+            )
+        },
+        tags=["Catalog"]
+    )
+    def get(self, request):
+        try:
+            options = sparse_options(request.query_params, ProductSerializer)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        filters = {}
+        for facet in FACETS:
+            raw = request.query_params.get(facet)
+            if raw:
+                filters[facet] = [value for value in raw.split(",") if value]
+
+        try:
+            page = max(int(request.query_params.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+
+        count, facets = facet_index.search(filters)
+
+        page_size = settings.PRODUCT_PAGE_SIZE
+        start = (page - 1) * page_size
+        rows = []
+        if start < count:
+            products = ProductModel.objects.filter(facet_q(filters)).order_by("-trend_order", "id")
+            rows = _catalog_rows(products[start:start + page_size], options)
+
+        favorites = ()
+        if rows and IsCustomer().has_permission(request, self):
+            favorites = favorite_ids(request.customer.id)
+        results = [
+            {**row, "is_favorited": product_id in favorites} if "is_favorited" in row else row
+            for product_id, row in rows
+        ]
+
+        return Response(
+            {
+                "count": count,
+                "page": page,
+                "facets": facets,
+                "results": results,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class ProductAutocompleteView(APIView):
+    """
+    Product name suggestions while the user types.
+    Served from the memory-mapped autocomplete index, no database query.
+    """
+    authentication_classes = []
+
+    @extend_schema(
+        summary="Autocomplete product names",
+        description="Products with a name word starting with `q`, most trending first.",
+        parameters=[
+            OpenApiParameter(name="q", type=str, location=OpenApiParameter.QUERY, required=True),
+            OpenApiParameter(name="limit", type=int, location=OpenApiParameter.QUERY, required=False,
+                             description=f"At most {settings.AUTOCOMPLETE_MAX_RESULTS}."),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=ProductSuggestionSerializer(many=True),
+                description="Suggestions.",
+            )
+        },
+        tags=["Catalog"]
+    )
+    def get(self, request):
+        try:
+            limit = max(int(request.query_params.get("limit", settings.AUTOCOMPLETE_MAX_RESULTS)), 1)
+        except ValueError:
+            limit = settings.AUTOCOMPLETE_MAX_RESULTS
+
+        suggestions = product_autocomplete.suggest(request.query_params.get("q", ""), limit)
+        return Response(suggestions, status=status.HTTP_200_OK)
+
+
+class ProductSearchView(APIView):
+    """
+    Product search tolerant to misspelled words.
+    Matches names and descriptions by shared trigrams, closest names first.
+    """
+
+    @extend_schema(
+        summary="Search products",
+        description="Products whose name or description resembles `q`, best match first.",
+        parameters=[
+            OpenApiParameter(name="q", type=str, location=OpenApiParameter.QUERY, required=True),
+            OpenApiParameter(name="limit", type=int, location=OpenApiParameter.QUERY, required=False,
+                             description=f"At most {settings.SEARCH_MAX_RESULTS}."),
+        ] + SPARSE_PARAMETERS,
+        responses={
+            200: OpenApiResponse(
+                response=ProductSerializer(many=True),
+                description="Matching products.",
+            ),
+            400: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Missing or too long query, unknown field or relation.",
+            )
+        },
+        tags=["Catalog"]
+    )
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query or len(query) > 100:
+            return Response({"error": "Query must be 1 to 100 characters."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            options = sparse_options(request.query_params, ProductSerializer)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", settings.SEARCH_MAX_RESULTS)), 1),
+                        settings.SEARCH_MAX_RESULTS)
+        except ValueError:
+            limit = settings.SEARCH_MAX_RESULTS
+
+        # Ranking reads the name and trend order whatever fields were asked for.
+        queryset = ProductSerializer(**options).restrict(ProductModel.objects.all(), "product_name", "trend_order")
+        products = [product for product, _, _ in search_products(query, limit, queryset)]
+
+        favorites = ()
+        if products and IsCustomer().has_permission(request, self):
+            favorites = favorite_ids(request.customer.id)
+
+        data = ProductSerializer(products, many=True, context={"favorite_ids": favorites}, **options).data
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ProductReviewListView(APIView):
+    """
+    Reviews of a product, paged with a cursor.
+    Each page is one query on the (product, created_at, id) or (product, rating, ...) index.
+    """
+    orderings = {
+        "recent": KeysetPagination(["-created_at", "-id"], settings.REVIEW_PAGE_SIZE),
+        "highest": KeysetPagination(["-rating", "-created_at", "-id"], settings.REVIEW_PAGE_SIZE),
+        "lowest": KeysetPagination(["rating", "created_at", "id"], settings.REVIEW_PAGE_SIZE),
+    }
+
+    @extend_schema(
+        summary="Product reviews",
+        description="Reviews of the product. `sort` is `recent` (default), `highest` or `lowest` rating; "
+                    "pass `next` of the previous page as `cursor` with the same `sort`.",
+        parameters=[
+            OpenApiParameter(name="sort", type=str, location=OpenApiParameter.QUERY, required=False,
+                             enum=["recent", "highest", "lowest"]),
+            OpenApiParameter(name="cursor", type=str, location=OpenApiParameter.QUERY, required=False),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=ReviewPageSerializer,
+                description="Page of reviews.",
+            ),
+            400: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Unknown sort or malformed cursor.",
+            ),
+            404: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Product not found.",
+            )
+        },
+        tags=["Reviews"]
+    )
+    def get(self, request, product_id):
+        pagination = self.orderings.get(request.query_params.get("sort", "recent"))
+        if pagination is None:
+            return Response({"error": "Sort must be recent, highest or lowest."}, status=status.HTTP_400_BAD_REQUEST)
+
+        position = None
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            position = pagination.decode(cursor, ReviewModel)
+            if position is None:
+                return Response({"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        reviews = (
+            ReviewModel.objects.filter(product_id=product_id)
+            .select_related("customer__user")
+            .only("id", "rating", "review", "created_at", "customer__user__username")
+        )
+        results, next_cursor = pagination.page(reviews, position)
+
+        if not results and position is None and not ProductModel.objects.filter(id=product_id).exists():
+            return Response({"error": "Product not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        data = {"next": next_cursor, "results": ReviewSerializer(results, many=True).data}
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ProductImportView(APIView):
+    """
+    Bulk create the seller's products from a CSV or NDJSON upload.
+    Valid rows are saved, invalid ones are listed in the report with their line number.
+    """
+    permission_classes = [IsSeller]
+    parser_classes = [MultiPartParser]
+
+    @extend_schema(
+        summary="Import products",
+        description="Upload a CSV or NDJSON file of products. Columns: product_name, description, "
+                    "product_category, color, color_available, image, trend_order, actual_price, "
+                    "discount_price, stocks, is_return_policy, return_before, delivered_within.",
+        request=ProductImportSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=ProductImportReportSerializer,
+                description="Import report.",
+            )
+        },
+        tags=["Catalog"]
+    )
+    def post(self, request):
+        serializer = ProductImportSerializer(data=request.data)
+
+        if serializer.is_valid():
+            report = import_products(
+                request.seller,
+                serializer.validated_data["file"],
+                serializer.validated_data["format"]
+            )
+            return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ProductExportView(APIView):
+    """
+    Stream the seller's products as CSV or NDJSON.
+    Staff users without a seller account export the whole catalog.
+    """
+    permission_classes = [IsSeller | IsAdminUser]
+
+    fields = ["id", "product_name", "description", "product_category", "color", "color_available",
+              "trend_order", "actual_price", "discount_price", "discount_percentage", "stocks", "image",
+              "is_return_policy", "return_before", "delivered_within", "created_at", "updated_at"]
+
+    @extend_schema(
+        summary="Export products",
+        description="Streams every product of the seller. Send `Accept-Encoding: gzip` for a compressed stream.",
+        parameters=[
+            OpenApiParameter(name="export_format", type=str, location=OpenApiParameter.PATH,
+                             enum=list(EXPORT_FORMATS), required=True),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=None,
+                description="CSV or NDJSON file.",
+            )
+        },
+        tags=["Catalog"]
+    )
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": "Export format must be csv or ndjson."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = ProductModel.objects.order_by("id")
+        seller = getattr(request, "seller", None)
+        if seller is not None:
+            queryset = queryset.filter(seller=seller)
+
+        return export_response(request, queryset, self.fields, export_format, "products")
+
+
+class PriceCampaignListView(APIView):
+    """
+    The seller's price campaigns, and new ones.
+    A campaign due now reprices its products in the request, later ones are started by the task queue.
+    """
+    permission_classes = [IsSeller]
+    pagination = KeysetPagination(["-id"], settings.PRICE_CAMPAIGN_PAGE_SIZE)
+
+    @extend_schema(
+        summary="List price campaigns",
+        operation_id="api_products_campaigns_list",
+        description="The seller's campaigns, newest first. Pass `next` of the previous page as `cursor`.",
+        parameters=[
+            OpenApiParameter(name="cursor", type=str, location=OpenApiParameter.QUERY, required=False),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=PriceCampaignPageSerializer,
+                description="Page of campaigns.",
+            ),
+            400: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Malformed cursor.",
+            )
+        },
+        tags=["Catalog"]
+    )
+    def get(self, request):
+        position = None
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            position = self.pagination.decode(cursor, PriceCampaignModel)
+            if position is None:
+                return Response({"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        campaigns, next_cursor = self.pagination.page(PriceCampaignModel.objects.filter(seller=request.seller), position)
+        data = {"next": next_cursor, "results": PriceCampaignSerializer(campaigns, many=True).data}
+        return Response(data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Create a price campaign",
+        description="Discount the seller's products matching `filters` by a percentage (`kind` P) or an amount "
+                    "(`kind` A) off the actual price, from `starts_at` until `ends_at` or until it is ended. "
+                    "Filters are catalog facets (category, color, price, discount) and `ids`. Products already "
+                    "in an active campaign are skipped and no price is raised.",
+        request=PriceCampaignSerializer,
+        responses={
+            201: OpenApiResponse(
+                response=PriceCampaignSerializer,
+                description="Campaign created, started when due.",
+            ),
+            400: OpenApiResponse(
+                description="Validation errors.",
+            )
+        },
+        tags=["Catalog"]
+    )
+    def post(self, request):
+        serializer = PriceCampaignSerializer(data=request.data)
+
+        if serializer.is_valid():
+            campaign = serializer.save(seller=request.seller)
+            if campaign.starts_at <= timezone.now():
+                start_campaign(campaign)
+            return Response(PriceCampaignSerializer(campaign).data, status=status.HTTP_201_CREATED)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PriceCampaignDetailView(APIView):
+    """
+    One of the seller's price campaigns.
+    Deleting it ends the campaign early and restores the prices it changed.
+    """
+    permission_classes = [IsSeller]
+
+    def _campaign(self, request, campaign_id):
+        return PriceCampaignModel.objects.filter(id=campaign_id, seller=request.seller).first()
+
+    @extend_schema(
+        summary="Price campaign",
+        responses={
+            200: OpenApiResponse(
+                response=PriceCampaignSerializer,
+                description="Campaign.",
+            ),
+            404: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Campaign not found.",
+            )
+        },
+        tags=["Catalog"]
+    )
+    def get(self, request, campaign_id):
+        campaign = self._campaign(request, campaign_id)
+        if campaign is None:
+            return Response({"error": "Campaign not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(PriceCampaignSerializer(campaign).data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="End a price campaign",
+        description="Ends a scheduled or active campaign now, restoring the prices it changed.",
+        responses={
+            200: OpenApiResponse(
+                response=PriceCampaignSerializer,
+                description="Campaign ended.",
+            ),
+            404: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Campaign not found.",
+            ),
+            409: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description="Campaign already ended.",
+            )
+        },
+        tags=["Catalog"]
+    )
+    def delete(self, request, campaign_id):
+        campaign = self._campaign(request, campaign_id)
+        if campaign is None:
+            return Response({"error": "Campaign not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not end_campaign(campaign):
+            return Response({"error": "Campaign already ended."}, status=status.HTTP_409_CONFLICT)
+
+        campaign.refresh_from_db()
+        return Response(PriceCampaignSerializer(campaign).data, status=status.HTTP_200_OK)